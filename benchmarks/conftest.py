@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+from typing import Callable, Tuple
+
+import pytest
+import numpy as np
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='session')
+def make_univariate_data() -> Callable[..., Tuple[np.ndarray, np.ndarray]]:
+    """Returns the factory of univariate/multivariate noisy data with non-uniform data sites
+
+    The data shape is ``(size,)`` or ``(ndim, size)``.
+    """
+
+    def make(size: int, ndim: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        rnd = np.random.RandomState(1234)
+
+        x = np.cumsum(rnd.uniform(0.5, 1.5, size))
+        shape = (ndim, size) if ndim else (size,)
+        y = np.sin(x / size * 10.) + rnd.randn(*shape) * 0.1
+
+        return x, y
+
+    return make
+
+
+@pytest.fixture(scope='session')
+def make_ndgrid_data() -> Callable[..., Tuple[Tuple[np.ndarray, ...], np.ndarray]]:
+    """Returns the factory of n-d grid noisy data with the shape ``(size,) * ndim``
+    """
+
+    def make(size: int, ndim: int) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        rnd = np.random.RandomState(1234)
+
+        x = tuple(np.cumsum(rnd.uniform(0.5, 1.5, size)) for _ in range(ndim))
+        y = rnd.randn(*(size,) * ndim)
+
+        return x, y
+
+    return make
+
+
+@pytest.fixture
+def peak_memory(benchmark) -> Callable:
+    """Returns the function that measures the peak memory of the call by tracemalloc
+
+    The peak memory in bytes is stored in the benchmark ``extra_info``.
+    """
+
+    def measure(func: Callable, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark.extra_info['peak_memory'] = peak
+        return result
+
+    return measure
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+Plots the benchmarks results saved by pytest-benchmark
+
+Usage:
+
+    pytest benchmarks --benchmark-json=benchmarks.json
+    python benchmarks/plot.py benchmarks.json --output docs/_static/benchmarks
+
+Every benchmarks group is plotted to ``<group>.png`` image: the mean time vs the data size
+(or the number of the workers) for each combination of the other parameters. If the benchmarks of the group store
+the peak memory, it is plotted to ``<group>-memory.png`` image.
+
+"""
+
+import argparse
+import json
+import pathlib
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+OUTPUT_DIR = ROOT_DIR / 'docs' / '_static' / 'benchmarks'
+
+# The parameters for the plots X axis
+X_PARAMS = ('size', 'workers')
+
+Series = Dict[str, List[Tuple[int, float]]]
+
+
+def load_groups(path: pathlib.Path, key: str) -> Dict[Tuple[str, str], Series]:
+    """Loads the benchmarks values grouped by the group name with X axis parameter and the series label
+    """
+
+    data = json.loads(path.read_text(encoding='utf-8'))
+    groups: Dict[Tuple[str, str], Series] = defaultdict(lambda: defaultdict(list))
+
+    for bench in data['benchmarks']:
+        params = dict(bench.get('params') or {})
+        x_param = next((name for name in X_PARAMS if name in params), None)
+
+        if x_param is None:
+            continue
+
+        if key == 'peak_memory':
+            value = bench.get('extra_info', {}).get('peak_memory')
+        else:
+            value = bench['stats'][key]
+
+        if value is None:
+            continue
+
+        x_value = params.pop(x_param)
+
+        if bench['group'].startswith('ndgrid'):
+            # The n-d grid groups are split by the dimension
+            params.pop('ndim', None)
+
+        label = ', '.join(f'{name}={value}' for name, value in sorted(params.items())) or bench['group']
+
+        groups[bench['group'], x_param][label].append((x_value, value))
+
+    return groups
+
+
+def plot_group(group: str, x_param: str, series: Series, ylabel: str, output: pathlib.Path) -> None:
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    for label, points in sorted(series.items()):
+        x_values, values = zip(*sorted(points))
+        ax.plot(x_values, values, 'o-', label=label)
+
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_title(group)
+    ax.set_xlabel('data size' if x_param == 'size' else x_param)
+    ax.set_ylabel(ylabel)
+    ax.grid(True, which='both', alpha=0.3)
+    ax.legend()
+
+    fig.tight_layout()
+    fig.savefig(output)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plots the benchmarks results saved by pytest-benchmark')
+    parser.add_argument('json', type=pathlib.Path, help='pytest-benchmark JSON file (--benchmark-json)')
+    parser.add_argument('--output', type=pathlib.Path, default=OUTPUT_DIR, help='Output images directory')
+    parser.add_argument('--stat', default='mean', help='The time statistic (mean, median, min)')
+    args = parser.parse_args()
+
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    for (group, x_param), series in load_groups(args.json, args.stat).items():
+        plot_group(group, x_param, series, f'{args.stat} time, s', args.output / f'{group}.png')
+
+    for (group, x_param), series in load_groups(args.json, 'peak_memory').items():
+        plot_group(group, x_param, series, 'peak memory, bytes', args.output / f'{group}-memory.png')
+
+
+if __name__ == '__main__':
+    main()
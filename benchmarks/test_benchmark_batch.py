@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from csaps import CubicSmoothingSpline
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason='csaps.batch requires Python 3.8')
+
+BATCH_SIZE = 64
+DATA_SIZE = 10000
+
+
+def _workers():
+    cpu_count = os.cpu_count() or 1
+    return sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+
+@pytest.fixture(scope='module')
+def batch_data(make_univariate_data):
+    data = [make_univariate_data(DATA_SIZE + i, ndim=4) for i in range(BATCH_SIZE)]
+    return [x for x, _ in data], [y for _, y in data]
+
+
+@pytest.mark.benchmark(group='batch-scaling')
+def test_batch_sequential(benchmark, batch_data):
+    """The baseline: fitting the splines one by one in the main process
+    """
+    xdata, ydata = batch_data
+
+    def fit():
+        return [CubicSmoothingSpline(x, y, smooth=0.9) for x, y in zip(xdata, ydata)]
+
+    benchmark(fit)
+
+
+@pytest.mark.benchmark(group='batch-scaling')
+@pytest.mark.parametrize('workers', _workers())
+def test_batch_workers(benchmark, batch_data, workers):
+    """The batch fitting scaling versus the number of the worker processes
+
+    The process pool is started before the benchmark, so the processes startup time is not measured.
+    """
+    from csaps.batch import fit_batch
+
+    xdata, ydata = batch_data
+
+    with ProcessPoolExecutor(workers) as executor:
+        fit_batch(xdata[:workers], ydata[:workers], smooth=0.9, executor=executor)
+        benchmark(fit_batch, xdata, ydata, smooth=0.9, executor=executor, chunksize=4)
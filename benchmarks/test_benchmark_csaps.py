@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from csaps import csaps, CubicSmoothingSpline, NdGridCubicSmoothingSpline
+
+SIZES = [10, 100, 1000, 10000]
+
+
+def _class_univariate(x, y, xi, smooth):
+    return CubicSmoothingSpline(x, y, smooth=smooth)(xi)
+
+
+def _class_ndgrid(x, y, xi, smooth):
+    return NdGridCubicSmoothingSpline(x, y, smooth=smooth)(xi)
+
+
+@pytest.mark.benchmark(group='csaps-dispatch-univariate')
+@pytest.mark.parametrize('api', ['csaps', 'class'])
+@pytest.mark.parametrize('size', SIZES)
+def test_csaps_dispatch_univariate(benchmark, peak_memory, make_univariate_data, size, api):
+    """The overhead of csaps function dispatching compared to using the spline class directly
+    """
+    x, y = make_univariate_data(size)
+    func = csaps if api == 'csaps' else _class_univariate
+
+    peak_memory(func, x, y, x, smooth=0.9)
+    benchmark(func, x, y, x, smooth=0.9)
+
+
+@pytest.mark.benchmark(group='csaps-dispatch-ndgrid')
+@pytest.mark.parametrize('api', ['csaps', 'class'])
+@pytest.mark.parametrize('size', [10, 50, 100])
+def test_csaps_dispatch_ndgrid(benchmark, peak_memory, make_ndgrid_data, size, api):
+    x, y = make_ndgrid_data(size, ndim=2)
+    func = csaps if api == 'csaps' else _class_ndgrid
+
+    peak_memory(func, x, y, x, smooth=0.9)
+    benchmark(func, x, y, x, smooth=0.9)
+
+
+@pytest.mark.benchmark(group='csaps-multivariate-memory')
+@pytest.mark.parametrize('size', [1000, 10000, 100000])
+def test_csaps_multivariate_memory(benchmark, peak_memory, make_univariate_data, size):
+    x, y = make_univariate_data(size, ndim=8)
+
+    peak_memory(csaps, x, y, x, smooth=0.9)
+    benchmark(csaps, x, y, x, smooth=0.9)
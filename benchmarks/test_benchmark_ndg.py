@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from csaps import NdGridCubicSmoothingSpline
+
+NDGRID_SIZES = {
+    2: [10, 50, 100, 200],
+    3: [10, 20, 40, 60],
+}
+
+
+def _ndgrid_params():
+    return [(ndim, size) for ndim, sizes in NDGRID_SIZES.items() for size in sizes]
+
+
+@pytest.mark.parametrize('ndim, size', _ndgrid_params())
+def test_ndgrid_make(benchmark, make_ndgrid_data, ndim, size):
+    benchmark.group = f'ndgrid-make-ndim{ndim}'
+
+    x, y = make_ndgrid_data(size, ndim)
+    benchmark(NdGridCubicSmoothingSpline, x, y, smooth=0.9)
+
+
+@pytest.mark.parametrize('ndim, size', _ndgrid_params())
+def test_ndgrid_evaluate(benchmark, make_ndgrid_data, ndim, size):
+    benchmark.group = f'ndgrid-evaluate-ndim{ndim}'
+
+    x, y = make_ndgrid_data(size, ndim)
+    spline = NdGridCubicSmoothingSpline(x, y, smooth=0.9).spline
+
+    benchmark(spline, x)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from csaps import CubicSmoothingSpline
+from csaps._ppeval import find_intervals
+
+UNIVARIATE_SIZES = [100, 1000, 10000, 100000]
+MULTIVARIATE_SIZES = [100, 1000, 10000]
+MULTIVARIATE_NDIMS = [2, 4, 8, 16]
+
+
+@pytest.mark.benchmark(group='univariate-make')
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_make(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size)
+    benchmark(CubicSmoothingSpline, x, y, smooth=0.9)
+
+
+@pytest.mark.benchmark(group='univariate-evaluate')
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_evaluate(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size)
+    xi = np.random.RandomState(1234).uniform(x[0], x[-1], size)
+    spline = CubicSmoothingSpline(x, y, smooth=0.9).spline
+
+    benchmark(spline, xi)
+
+
+@pytest.mark.benchmark(group='univariate-find-intervals-sorted')
+@pytest.mark.parametrize('assume_sorted', [False, True])
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_find_intervals_sorted(benchmark, make_univariate_data, size, assume_sorted):
+    # The sorted points over the non-uniform breaks: the binary search vs the linear merge
+    x, _ = make_univariate_data(size)
+    xi = np.sort(np.random.RandomState(1234).uniform(x[0], x[-1], 10 * size))
+
+    benchmark(find_intervals, x, xi, assume_sorted=assume_sorted)
+
+
+@pytest.mark.benchmark(group='multivariate-make')
+@pytest.mark.parametrize('ndim', MULTIVARIATE_NDIMS)
+@pytest.mark.parametrize('size', MULTIVARIATE_SIZES)
+def test_multivariate_make(benchmark, make_univariate_data, size, ndim):
+    x, y = make_univariate_data(size, ndim)
+    benchmark(CubicSmoothingSpline, x, y, smooth=0.9)
+
+
+@pytest.mark.benchmark(group='multivariate-evaluate')
+@pytest.mark.parametrize('ndim', MULTIVARIATE_NDIMS)
+@pytest.mark.parametrize('size', MULTIVARIATE_SIZES)
+def test_multivariate_evaluate(benchmark, make_univariate_data, size, ndim):
+    x, y = make_univariate_data(size, ndim)
+    xi = np.random.RandomState(1234).uniform(x[0], x[-1], size)
+    spline = CubicSmoothingSpline(x, y, smooth=0.9).spline
+
+    benchmark(spline, xi)
+
+
+@pytest.mark.benchmark(group='univariate-make-gcv')
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_make_gcv(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size)
+    benchmark(CubicSmoothingSpline, x, y, smooth='gcv')
+
+
+@pytest.mark.benchmark(group='univariate-make-knots')
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_make_knots(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size)
+    benchmark(CubicSmoothingSpline, x, y, smooth=0.9, knots=max(2, size // 100))
+
+
+@pytest.mark.benchmark(group='univariate-compress')
+@pytest.mark.parametrize('size', UNIVARIATE_SIZES)
+def test_univariate_compress(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size)
+    spline = CubicSmoothingSpline(x, y, smooth=0.9).spline
+
+    benchmark(spline.compress, 1e-3)
+
+
+@pytest.mark.benchmark(group='multivariate-make-middle-axis')
+@pytest.mark.parametrize('size', MULTIVARIATE_SIZES)
+def test_multivariate_make_middle_axis(benchmark, make_univariate_data, size):
+    x, y = make_univariate_data(size, 2)
+
+    # The data with shape (rows, size, 2) fitted along the middle axis
+    rows = max(1, 10 ** 6 // (2 * size))
+    y = np.broadcast_to(y.T, (rows, size, 2)).copy()
+
+    benchmark(CubicSmoothingSpline, x, y, smooth=0.9, axis=1)
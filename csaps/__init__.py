@@ -3,41 +3,132 @@
 """
 Cubic spline approximation (smoothing)
 
+The spline classes and functions are imported lazily on the first access,
+so ``import csaps`` does not import SciPy.
+
 """
 
+import importlib
+import sys
+from typing import TYPE_CHECKING
+
 from csaps._version import __version__  # noqa
 
 from csaps._base import (
     ISplinePPForm,
     ISmoothingSpline,
 )
-from csaps._sspumv import (
-    SplinePPForm,
-    CubicSmoothingSpline,
-)
-from csaps._sspndg import (
-    NdGridSplinePPForm,
-    NdGridCubicSmoothingSpline,
-)
 from csaps._types import (
     UnivariateDataType,
     MultivariateDataType,
     NdGridDataType,
 )
-from csaps._shortcut import csaps, AutoSmoothingResult
+
+if TYPE_CHECKING:  # pragma: no cover
+    from csaps._sspumv import (  # noqa
+        SplinePPForm,
+        CubicSmoothingSpline,
+        PreparedCubicSmoothingSpline,
+        clear_factorization_cache,
+    )
+    from csaps._sspstack import (  # noqa
+        StackedSplinePPForm,
+        StackedCubicSmoothingSpline,
+    )
+    from csaps._ppplan import (  # noqa
+        EvaluationPlan,
+        NdGridEvaluationPlan,
+        make_evaluation_plan,
+    )
+    from csaps._sspstream import StreamingCubicSmoothingSpline  # noqa
+    from csaps._sspbank import SplineBank  # noqa
+    from csaps._sspchunk import smooth_chunks  # noqa
+    from csaps._sspndg import (  # noqa
+        NdGridSplinePPForm,
+        NdGridCubicSmoothingSpline,
+    )
+    from csaps._shortcut import csaps, AutoSmoothingResult  # noqa
+    from csaps._instrument import (  # noqa
+        PhaseRecord,
+        instrument,
+        add_instrument_hook,
+        remove_instrument_hook,
+    )
+
+# The lazily imported attributes and their modules
+_LAZY_ATTRIBUTES = {
+    'SplinePPForm': '_sspumv',
+    'CubicSmoothingSpline': '_sspumv',
+    'PreparedCubicSmoothingSpline': '_sspumv',
+    'clear_factorization_cache': '_sspumv',
+    'StackedSplinePPForm': '_sspstack',
+    'StackedCubicSmoothingSpline': '_sspstack',
+    'EvaluationPlan': '_ppplan',
+    'NdGridEvaluationPlan': '_ppplan',
+    'make_evaluation_plan': '_ppplan',
+    'StreamingCubicSmoothingSpline': '_sspstream',
+    'SplineBank': '_sspbank',
+    'smooth_chunks': '_sspchunk',
+    'NdGridSplinePPForm': '_sspndg',
+    'NdGridCubicSmoothingSpline': '_sspndg',
+    'csaps': '_shortcut',
+    'AutoSmoothingResult': '_shortcut',
+    'PhaseRecord': '_instrument',
+    'instrument': '_instrument',
+    'add_instrument_hook': '_instrument',
+    'remove_instrument_hook': '_instrument',
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module = importlib.import_module(f'{__name__}.{module_name}')
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # Module __getattr__ (PEP 562) is not supported
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+
 
 __all__ = [
     # Shortcut
     'csaps',
     'AutoSmoothingResult',
+    'smooth_chunks',
+    'make_evaluation_plan',
+    'clear_factorization_cache',
+    'instrument',
+    'add_instrument_hook',
+    'remove_instrument_hook',
 
     # Classes
     'ISplinePPForm',
     'ISmoothingSpline',
     'SplinePPForm',
     'NdGridSplinePPForm',
+    'StackedSplinePPForm',
+    'SplineBank',
     'CubicSmoothingSpline',
+    'PreparedCubicSmoothingSpline',
     'NdGridCubicSmoothingSpline',
+    'StackedCubicSmoothingSpline',
+    'StreamingCubicSmoothingSpline',
+    'EvaluationPlan',
+    'NdGridEvaluationPlan',
+    'PhaseRecord',
 
     # Type-hints
     'UnivariateDataType',
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Banded (LAPACK band storage) linear system routines for cubic smoothing splines
+
+The linear system that is solved while computing a cubic smoothing spline
+is always symmetric positive-definite and pentadiagonal. The routines below
+assemble its diagonals directly into LAPACK upper band storage and solve it
+with banded Cholesky factorization in O(n) time and memory.
+
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import scipy.linalg as la
+
+
+def umv_band_matrices(dx: np.ndarray, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Assembles the matrices ``R`` and ``QtW^-1Q`` in upper band storage
+
+    Parameters
+    ----------
+    dx : np.ndarray
+        The vector of data sites differences with size ``n - 1``
+        or the 2-D array ``(batch, n - 1)`` of such vectors
+    w : np.ndarray
+        The weights vector with size ``n`` or the 2-D array ``(batch, n)``
+
+    Returns
+    -------
+    r_band : np.ndarray
+        Tridiagonal matrix ``R`` in upper band storage with shape ``(3, n - 2)``
+        (or ``(batch, 3, n - 2)``)
+    qtw_band : np.ndarray
+        Pentadiagonal matrix ``QtW^-1Q`` in upper band storage with shape ``(3, n - 2)``
+        (or ``(batch, 3, n - 2)``)
+
+    Notes
+    -----
+
+    Upper band storage for ``u = 2`` superdiagonals is used as it is described in
+    :func:`scipy.linalg.solveh_banded`: ``ab[u + i - j, j] == a[i, j]``.
+
+    """
+
+    size = dx.shape[-1] - 1
+    band_shape = dx.shape[:-1] + (3, size)
+
+    r_band = np.zeros(band_shape)
+    r_band[..., 1, 1:] = dx[..., 1:-1]
+    r_band[..., 2, :] = 2. * (dx[..., 1:] + dx[..., :-1])
+
+    # Q^T has three non-zero items in each row: (a, b, c)
+    dx_recip = 1. / dx
+    a = dx_recip[..., :-1]
+    c = dx_recip[..., 1:]
+    b = -(a + c)
+
+    w_recip = 1. / w
+    w0 = w_recip[..., :-2]
+    w1 = w_recip[..., 1:-1]
+    w2 = w_recip[..., 2:]
+
+    qtw_band = np.zeros(band_shape)
+    qtw_band[..., 0, 2:] = c[..., :-2] * a[..., 2:] * w2[..., :-2]
+    qtw_band[..., 1, 1:] = b[..., :-1] * a[..., 1:] * w1[..., :-1] + c[..., :-1] * b[..., 1:] * w2[..., :-1]
+    qtw_band[..., 2, :] = a * a * w0 + b * b * w1 + c * c * w2
+
+    return r_band, qtw_band
+
+
+def uniform_band_matrices(size: int, h: float, w: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Assembles the matrices ``R`` and ``QtW^-1Q`` in upper band storage for uniform data sites
+
+    For the evenly spaced data sites with the constant weights the matrices have
+    constant diagonals and they are filled without computing the reciprocals.
+
+    Parameters
+    ----------
+    size : int
+        The number of the data sites ``n``
+    h : float
+        The data sites step
+    w : float
+        The constant weight of the data sites
+
+    Returns
+    -------
+    r_band : np.ndarray
+        Tridiagonal matrix ``R`` in upper band storage with shape ``(3, n - 2)``
+    qtw_band : np.ndarray
+        Pentadiagonal matrix ``QtW^-1Q`` in upper band storage with shape ``(3, n - 2)``
+    """
+
+    band_shape = (3, size - 2)
+
+    r_band = np.zeros(band_shape)
+    r_band[1, 1:] = h
+    r_band[2, :] = 4. * h
+
+    # Q^T has three non-zero items in each row: (1/h, -2/h, 1/h)
+    scale = 1. / (h * h * w)
+
+    qtw_band = np.zeros(band_shape)
+    qtw_band[0, 2:] = scale
+    qtw_band[1, 1:] = -4. * scale
+    qtw_band[2, :] = 6. * scale
+
+    return r_band, qtw_band
+
+
+def band_trace(ab: np.ndarray) -> Union[float, np.ndarray]:
+    """Returns the trace of a matrix (or a stack of matrices) in upper band storage
+    """
+    return ab[..., -1, :].sum(axis=-1)
+
+
+def cholesky_factorize(ab: np.ndarray) -> np.ndarray:
+    """Computes banded Cholesky factorization of a symmetric positive-definite matrix
+
+    Parameters
+    ----------
+    ab : np.ndarray
+        The matrix in upper band storage
+
+    Returns
+    -------
+    cb : np.ndarray
+        Cholesky factor ``U`` (``A = U^T U``) in upper band storage
+    """
+    return la.cholesky_banded(ab, lower=False, check_finite=False)
+
+
+def cholesky_solve(cb: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Solves the linear system using the banded Cholesky factor
+
+    Parameters
+    ----------
+    cb : np.ndarray
+        Cholesky factor computed by :func:`cholesky_factorize`
+    b : np.ndarray
+        The right-hand side 1-D or 2-D array
+
+    Returns
+    -------
+    x : np.ndarray
+        The solution with the same shape as ``b``
+    """
+    return la.cho_solve_banded((cb, False), b, check_finite=False)
+
+
+def lu_factorize(ab: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Computes banded LU factorization with partial pivoting of a symmetric matrix
+
+    The factorization is used instead of Cholesky factorization when the matrix
+    is not positive-definite numerically because of round-off errors
+    (extremely ill-conditioned systems).
+
+    Parameters
+    ----------
+    ab : np.ndarray
+        The symmetric matrix in upper band storage
+
+    Returns
+    -------
+    lu_piv : Tuple[np.ndarray, np.ndarray]
+        LU factors in LAPACK general band storage and pivot indices
+    """
+
+    u, m = ab.shape[0] - 1, ab.shape[1]
+
+    # General band storage with ``u`` additional rows for the fill-in: gb[2u + i - j, j] = a[i, j]
+    gb = np.zeros((3 * u + 1, m), dtype=ab.dtype)
+    gb[u:2 * u + 1] = ab
+    for d in range(1, u + 1):
+        gb[2 * u + d, :m - d] = ab[u - d, d:]
+
+    gbtrf, = la.get_lapack_funcs(('gbtrf',), (gb,))
+    lu, piv, info = gbtrf(gb, u, u, overwrite_ab=True)
+
+    if info != 0:
+        raise np.linalg.LinAlgError(f'The matrix is singular: U[{info - 1}, {info - 1}] is zero')
+
+    return lu, piv
+
+
+def lu_solve(lu_piv: Tuple[np.ndarray, np.ndarray], b: np.ndarray) -> np.ndarray:
+    """Solves the linear system using banded LU factorization
+
+    Parameters
+    ----------
+    lu_piv : Tuple[np.ndarray, np.ndarray]
+        LU factors and pivot indices computed by :func:`lu_factorize`
+    b : np.ndarray
+        The right-hand side 1-D or 2-D array
+
+    Returns
+    -------
+    x : np.ndarray
+        The solution with the same shape as ``b``
+    """
+
+    lu, piv = lu_piv
+    u = (lu.shape[0] - 1) // 3
+
+    gbtrs, = la.get_lapack_funcs(('gbtrs',), (lu,))
+    x, info = gbtrs(lu, u, u, b, piv)
+
+    return x
+
+
+def batch_pentadiagonal_solve(ab: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Solves the stack of symmetric positive-definite pentadiagonal linear systems
+
+    The function uses LDL^T factorization and it is vectorized over the stack of systems.
+    The loop runs over the system size, so the function is efficient for many small
+    or medium size systems.
+
+    Parameters
+    ----------
+    ab : np.ndarray
+        The stack of matrices in upper band storage with shape ``(batch, 3, m)``
+    b : np.ndarray
+        The right-hand sides with shape ``(batch, m)``
+
+    Returns
+    -------
+    x : np.ndarray
+        The solutions with shape ``(batch, m)``
+    """
+
+    size = ab.shape[-1]
+
+    # Contiguous rows for each system index
+    a0 = np.ascontiguousarray(ab[:, 2, :].T)
+    a1 = np.ascontiguousarray(ab[:, 1, :].T)
+    a2 = np.ascontiguousarray(ab[:, 0, :].T)
+    z = np.array(b, dtype=np.float64).T.copy()
+
+    d = np.empty_like(a0)
+    l1 = np.zeros_like(a0)
+    l2 = np.zeros_like(a0)
+
+    # Factorization A = L D L^T and forward substitution L z = b
+    for i in range(size):
+        di = a0[i].copy()
+        if i > 0:
+            di -= l1[i - 1] * l1[i - 1] * d[i - 1]
+            z[i] -= l1[i - 1] * z[i - 1]
+        if i > 1:
+            di -= l2[i - 2] * l2[i - 2] * d[i - 2]
+            z[i] -= l2[i - 2] * z[i - 2]
+        d[i] = di
+
+        if i + 1 < size:
+            e = a1[i + 1].copy()
+            if i > 0:
+                e -= l1[i - 1] * l2[i - 1] * d[i - 1]
+            l1[i] = e / di
+        if i + 2 < size:
+            l2[i] = a2[i + 2] / di
+
+    z /= d
+
+    # Backward substitution L^T x = z
+    for i in range(size - 1, -1, -1):
+        if i + 1 < size:
+            z[i] -= l1[i] * z[i + 1]
+        if i + 2 < size:
+            z[i] -= l2[i] * z[i + 2]
+
+    return z.T
+
+
+def cholesky_band_inverse(cb: np.ndarray) -> np.ndarray:
+    """Computes the band of the inverse matrix using its banded Cholesky factor
+
+    The function computes the items of ``A^-1`` within the band of ``A``
+    (two superdiagonals) in O(n) time using the recurrence from
+    Hutchinson & de Hoog (1985) without computing the full inverse matrix.
+
+    The backward recurrence for the items ``S[i, i], S[i, i + 1], S[i, i + 2]`` is the upper
+    triangular linear system with 4 superdiagonals for the interleaved items. It is solved
+    by LAPACK banded triangular solver (``gbtrs`` without the lower factor).
+
+    Parameters
+    ----------
+    cb : np.ndarray
+        Cholesky factor ``U`` (``A = U^T U``) in upper band storage with shape ``(3, m)``
+        computed by :func:`cholesky_factorize`
+
+    Returns
+    -------
+    sb : np.ndarray
+        The band of ``A^-1`` in upper band storage with shape ``(3, m)``
+    """
+
+    size = cb.shape[1]
+
+    # U[i, i], U[i, i + 1], U[i, i + 2]
+    u0 = cb[2]
+    u1 = cb[1, 1:]
+    u2 = cb[0, 2:]
+
+    # The unknowns are z[3i + k] = S[i, i + k]. The rows of the system for each i:
+    #   U[i, i] S[i, i] + U[i, i + 1] S[i, i + 1] + U[i, i + 2] S[i, i + 2] = 1 / U[i, i]
+    #   U[i, i] S[i, i + 1] + U[i, i + 1] S[i + 1, i + 1] + U[i, i + 2] S[i + 1, i + 2] = 0
+    #   U[i, i] S[i, i + 2] + U[i, i + 1] S[i + 1, i + 2] + U[i, i + 2] S[i + 2, i + 2] = 0
+    # The system matrix in upper band storage (Fortran order) is the C-ordered array (size, 3, 5)
+    # indexed by (i, k, 4 - (column - row)) for the column 3i + k.
+    band_t = np.zeros((size, 3, 5))
+
+    band_t[:, :, 4] = u0[:, np.newaxis]
+    band_t[:-1, 1, 3] = u1
+    band_t[:-2, 2, 2] = u2
+    band_t[1:, 0, 2] = u1
+    band_t[1:, 1, 2] = u1
+    band_t[1:-1, 1, 1] = u2
+    band_t[2:, 0, 0] = u2
+
+    band = band_t.reshape(-1, 5).T
+
+    rhs = np.zeros((size, 3))
+    rhs[:, 0] = 1. / u0
+
+    # The pivots are not used without the lower factor
+    piv = np.arange(1, band.shape[1] + 1, dtype=np.int32)
+
+    gbtrs, = la.get_lapack_funcs(('gbtrs',), (band,))
+    z, info = gbtrs(band, 0, 4, rhs.reshape(-1, 1), piv, overwrite_b=True)
+    z = z.reshape(size, 3)
+
+    sb = np.zeros((3, size))
+    sb[2] = z[:, 0]
+    sb[1, 1:] = z[:-1, 1]
+    sb[0, 2:] = z[:-2, 2]
+
+    return sb
@@ -6,12 +6,15 @@ The base classes and interfaces
 """
 
 import abc
-from typing import Generic, Tuple, Optional
+from typing import Generic, Tuple, Optional, TYPE_CHECKING
 
 import numpy as np
 
 from ._types import TData, TProps, TSmooth, TXi, TNu, TExtrapolate, TSpline
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .aio import AsyncRunner  # noqa
+
 
 class ISplinePPForm(abc.ABC, Generic[TData, TProps]):
     """The interface class for spline representation in PP-form
@@ -85,6 +88,14 @@ class ISplinePPForm(abc.ABC, Generic[TData, TProps]):
             The source data shape
         """
 
+    async def evaluate_async(self, xi, *args, runner: Optional['AsyncRunner'] = None, **kwargs) -> np.ndarray:
+        """Evaluates the spline in the executor without blocking the event loop
+
+        The arguments are the same as for ``__call__``. See :func:`csaps.aio.evaluate_async`.
+        """
+        from .aio import evaluate_async
+        return await evaluate_async(self, xi, *args, runner=runner, **kwargs)
+
 
 class ISmoothingSpline(abc.ABC, Generic[TSpline, TSmooth, TXi, TNu, TExtrapolate]):
     """The interface class for smooting splines
@@ -111,3 +122,11 @@ class ISmoothingSpline(abc.ABC, Generic[TSpline, TSmooth, TXi, TNu, TExtrapolate
                  extrapolate: Optional[TExtrapolate] = None) -> np.ndarray:
         """Evaluates spline on the data sites
         """
+
+    async def evaluate_async(self, xi, *args, runner: Optional['AsyncRunner'] = None, **kwargs) -> np.ndarray:
+        """Evaluates the spline in the executor without blocking the event loop
+
+        The arguments are the same as for ``__call__``. See :func:`csaps.aio.evaluate_async`.
+        """
+        from .aio import evaluate_async
+        return await evaluate_async(self, xi, *args, runner=runner, **kwargs)
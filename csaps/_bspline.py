@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cubic B-spline routines for penalized regression splines with the reduced knots
+
+The natural cubic spline with K knots is represented in the cubic B-spline basis with
+the natural end conditions (zero 2nd derivatives at the end knots) eliminated.
+Every data site touches 4 basis functions, so the normal equations matrix and
+the roughness penalty matrix have 3 super-diagonals. They are assembled directly
+into LAPACK upper band storage in O(n + K) time where n is the number of data sites.
+
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+# The number of the super-diagonals of the cubic B-spline matrices
+_BANDS = 3
+
+
+def augment_knots(knots: np.ndarray) -> np.ndarray:
+    """Returns the cubic B-spline knots vector with the end knots repeated 4 times
+    """
+    return np.r_[[knots[0]] * _BANDS, knots, [knots[-1]] * _BANDS]
+
+
+def knots_intervals(knots: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Returns the indices of the knots intervals for the points (the last interval is closed)
+    """
+    return np.clip(np.searchsorted(knots, x, side='right') - 1, 0, knots.size - 2)
+
+
+def bspline_basis(tk: np.ndarray, ell: np.ndarray, x: np.ndarray, nu: int = 0) -> np.ndarray:
+    """Evaluates the non-zero cubic B-splines (or their derivatives) at the points
+
+    Parameters
+    ----------
+    tk : np.ndarray
+        The augmented knots vector (see :func:`augment_knots`)
+    ell : np.ndarray
+        The indices of the augmented knots intervals ``tk[ell] <= x < tk[ell + 1]``
+    x : np.ndarray
+        The points vector
+    nu : int
+        The order of the derivative
+
+    Returns
+    -------
+    basis : np.ndarray
+        The array with shape ``(4, x.size)`` of the values of the B-splines ``ell - 3, ..., ell``
+    """
+
+    k = _BANDS
+    basis = np.zeros((k + 1, x.size))
+    basis[0] = 1.
+
+    # The local knots tk[ell - 2], ..., tk[ell + 3]
+    local_knots = [tk[ell + i] for i in range(1 - k, k + 1)]
+
+    # Cox-de Boor recursion for the degree k - nu and the derivatives recursion for the rest
+    for j in range(1, k + 1):
+        prev = basis[:j].copy()
+        basis[0] = 0.
+
+        for n in range(1, j + 1):
+            xb = local_knots[n + k - 1]
+            xa = local_knots[n - j + k - 1]
+
+            if j <= k - nu:
+                w = prev[n - 1] / (xb - xa)
+                basis[n - 1] += w * (xb - x)
+                basis[n] = w * (x - xa)
+            else:
+                w = j * prev[n - 1] / (xb - xa)
+                basis[n - 1] -= w
+                basis[n] = w
+
+    return basis
+
+
+def _add_band_products(band: np.ndarray, index: np.ndarray, left: np.ndarray, right: np.ndarray,
+                       starts: Optional[np.ndarray] = None) -> None:
+    """Adds the products ``left[a] * right[b]`` to the items ``(index + a, index + b)``, ``a <= b``
+    of the symmetric matrix in upper band storage
+
+    The indices must be unique. If ``starts`` is given, the products are summed over the contiguous
+    runs of the items starting at ``starts`` and ``index`` contains the indices of the runs.
+    """
+    for d in range(_BANDS + 1):
+        for a in range(_BANDS + 1 - d):
+            products = left[a] * right[a + d]
+            if starts is not None:
+                products = np.add.reduceat(products, starts)
+            band[_BANDS - d, index + a + d] += products
+
+
+def normal_band_matrices(knots: np.ndarray, x: np.ndarray, w: np.ndarray, y: np.ndarray,
+                         block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Assembles the normal equations ``B^T W B`` and ``B^T W y`` of the B-spline least-squares fit
+
+    Parameters
+    ----------
+    knots : np.ndarray
+        The knots vector with size ``K`` (``knots[0] <= x[0]`` and ``x[-1] <= knots[-1]``)
+    x : np.ndarray
+        The sorted data sites vector with size ``n``
+    w : np.ndarray
+        The weights vector with size ``n``
+    y : np.ndarray
+        The data values 2-D array with shape ``(n, M)``
+    block_size : int
+        The number of the data items processed at once (bounds the temporary memory)
+
+    Returns
+    -------
+    gram_band : np.ndarray
+        The matrix ``B^T W B`` in upper band storage with shape ``(4, K + 2)``
+    rhs : np.ndarray
+        The right-hand side ``B^T W y`` with shape ``(K + 2, M)``
+    """
+
+    tk = augment_knots(knots)
+    size = knots.size + 2
+
+    gram_band = np.zeros((_BANDS + 1, size))
+    rhs = np.zeros((size, y.shape[1]))
+
+    block_rows = max(1, block_size // y.shape[1])
+
+    for start in range(0, x.size, block_rows):
+        block = slice(start, start + block_rows)
+        xb = x[block]
+
+        index = knots_intervals(knots, xb)
+        basis = bspline_basis(tk, index + _BANDS, xb)
+        w_basis = w[block] * basis
+
+        # The data sites are sorted, so the intervals of the block are the contiguous runs
+        intervals, starts = np.unique(index, return_index=True)
+
+        _add_band_products(gram_band, intervals, w_basis, basis, starts)
+
+        yb = y[block]
+
+        for a in range(_BANDS + 1):
+            rhs[intervals + a] += np.add.reduceat(w_basis[a, :, None] * yb, starts, axis=0)
+
+    return gram_band, rhs
+
+
+def penalty_band_matrix(knots: np.ndarray) -> np.ndarray:
+    """Assembles the roughness penalty matrix ``integral(B''(x) B''(x)^T dx)`` in upper band storage
+
+    The 2nd derivatives of the cubic B-splines are linear on the knots intervals,
+    so the integrals are computed exactly from the values at the intervals ends.
+
+    Parameters
+    ----------
+    knots : np.ndarray
+        The knots vector with size ``K``
+
+    Returns
+    -------
+    penalty_band : np.ndarray
+        The penalty matrix in upper band storage with shape ``(4, K + 2)``
+    """
+
+    tk = augment_knots(knots)
+    index = np.arange(knots.size - 1)
+    ell = index + _BANDS
+    h = np.diff(knots)
+
+    d0 = bspline_basis(tk, ell, knots[:-1], nu=2)
+    d1 = bspline_basis(tk, ell, knots[1:], nu=2)
+
+    penalty_band = np.zeros((_BANDS + 1, knots.size + 2))
+
+    # integral(f * g) = h/6 * ((2 f0 + f1) g0 + (f0 + 2 f1) g1) for linear f, g on the interval
+    _add_band_products(penalty_band, index, h / 6. * (2. * d0 + d1), d0)
+    _add_band_products(penalty_band, index, h / 6. * (d0 + 2. * d1), d1)
+
+    return penalty_band
+
+
+def natural_basis_transform(knots: np.ndarray) -> sp.csr_matrix:
+    """Returns the sparse matrix ``T`` that maps the natural spline coefficients to the B-spline coefficients
+
+    The natural end conditions ``s''(knots[0]) = s''(knots[-1]) = 0`` eliminate the first
+    and the last B-spline coefficients, the matrix has the shape ``(K + 2, K)``.
+    The transformed matrices ``T^T A T`` keep 3 super-diagonals.
+    """
+
+    tk = augment_knots(knots)
+    size = knots.size + 2
+    last = knots.size - 2
+
+    d = bspline_basis(tk, np.array([_BANDS]), knots[:1], nu=2)[:, 0]
+    e = bspline_basis(tk, np.array([last + _BANDS]), knots[-1:], nu=2)[:, 0]
+
+    rows = np.r_[0, 0, np.arange(1, size - 1), size - 1, size - 1]
+    cols = np.r_[0, 1, np.arange(size - 2), size - 4, size - 3]
+    data = np.r_[-d[1] / d[0], -d[2] / d[0], np.ones(size - 2), -e[1] / e[3], -e[2] / e[3]]
+
+    return sp.csr_matrix((data, (rows, cols)), shape=(size, size - 2))
+
+
+def band_to_sparse(ab: np.ndarray) -> sp.csr_matrix:
+    """Converts the symmetric matrix in upper band storage to the sparse matrix
+    """
+    u, size = ab.shape[0] - 1, ab.shape[1]
+
+    diags = [ab[u - d, d:] for d in range(u + 1)]
+    upper = sp.diags(diags, list(range(u + 1)), shape=(size, size), format='csr')
+
+    return upper + sp.triu(upper, k=1, format='csr').T
+
+
+def sparse_to_band(a: sp.spmatrix, bands: int = _BANDS) -> np.ndarray:
+    """Converts the symmetric sparse matrix to upper band storage with the given number of super-diagonals
+    """
+    ab = np.zeros((bands + 1, a.shape[0]))
+    for d in range(bands + 1):
+        ab[bands - d, d:] = a.diagonal(d)
+    return ab
+
+
+def bspline_ppoly_coeffs(knots: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Converts the cubic B-spline coefficients to the piecewise polynomial coefficients
+
+    Parameters
+    ----------
+    knots : np.ndarray
+        The knots vector with size ``K``
+    c : np.ndarray
+        The B-spline coefficients with shape ``(K + 2, M)``
+
+    Returns
+    -------
+    coeffs : np.ndarray
+        The piecewise polynomial coefficients (the highest degree first) with shape ``(4, K - 1, M)``
+    """
+
+    tk = augment_knots(knots)
+    pieces = knots.size - 1
+    ell = np.arange(pieces) + _BANDS
+
+    # The coefficients of the 4 non-zero B-splines for every piece
+    window = np.stack([c[a:a + pieces] for a in range(_BANDS + 1)])
+
+    coeffs = np.empty((_BANDS + 1, pieces, c.shape[1]))
+    factorial = 1.
+
+    for nu in range(_BANDS + 1):
+        basis = bspline_basis(tk, ell, knots[:-1], nu=nu)
+        coeffs[_BANDS - nu] = np.einsum('ak,akm->km', basis, window) / factorial
+        factorial *= nu + 1
+
+    return coeffs
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in instrumentation of the fitting and evaluating phases
+
+The phases are reported to the registered hooks as :class:`PhaseRecord` instances.
+When no hooks are registered, the phases cost a single check.
+
+"""
+
+import contextlib
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+HookType = Callable[['PhaseRecord'], None]
+
+
+class PhaseRecord(NamedTuple):
+    """The instrumentation record of the fitting or evaluating phase"""
+
+    name: str
+    """The phase name (for example, 'umv.factorize' or 'ndg.fit_axis')"""
+
+    elapsed: float
+    """The phase wall time in seconds"""
+
+    allocated: Optional[int]
+    """The peak memory allocated in the phase in bytes above the memory at the phase start
+    or None if the memory tracing is disabled (see :func:`instrument`). Before Python 3.9
+    the peak can include the peaks of the previous phases."""
+
+    sizes: Dict[str, Any]
+    """The problem sizes and parameters of the phase (for example, the number of data sites,
+    the number of data columns and the linear solver engine)"""
+
+
+_lock = threading.Lock()
+_hooks: Tuple[HookType, ...] = ()
+_local = threading.local()
+
+
+def add_instrument_hook(hook: HookType) -> HookType:
+    """Registers the hook that is called with :class:`PhaseRecord` for each completed phase
+
+    The hooks are called in the thread where the phase is completed (including the worker threads).
+
+    Parameters
+    ----------
+
+    hook : Callable[[PhaseRecord], None]
+        The hook function
+
+    Returns
+    -------
+
+    hook : Callable[[PhaseRecord], None]
+        The same hook function (the function can be used as a decorator)
+    """
+
+    global _hooks
+
+    with _lock:
+        _hooks = _hooks + (hook,)
+    return hook
+
+
+def remove_instrument_hook(hook: HookType) -> None:
+    """Unregisters the hook registered by :func:`add_instrument_hook`
+
+    Parameters
+    ----------
+
+    hook : Callable[[PhaseRecord], None]
+        The hook function
+    """
+
+    global _hooks
+
+    with _lock:
+        if hook not in _hooks:
+            raise ValueError('The hook is not registered')
+
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+
+
+@contextlib.contextmanager
+def instrument(hook: Optional[HookType] = None, memory: bool = False) -> Iterator[List[PhaseRecord]]:
+    """The context manager collecting the records of the fitting and evaluating phases
+
+    The collecting hook is registered for the process (see :func:`add_instrument_hook`), so
+    the records of the phases completed in all threads while the context is active are collected,
+    including the worker threads of the fits and the fits running concurrently in other threads.
+    The concurrent contexts collect the same records.
+
+    Parameters
+    ----------
+
+    hook : [*Optional*] Callable[[PhaseRecord], None]
+        The additional hook function called for each record in the context
+
+    memory : [*Optional*] bool
+        If True, the allocated memory is traced by :mod:`tracemalloc` in the context.
+        The memory tracing slows down the computations significantly.
+
+    Yields
+    ------
+
+    records : List[PhaseRecord]
+        The list of the phases records (it is filled in the context)
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        import csaps
+
+        with csaps.instrument(memory=True) as records:
+            yi = csaps.csaps(x, y, xi, smooth=0.8)
+
+        for record in records:
+            print(record.name, record.elapsed, record.allocated, record.sizes)
+
+    """
+
+    records = []
+
+    def collect(record: PhaseRecord):
+        records.append(record)
+        if hook is not None:
+            hook(record)
+
+    start_tracing = False
+
+    if memory:
+        start_tracing = not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+
+    add_instrument_hook(collect)
+
+    try:
+        yield records
+    finally:
+        remove_instrument_hook(collect)
+
+        if start_tracing:
+            tracemalloc.stop()
+
+
+class _Phase:
+    """The active phase measuring the wall time and the allocated memory
+    """
+
+    __slots__ = ('name', 'sizes', '_start', '_memory_start', '_peak')
+
+    def __init__(self, name: str, sizes: Dict[str, Any]):
+        self.name = name
+        self.sizes = sizes
+
+    def update(self, **sizes: Any) -> None:
+        """Updates the problem sizes known inside the phase
+        """
+        self.sizes.update(sizes)
+
+    def __enter__(self) -> '_Phase':
+        if tracemalloc.is_tracing():
+            stack = _phases_stack()
+            current, peak = tracemalloc.get_traced_memory()
+
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+
+            self._memory_start = current
+            self._peak = current
+            stack.append(self)
+        else:
+            self._memory_start = None
+
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        allocated = None
+
+        if self._memory_start is not None:
+            stack = _phases_stack()
+            stack.pop()
+
+            if tracemalloc.is_tracing():
+                self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+                allocated = self._peak - self._memory_start
+
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, self._peak)
+
+        if exc_type is None:
+            record = PhaseRecord(self.name, elapsed, allocated, self.sizes)
+            for hook in _hooks:
+                hook(record)
+
+
+class _NullPhase:
+    """The disabled phase (no hooks are registered)
+    """
+
+    __slots__ = ()
+
+    def update(self, **sizes: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NullPhase':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def _phases_stack() -> List[_Phase]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def phase(name: str, lazy_sizes: Optional[Callable[[], Dict[str, Any]]] = None, **sizes: Any):
+    """Returns the context manager of the instrumented phase
+
+    The phase is reported to the hooks on the successful exit. If no hooks are registered,
+    the shared no-op context manager is returned.
+
+    The sizes that are not free to compute (on the hot evaluating paths) are passed as ``lazy_sizes``
+    function returning the sizes dict. The function is called only if the hooks are registered.
+    """
+    if not _hooks:
+        return _NULL_PHASE
+    if lazy_sizes is not None:
+        sizes.update(lazy_sizes())
+    return _Phase(name, sizes)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+"""
+Piecewise cubic polynomials compression by the tolerance-driven breaks removal
+
+The breaks are removed in the alternating passes: every other interior break is tried
+at once and the adjacent pieces are replaced by the cubic Hermite piece with the values
+and the 1st derivatives of the original spline at the remaining breaks (the compressed spline
+is C1-continuous). The break is removed if the maximum deviation from the original spline
+on the merged pieces is not greater than the tolerance. The maximum deviation of the cubic
+difference on every original piece is computed exactly using the roots of its derivative.
+
+"""
+
+from typing import Callable, Tuple
+
+import numpy as np
+
+# The order of the compressed pieces (cubic)
+_ORDER = 4
+
+# The maximum number of the coefficients items processed at once
+_BLOCK_SIZE = 2 ** 20
+
+PieceErrorsType = Callable[[np.ndarray], np.ndarray]
+
+
+def cubic_coeffs(coeffs: np.ndarray) -> np.ndarray:
+    """Returns float64 coefficients with shape ``(4, N, M)`` padding the lower order with zeros
+
+    The input array has the shape ``(k, N, M)`` with the order ``k <= 4``.
+    """
+    order = coeffs.shape[0]
+
+    if order > _ORDER:
+        raise ValueError(f'Only the splines with the order less or equal {_ORDER} can be compressed')
+
+    c = np.zeros((_ORDER,) + coeffs.shape[1:])
+    c[_ORDER - order:] = coeffs
+    return c
+
+
+def _breaks_values(breaks: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the values and the 1st derivatives of the spline at the breaks with shape ``(N + 1, M)``
+    """
+    values = np.empty((breaks.size, c.shape[2]))
+    slopes = np.empty_like(values)
+
+    values[:-1] = c[3]
+    slopes[:-1] = c[2]
+
+    # The right end of the last piece
+    a, b, cc, d = c[:, -1]
+    h = breaks[-1] - breaks[-2]
+
+    values[-1] = ((a * h + b) * h + cc) * h + d
+    slopes[-1] = (3. * a * h + 2. * b) * h + cc
+
+    return values, slopes
+
+
+def _hermite_coeffs(h: np.ndarray, y0: np.ndarray, y1: np.ndarray, m0: np.ndarray, m1: np.ndarray) -> np.ndarray:
+    """Returns the coefficients of the cubic Hermite pieces with the lengths ``h``
+    """
+    h = h[:, np.newaxis]
+    dy = (y1 - y0) / h
+
+    return np.stack((
+        (m0 + m1 - 2. * dy) / (h * h),
+        (3. * dy - 2. * m0 - m1) / h,
+        m0,
+        y0,
+    ))
+
+
+def _cubic_max_abs(d: np.ndarray, h: np.ndarray) -> np.ndarray:
+    """Returns the maximum absolute values of the cubic polynomials ``d`` with shape ``(4, P, M)``
+    on the intervals ``[0, h]``
+    """
+    d3, d2, d1, _ = d
+    h = h[:, np.newaxis]
+
+    # The roots of the derivative 3 d3 t^2 + 2 d2 t + d1
+    qa, qb = 3. * d3, 2. * d2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disc = np.sqrt(np.maximum(qb * qb - 4. * qa * d1, 0.))
+        linear = qa == 0.
+
+        roots = (
+            np.where(linear, -d1 / qb, (-qb + disc) / (2. * qa)),
+            np.where(linear, -d1 / qb, (-qb - disc) / (2. * qa)),
+        )
+
+    def value(t):
+        return ((d3 * t + d2) * t + d1) * t + d[3]
+
+    max_abs = np.maximum(np.abs(d[3]), np.abs(value(h)))
+
+    for t in roots:
+        t = np.clip(np.where(np.isfinite(t), t, 0.), 0., h)
+        np.maximum(max_abs, np.abs(value(t)), out=max_abs)
+
+    return max_abs
+
+
+def _pieces_errors(breaks: np.ndarray, c: np.ndarray, values: np.ndarray, slopes: np.ndarray,
+                   pieces: np.ndarray, first: np.ndarray, last: np.ndarray,
+                   piece_errors: PieceErrorsType) -> np.ndarray:
+    """Returns the errors of the original pieces approximated by the Hermite pieces
+    on the segments ``[breaks[first], breaks[last]]`` containing them
+    """
+    errors = np.empty(pieces.size)
+    block = max(1, _BLOCK_SIZE // c.shape[2])
+
+    for start in range(0, pieces.size, block):
+        sl = slice(start, start + block)
+        p, i0, i1 = pieces[sl], first[sl], last[sl]
+
+        hermite = _hermite_coeffs(breaks[i1] - breaks[i0], values[i0], values[i1], slopes[i0], slopes[i1])
+
+        # Taylor expansion of the Hermite pieces at the original breaks
+        s = (breaks[p] - breaks[i0])[:, np.newaxis]
+        a, b, cc, d = hermite
+
+        diff = c[:, p] - np.stack((
+            a,
+            3. * a * s + b,
+            (3. * a * s + 2. * b) * s + cc,
+            ((a * s + b) * s + cc) * s + d,
+        ))
+
+        errors[sl] = piece_errors(_cubic_max_abs(diff, breaks[p + 1] - breaks[p]))
+
+    return errors
+
+
+def compress_breaks(breaks: np.ndarray, c: np.ndarray, tol: float,
+                    piece_errors: PieceErrorsType) -> Tuple[np.ndarray, np.ndarray]:
+    """Removes the breaks of the piecewise cubic polynomial while the deviation is within the tolerance
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The breaks vector with size ``N + 1``
+    c : np.ndarray
+        The cubic coefficients with shape ``(4, N, M)`` (see :func:`cubic_coeffs`)
+    tol : float
+        The maximum deviation of the compressed pieces
+    piece_errors : Callable[[np.ndarray], np.ndarray]
+        The function that reduces the maximum absolute deviations of the pieces with shape ``(P, M)``
+        to the errors of the pieces with shape ``(P,)``
+
+    Returns
+    -------
+    kept : np.ndarray
+        The boolean mask of the kept breaks
+    coeffs : np.ndarray
+        The compressed coefficients with shape ``(4, S, M)`` where ``S = kept.sum() - 1``
+    """
+
+    size = breaks.size
+    values, slopes = _breaks_values(breaks, c)
+
+    kept = np.ones(size, dtype=bool)
+    parity = 1
+    idle_passes = 0
+
+    while idle_passes < 2:
+        indices = np.flatnonzero(kept)
+
+        # The candidate breaks are every other interior break, so the merged segments do not overlap
+        positions = np.arange(2 - parity, indices.size - 1, 2)
+        parity ^= 1
+
+        if positions.size == 0:
+            idle_passes += 1
+            continue
+
+        first = indices[positions - 1]
+        last = indices[positions + 1]
+
+        # The original pieces of the merged segments
+        counts = last - first
+        segments = np.repeat(np.arange(positions.size), counts)
+        pieces = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[segments]
+
+        errors = _pieces_errors(breaks, c, values, slopes, pieces, first[segments], last[segments], piece_errors)
+        segment_errors = np.maximum.reduceat(errors, np.cumsum(counts) - counts)
+
+        removed = positions[segment_errors <= tol]
+
+        if removed.size > 0:
+            kept[indices[removed]] = False
+            idle_passes = 0
+        else:
+            idle_passes += 1
+
+    indices = np.flatnonzero(kept)
+    i0, i1 = indices[:-1], indices[1:]
+
+    coeffs = _hermite_coeffs(breaks[i1] - breaks[i0], values[i0], values[i1], slopes[i0], slopes[i1])
+
+    # The segments of the single pieces are kept as is
+    single = (i1 - i0) == 1
+    coeffs[:, single] = c[:, i0[single]]
+
+    return kept, coeffs
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized piecewise polynomial evaluation routines
+
+"""
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# The relative tolerance of the breaks spacing deviations for the uniform breaks
+UNIFORM_RTOL = 1e-9
+
+
+def bisect_intervals(breaks: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Finds the intervals for the points using vectorized binary search
+
+    Every row of ``breaks`` is searched independently, so the function
+    can be used for the stack of piecewise polynomials with different breaks.
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The 2-D array of the breaks with shape ``(batch, n)``.
+        Every row must be sorted in ascending order.
+    x : np.ndarray
+        The 2-D array of the points with shape ``(batch, m)``
+
+    Returns
+    -------
+    indices : np.ndarray
+        The 2-D array with shape ``(batch, m)`` of the interval indices in range ``[0, n - 2]``.
+        The intervals are half-open ``[a, b)`` except the last one, the points
+        which are out of bounds are assigned to the first and the last intervals.
+    """
+
+    n = breaks.shape[-1]
+    rows = np.arange(breaks.shape[0])[:, np.newaxis]
+
+    lo = np.zeros(x.shape, dtype=np.intp)
+    hi = np.full(x.shape, n - 1, dtype=np.intp)
+
+    # Invariant: breaks[lo] <= x (or lo == 0) and x < breaks[hi] (or hi == n - 1)
+    for _ in range(int(np.ceil(np.log2(max(n - 1, 1))))):
+        mid = (lo + hi) // 2
+        right = x >= breaks[rows, mid]
+        lo = np.where(right, mid, lo)
+        hi = np.where(right, hi, mid)
+
+    return lo
+
+
+def bisect_segments(breaks: np.ndarray, first: np.ndarray, last: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Finds the intervals for the points in the segments of the concatenated breaks
+
+    Every point is searched in its own segment ``breaks[first:last + 1]`` using vectorized
+    binary search, so the function can be used for many piecewise polynomials with
+    different breaks packed in one array.
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The concatenated breaks vector, every segment must be sorted in ascending order
+    first : np.ndarray
+        The indices of the first breaks of the segments for the points
+    last : np.ndarray
+        The indices of the last breaks of the segments for the points
+    x : np.ndarray
+        The points array with the same shape as ``first`` and ``last``
+
+    Returns
+    -------
+    indices : np.ndarray
+        The indices of the interval first breaks in range ``[first, last - 1]``.
+        The points which are out of bounds are assigned to the first and the last intervals.
+    """
+
+    lo = np.array(first, dtype=np.intp)
+    hi = np.array(last, dtype=np.intp)
+
+    if lo.size == 0:
+        return lo
+
+    # Invariant: breaks[lo] <= x (or lo == first) and x < breaks[hi] (or hi == last)
+    for _ in range(int(np.ceil(np.log2(max(int((hi - lo).max()), 1))))):
+        mid = (lo + hi) // 2
+        right = x >= breaks[mid]
+        lo = np.where(right, mid, lo)
+        hi = np.where(right, hi, mid)
+
+    return lo
+
+
+def uniform_step(dx: np.ndarray) -> Optional[float]:
+    """Returns the step of the uniform (evenly spaced) breaks or None for non-uniform breaks
+
+    Parameters
+    ----------
+    dx : np.ndarray
+        The vector of the breaks differences
+
+    Returns
+    -------
+    step : float, None
+        The breaks step if all breaks differences are equal within ``UNIFORM_RTOL`` relative tolerance
+    """
+
+    if dx.size == 0:
+        return None
+
+    step = dx.mean()
+    if not step > 0.:
+        return None
+
+    return float(step) if np.abs(dx - step).max() <= UNIFORM_RTOL * step else None
+
+
+def uniform_intervals(breaks: np.ndarray, step: float, x: np.ndarray) -> np.ndarray:
+    """Finds the intervals for the points in the uniform breaks in O(1) time per point
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The uniform breaks vector with size ``m + 1``
+    step : float
+        The breaks step computed by :func:`uniform_step`
+    x : np.ndarray
+        The points vector
+
+    Returns
+    -------
+    indices : np.ndarray
+        The interval indices in range ``[0, m - 1]``, the points which are out of bounds
+        are assigned to the first and the last intervals.
+    """
+
+    pieces = breaks.size - 1
+
+    t = np.subtract(x, breaks[0])
+    t *= 1. / step
+    np.clip(t, 0, pieces - 1, out=t)
+
+    # NaN points are assigned to the first interval, NaN values are propagated via the local coordinates
+    t[np.isnan(t)] = 0.
+
+    indices = t.astype(np.intp)
+
+    # The breaks deviate from the uniform grid because of round-off errors,
+    # so the intervals for the points near the breaks are checked explicitly
+    tol = pieces * (UNIFORM_RTOL + 16. * np.finfo(np.float64).eps)
+    t -= indices
+    near = np.flatnonzero((t < tol) | (t > 1. - tol))
+
+    if near.size > 0:
+        near_indices = indices[near]
+        near_x = x[near]
+
+        near_indices -= (near_x < breaks[near_indices]) & (near_indices > 0)
+        near_indices += (near_x >= breaks[near_indices + 1]) & (near_indices < pieces - 1)
+        indices[near] = near_indices
+
+    return indices
+
+
+def merge_intervals(breaks: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Finds the intervals for the sorted points merging them with the breaks
+
+    The intervals are expanded by the counts of the points between the inner breaks.
+    The counts are found by searching the inner breaks in the points in ``O(m log n)`` time
+    if it is cheaper than the linear merge, otherwise the sorted points and the breaks are
+    merged by the stable sort of their concatenation that merges the two sorted runs
+    in ``O(n + m)`` time, so the lookup is never worse than linear.
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The breaks vector with size ``m + 1`` sorted in ascending order
+    x : np.ndarray
+        The points vector sorted in ascending order
+
+    Returns
+    -------
+    indices : np.ndarray
+        The interval indices in range ``[0, m - 1]``, the points which are out of bounds
+        are assigned to the first and the last intervals.
+    """
+
+    pieces = breaks.size - 1
+    inner = breaks[1:-1]
+
+    if inner.size * math.log2(max(x.size, 2)) > x.size + inner.size:
+        # The inner breaks precede the equal points in the merged order, so the interval
+        # of the point is the number of the inner breaks before it in the merged order
+        order = np.argsort(np.concatenate((inner, x)), kind='stable')
+        return np.flatnonzero(order >= inner.size) - np.arange(x.size)
+
+    bounds = np.empty(pieces + 1, dtype=np.intp)
+    bounds[0] = 0
+    bounds[-1] = x.size
+    bounds[1:-1] = np.searchsorted(x, inner, side='left')
+
+    return np.repeat(np.arange(pieces), np.diff(bounds))
+
+
+def derivative_coeffs(coeffs: np.ndarray, nu: int) -> np.ndarray:
+    """Returns the coefficients of ``nu``-th derivative of the polynomials
+
+    Parameters
+    ----------
+    coeffs : np.ndarray
+        The coefficients array with shape ``(k, ...)`` where ``k`` is the polynomial order,
+        the coefficients are sorted from the highest power to the lowest
+    nu : int
+        Order of derivative
+
+    Returns
+    -------
+    coeffs : np.ndarray
+        The coefficients array with shape ``(k - nu, ...)`` or ``(1, ...)`` zeros
+        if ``nu >= k``
+    """
+
+    if nu == 0:
+        return coeffs
+
+    order = coeffs.shape[0]
+
+    if nu >= order:
+        return np.zeros((1,) + coeffs.shape[1:], dtype=coeffs.dtype)
+
+    powers = np.arange(order - 1, nu - 1, -1)
+    factor = np.ones(powers.size)
+    for i in range(nu):
+        factor *= powers - i
+
+    factor = factor.reshape((-1,) + (1,) * (coeffs.ndim - 1))
+    return coeffs[:order - nu] * factor.astype(coeffs.dtype, copy=False)
+
+
+def evaluate_local(coeffs: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluates the polynomials in the local coordinates using Horner's scheme
+
+    Parameters
+    ----------
+    coeffs : np.ndarray
+        The coefficients array with shape ``(k, ...)``, the coefficients are sorted
+        from the highest power to the lowest
+    t : np.ndarray
+        The local coordinates (offsets from the polynomial breaks) broadcastable
+        to ``coeffs.shape[1:]``
+
+    Returns
+    -------
+    values : np.ndarray
+        The evaluated values
+    """
+
+    values = coeffs[0] * np.ones_like(t, dtype=coeffs.dtype)
+    for c in coeffs[1:]:
+        values = values * t + c
+    return values
+
+
+def ppoly_output(values: np.ndarray, x_shape: Tuple[int, ...], c_shape: Tuple[int, ...], axis: int) -> np.ndarray:
+    """Reshapes the evaluated values to the layout of SciPy ``PPoly`` output
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The values array with shape ``(L..., n, M)`` where ``L...`` are leading dimensions
+        (for example, the derivative orders), ``n`` is the number of the points and ``M``
+        is the product of the data dimensions
+    x_shape : tuple
+        The shape of the points array
+    c_shape : tuple
+        The shape of the coefficients array ``(k, m, ...)``
+    axis : int
+        The interpolation axis
+
+    Returns
+    -------
+    values : np.ndarray
+        The values array with the points dimensions at the interpolation axis
+        (after the leading dimensions)
+    """
+
+    lead_shape = values.shape[:-2]
+    lead_ndim = len(lead_shape)
+    x_ndim = len(x_shape)
+
+    values = values.reshape(lead_shape + x_shape + c_shape[2:])
+
+    if axis != 0:
+        axes = list(range(lead_ndim, values.ndim))
+        axes = axes[x_ndim:x_ndim + axis] + axes[:x_ndim] + axes[x_ndim + axis:]
+        values = values.transpose(list(range(lead_ndim)) + axes)
+
+    return values
+
+
+def find_intervals(breaks: np.ndarray,
+                   x: np.ndarray,
+                   step: Optional[float] = None,
+                   assume_sorted: bool = False) -> np.ndarray:
+    """Finds the intervals for the points
+
+    The intervals are found by the binary search, by the arithmetic in O(1) time
+    per point if the breaks are uniform and ``step`` is given or by the linear merge
+    of the points and the breaks if the points are sorted.
+
+    Parameters
+    ----------
+    breaks : np.ndarray
+        The breaks vector with size ``m + 1``
+    x : np.ndarray
+        The points vector
+    step : [*Optional*] float
+        The step of the uniform breaks
+    assume_sorted : [*Optional*] bool
+        Whether the points are sorted in ascending order
+
+    Returns
+    -------
+    indices : np.ndarray
+        The interval indices in range ``[0, m - 1]``
+    """
+
+    if assume_sorted:
+        return merge_intervals(breaks, x)
+    if step is not None:
+        return uniform_intervals(breaks, step, x)
+
+    indices = np.searchsorted(breaks, x, side='right') - 1
+    np.clip(indices, 0, breaks.size - 2, out=indices)
+
+    return indices
+
+
+def evaluate_ppoly(coeffs: np.ndarray,
+                   breaks: np.ndarray,
+                   x: np.ndarray,
+                   nu: int,
+                   extrapolate: bool,
+                   out: np.ndarray,
+                   step: Optional[float] = None,
+                   assume_sorted: bool = False) -> None:
+    """Evaluates the piecewise polynomial keeping the coefficients dtype
+
+    The function is the NumPy counterpart of SciPy ``PPoly`` evaluation routine
+    which supports only float64 and complex128 coefficients. The local coordinates
+    are computed in float64 and then are cast to the coefficients dtype.
+
+    Parameters
+    ----------
+    coeffs : np.ndarray
+        The coefficients array with shape ``(k, m, M)``
+    breaks : np.ndarray
+        The breaks vector with size ``m + 1``
+    x : np.ndarray
+        The points vector with size ``n``
+    nu : int
+        Order of derivative, must be non-negative
+    extrapolate : bool
+        Whether to extrapolate to out-of-bounds points or to return NaNs
+    out : np.ndarray
+        The output array with shape ``(n, M)``
+    step : [*Optional*] float
+        The step of the uniform breaks (see :func:`find_intervals`)
+    assume_sorted : [*Optional*] bool
+        Whether the points are sorted in ascending order (see :func:`find_intervals`)
+    """
+
+    if nu < 0:
+        raise ValueError('Order of derivative cannot be negative')
+
+    indices = find_intervals(breaks, x, step, assume_sorted)
+
+    t = (x - breaks[indices]).astype(coeffs.dtype)[:, np.newaxis]
+    coeffs = derivative_coeffs(coeffs, nu)
+
+    # Horner's scheme gathering the coefficients of the intervals one by one
+    out[...] = np.take(coeffs[0], indices, axis=0)
+    for c in coeffs[1:]:
+        out *= t
+        out += np.take(c, indices, axis=0)
+
+    if not extrapolate:
+        out[(x < breaks[0]) | (x > breaks[-1])] = np.nan
+
+
+def evaluate_ppoly_derivatives(coeffs: np.ndarray,
+                               breaks: np.ndarray,
+                               x: np.ndarray,
+                               nu: Sequence[int],
+                               extrapolate: bool,
+                               out: np.ndarray,
+                               step: Optional[float] = None,
+                               assume_sorted: bool = False) -> None:
+    """Evaluates the piecewise polynomial and its derivatives of several orders in a single pass
+
+    The intervals for the points are found once and the coefficients of the intervals are
+    gathered once. The derivatives are computed by the extended Horner's scheme
+    accumulating the Taylor coefficients of the polynomials at the points.
+
+    Parameters
+    ----------
+    coeffs : np.ndarray
+        The coefficients array with shape ``(k, m, M)``
+    breaks : np.ndarray
+        The breaks vector with size ``m + 1``
+    x : np.ndarray
+        The points vector with size ``n``
+    nu : Sequence[int]
+        Orders of derivatives, each must be non-negative
+    extrapolate : bool
+        Whether to extrapolate to out-of-bounds points or to return NaNs
+    out : np.ndarray
+        The output array with shape ``(len(nu), n, M)``
+    step : [*Optional*] float
+        The step of the uniform breaks (see :func:`find_intervals`)
+    assume_sorted : [*Optional*] bool
+        Whether the points are sorted in ascending order (see :func:`find_intervals`)
+    """
+
+    if any(n < 0 for n in nu):
+        raise ValueError('Order of derivative cannot be negative')
+
+    indices = find_intervals(breaks, x, step, assume_sorted)
+    t = (x - breaks[indices]).astype(coeffs.dtype)[:, np.newaxis]
+
+    # The Taylor coefficients of the polynomials at the points up to the maximal order
+    max_nu = min(max(nu), coeffs.shape[0] - 1)
+    taylor = np.empty((max_nu + 1, x.size, coeffs.shape[2]), dtype=coeffs.dtype)
+
+    np.take(coeffs[0], indices, axis=0, out=taylor[0])
+
+    for j, c in enumerate(coeffs[1:], start=1):
+        # The coefficients of the orders greater than ``j`` are still zero
+        if j <= max_nu:
+            taylor[j] = taylor[j - 1]
+        for d in range(min(j, max_nu + 1) - 1, 0, -1):
+            taylor[d] *= t
+            taylor[d] += taylor[d - 1]
+        taylor[0] *= t
+        taylor[0] += np.take(c, indices, axis=0)
+
+    for i, n in enumerate(nu):
+        if n > max_nu:
+            out[i] = 0.
+        else:
+            np.multiply(taylor[n], math.factorial(n), out=out[i])
+
+    if not extrapolate:
+        out[:, (x < breaks[0]) | (x > breaks[-1])] = np.nan
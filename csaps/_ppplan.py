@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+
+"""
+Precomputed evaluation plans for the splines with the same breaks
+
+"""
+
+import math
+from typing import Optional, Union, Sequence, Tuple, Dict
+
+import numpy as np
+import scipy.sparse as sp
+
+from ._types import UnivariateDataType
+from ._ppeval import find_intervals, uniform_step, ppoly_output
+
+
+class EvaluationPlan:
+    """The evaluation plan for the univariate splines with the same breaks and the same points
+
+    The plan holds the intervals of the points and the powers of the local coordinates
+    as the sparse basis matrix with ``order`` non-zero items in each row. Evaluating a spline
+    with the plan is the product of the basis matrix and the spline coefficients without
+    searching the intervals.
+
+    Usually, the instance of this class is created by :meth:`SplinePPForm.plan` method
+    or :func:`make_evaluation_plan` function.
+
+    Parameters
+    ----------
+
+    breaks : np.ndarray
+        The breaks vector with size ``m + 1``
+
+    x : array-like
+        Points to evaluate the splines at
+
+    order : [*Optional*] int
+        The splines order (4 for cubic splines)
+
+    extrapolate : [*Optional*] bool or 'periodic'
+        If bool, determines whether to extrapolate to out-of-bounds points
+        based on first and last intervals, or to return NaNs. If 'periodic',
+        periodic extrapolation is used. Default is True.
+
+    assume_sorted : [*Optional*] bool
+        If True, the points are assumed to be sorted in ascending order (it is not checked)
+        and the intervals are found by the linear merge of the points and the breaks
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self,
+                 breaks: np.ndarray,
+                 x: UnivariateDataType,
+                 order: int = 4,
+                 extrapolate: Union[bool, str] = True,
+                 assume_sorted: bool = False) -> None:
+
+        breaks = np.asarray(breaks, dtype=np.float64)
+
+        if breaks.ndim != 1 or breaks.size < 2:
+            raise ValueError("'breaks' must be a vector with at least 2 items")
+        if order < 1:
+            raise ValueError("'order' must be positive")
+
+        x = np.asarray(x)
+        x_shape = x.shape
+        x = np.ascontiguousarray(x.ravel(), dtype=np.float64)
+
+        if extrapolate == 'periodic':
+            x = breaks[0] + (x - breaks[0]) % (breaks[-1] - breaks[0])
+            extrapolate = False
+            assume_sorted = False
+
+        indices = find_intervals(breaks, x, uniform_step(np.diff(breaks)), assume_sorted)
+
+        self._breaks = breaks
+        self._order = order
+        self._x_shape = x_shape
+        self._indices = indices
+        self._t = x - breaks[indices]
+        self._out_of_bounds = None if extrapolate else (x < breaks[0]) | (x > breaks[-1])
+        self._bases: Dict[Tuple[int, np.dtype], sp.csr_matrix] = {}
+
+    @property
+    def breaks(self) -> np.ndarray:
+        """Returns the breaks of the splines
+        """
+        return self._breaks
+
+    @property
+    def order(self) -> int:
+        """Returns the order of the splines
+        """
+        return self._order
+
+    @property
+    def size(self) -> int:
+        """Returns the number of the points
+        """
+        return self._indices.size
+
+    def basis(self, nu: int = 0, dtype: Union[np.dtype, str, type] = np.float64) -> sp.csr_matrix:
+        """Returns the sparse basis matrix for evaluating ``nu``-th derivative of the splines
+
+        The basis matrix has shape ``(n, order * m)`` where ``n`` is the number of the points
+        and ``m`` is the number of the spline pieces. The product of the matrix and the spline
+        coefficients array reshaped to ``(order * m, M)`` is the evaluated values. The basis
+        matrices are computed once and cached in the plan.
+
+        Parameters
+        ----------
+
+        nu : [*Optional*] int
+            Order of derivative. Must be non-negative.
+
+        dtype : [*Optional*] np.dtype
+            The basis matrix dtype (it should be equal to the spline coefficients dtype)
+
+        Returns
+        -------
+
+        basis : scipy.sparse.csr_matrix
+            The sparse basis matrix
+        """
+
+        if nu < 0:
+            raise ValueError('Order of derivative cannot be negative')
+
+        dtype = np.dtype(dtype)
+        key = (nu, dtype)
+
+        if key not in self._bases:
+            self._bases[key] = self._make_basis(nu, dtype)
+        return self._bases[key]
+
+    def evaluate(self, spline, nu: Union[int, Sequence[int]] = 0) -> np.ndarray:
+        """Evaluates the spline with the same breaks using the plan
+
+        Parameters
+        ----------
+
+        spline : SplinePPForm
+            The spline with the same breaks and order as the plan
+
+        nu : [*Optional*] int, Sequence[int]
+            Order of derivative to evaluate. Must be non-negative.
+            If it is a sequence of orders, the values for all orders are stacked along the new first axis.
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Evaluated values with the same shape as the spline evaluated values
+        """
+
+        coeffs = spline.c
+
+        if coeffs.shape[0] != self._order:
+            raise ValueError(f"The spline order ({coeffs.shape[0]}) must be equal to the plan order ({self._order})")
+        if spline.x is not self._breaks and not np.array_equal(spline.x, self._breaks):
+            raise ValueError('The spline breaks must be equal to the plan breaks')
+
+        coeffs_2d = coeffs.reshape(coeffs.shape[0] * coeffs.shape[1], -1)
+
+        if isinstance(nu, (int, np.integer)):
+            values = self._evaluate(coeffs_2d, nu)
+        else:
+            values = np.stack([self._evaluate(coeffs_2d, n) for n in nu])
+
+        return ppoly_output(values, self._x_shape, coeffs.shape, spline.axis)
+
+    def _evaluate(self, coeffs, nu):
+        values = self.basis(nu, coeffs.dtype) @ coeffs
+
+        if self._out_of_bounds is not None:
+            values[self._out_of_bounds] = np.nan
+        return values
+
+    def _make_basis(self, nu, dtype):
+        order = self._order
+        pieces = self._breaks.size - 1
+        size = self._indices.size
+
+        # The row of the basis for the point: d^nu/dt^nu (t^(k-1), ..., t, 1) at the interval columns
+        data = np.zeros((size, order), dtype=np.float64)
+
+        for j in range(order - nu):
+            power = order - 1 - j
+            factor = math.factorial(power) // math.factorial(power - nu)
+            data[:, j] = factor * self._t ** (power - nu)
+
+        columns = np.arange(order) * pieces + self._indices[:, np.newaxis]
+        indptr = np.arange(0, size * order + 1, order)
+
+        return sp.csr_matrix((data.astype(dtype).ravel(), columns.ravel(), indptr),
+                             shape=(size, order * pieces))
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f'{type(self).__name__}\n'
+            f'  pieces: {self._breaks.size - 1}\n'
+            f'  order: {self._order}\n'
+            f'  points: {self.size}\n'
+        )
+
+
+class NdGridEvaluationPlan:
+    """The evaluation plan for the n-d grid splines with the same breaks and the same grid points
+
+    The plan holds :class:`EvaluationPlan` for each dimension.
+
+    Usually, the instance of this class is created by :meth:`NdGridSplinePPForm.plan` method.
+
+    Parameters
+    ----------
+
+    breaks : tuple of np.ndarray
+        The breaks vectors for each dimension
+
+    x : tuple of 1-d array-like
+        The tuple of point values for each dimension to evaluate the splines at
+
+    order : [*Optional*] tuple of int
+        The splines orders for each dimension (cubic splines by default)
+
+    extrapolate : [*Optional*] bool
+        Whether to extrapolate to out-of-bounds points based on first and last
+        intervals, or to return NaNs. Default is True.
+
+    assume_sorted : [*Optional*] bool
+        If True, the point values are assumed to be sorted in ascending order (it is not checked)
+        and the intervals are found by the linear merge of the points and the breaks
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self,
+                 breaks: Sequence[np.ndarray],
+                 x: Sequence[UnivariateDataType],
+                 order: Optional[Sequence[int]] = None,
+                 extrapolate: bool = True,
+                 assume_sorted: bool = False) -> None:
+
+        if len(x) != len(breaks):
+            raise ValueError(f"'x' sequence must have length {len(breaks)} according to 'breaks'")
+        if order is None:
+            order = (4,) * len(breaks)
+
+        self._plans = tuple(
+            EvaluationPlan(b, xi, order=k, extrapolate=extrapolate, assume_sorted=assume_sorted)
+            for b, xi, k in zip(breaks, x, order)
+        )
+
+    @property
+    def plans(self) -> Tuple[EvaluationPlan, ...]:
+        """Returns the evaluation plans for each dimension
+        """
+        return self._plans
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Returns the evaluated values shape
+        """
+        return tuple(plan.size for plan in self._plans)
+
+    def evaluate(self, spline, nu=None) -> np.ndarray:
+        """Evaluates the n-d grid spline with the same breaks using the plan
+
+        Parameters
+        ----------
+
+        spline : NdGridSplinePPForm
+            The n-d grid spline with the same breaks and orders as the plan
+
+        nu : [*Optional*] tuple of int, Sequence[tuple of int]
+            Orders of derivatives to evaluate (see :meth:`NdGridSplinePPForm.__call__`)
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Evaluated values
+        """
+
+        if len(self._plans) != spline.ndim:
+            raise ValueError(f'The spline dimension ({spline.ndim}) must be equal to '
+                             f'the plan dimension ({len(self._plans)})')
+
+        def evaluate_axis(axis, axis_spline, orders):
+            return self._plans[axis].evaluate(axis_spline, nu=orders)
+
+        return spline._evaluate_axes(self.shape, nu, evaluate_axis)
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f'{type(self).__name__}\n'
+            f'  shape: {self.shape}\n'
+        )
+
+
+def make_evaluation_plan(breaks: UnivariateDataType,
+                         x: UnivariateDataType,
+                         order: int = 4,
+                         extrapolate: Union[bool, str] = True,
+                         assume_sorted: bool = False) -> EvaluationPlan:
+    """Makes the evaluation plan for the univariate splines with the given breaks
+
+    The plan can be used for evaluating many splines with the same breaks
+    (for example, the splines for the same ``xdata``) at the same points
+    without searching the intervals for every spline.
+
+    Parameters
+    ----------
+
+    breaks : np.ndarray, sequence
+        The breaks vector (for example, the spline ``xdata``)
+
+    x : np.ndarray, sequence
+        Points to evaluate the splines at
+
+    order : [*Optional*] int
+        The splines order (4 for cubic splines)
+
+    extrapolate : [*Optional*] bool or 'periodic'
+        If bool, determines whether to extrapolate to out-of-bounds points
+        based on first and last intervals, or to return NaNs. If 'periodic',
+        periodic extrapolation is used. Default is True.
+
+    assume_sorted : [*Optional*] bool
+        If True, the points are assumed to be sorted in ascending order (it is not checked)
+        and the intervals are found by the linear merge of the points and the breaks
+
+    Returns
+    -------
+
+    plan : EvaluationPlan
+        The evaluation plan
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        import numpy as np
+        from csaps import CubicSmoothingSpline, make_evaluation_plan
+
+        x = np.linspace(0., 10., 100)
+        xi = np.linspace(0., 10., 10000)
+
+        plan = make_evaluation_plan(x, xi)
+
+        for y in data:
+            spline = CubicSmoothingSpline(x, y, smooth=0.8).spline
+            yi = plan.evaluate(spline)
+
+    """
+    return EvaluationPlan(breaks, x, order=order, extrapolate=extrapolate, assume_sorted=assume_sorted)
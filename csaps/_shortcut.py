@@ -8,6 +8,8 @@ The module provised `csaps` shortcut function for smoothing data
 from collections import abc as c_abc
 from typing import Optional, Union, Sequence, NamedTuple, overload
 
+import numpy as np
+
 from ._base import ISmoothingSpline
 from ._sspumv import CubicSmoothingSpline
 from ._sspndg import ndgrid_prepare_data_vectors, NdGridCubicSmoothingSpline
@@ -32,8 +34,11 @@ def csaps(xdata: UnivariateDataType,
           ydata: MultivariateDataType,
           *,
           weights: Optional[UnivariateDataType] = None,
-          smooth: Optional[float] = None,
-          axis: Optional[int] = None) -> ISmoothingSpline: ...
+          smooth: Optional[Union[float, str]] = None,
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> ISmoothingSpline: ...
 
 
 @overload
@@ -42,7 +47,11 @@ def csaps(xdata: UnivariateDataType,
           xidata: UnivariateDataType,
           *,
           weights: Optional[UnivariateDataType] = None,
-          axis: Optional[int] = None) -> AutoSmoothingResult: ...
+          smooth: Optional[str] = None,
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> AutoSmoothingResult: ...
 
 
 @overload
@@ -52,7 +61,10 @@ def csaps(xdata: UnivariateDataType,
           *,
           smooth: float,
           weights: Optional[UnivariateDataType] = None,
-          axis: Optional[int] = None) -> MultivariateDataType: ...
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> MultivariateDataType: ...
 
 
 @overload
@@ -60,8 +72,11 @@ def csaps(xdata: NdGridDataType,
           ydata: MultivariateDataType,
           *,
           weights: Optional[NdGridDataType] = None,
-          smooth: Optional[Sequence[float]] = None,
-          axis: Optional[int] = None) -> ISmoothingSpline: ...
+          smooth: Optional[Union[str, Sequence[Optional[Union[float, str]]]]] = None,
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> ISmoothingSpline: ...
 
 
 @overload
@@ -70,7 +85,11 @@ def csaps(xdata: NdGridDataType,
           xidata: NdGridDataType,
           *,
           weights: Optional[NdGridDataType] = None,
-          axis: Optional[int] = None) -> AutoSmoothingResult: ...
+          smooth: Optional[str] = None,
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> AutoSmoothingResult: ...
 
 
 @overload
@@ -80,7 +99,10 @@ def csaps(xdata: NdGridDataType,
           *,
           smooth: Sequence[float],
           weights: Optional[NdGridDataType] = None,
-          axis: Optional[int] = None) -> MultivariateDataType: ...
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None) -> MultivariateDataType: ...
 #
 # csaps signatures
 # **************************************
@@ -91,8 +113,12 @@ def csaps(xdata: Union[UnivariateDataType, NdGridDataType],
           xidata: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
           *,
           weights: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
-          smooth: Optional[Union[float, Sequence[float]]] = None,
-          axis: Optional[int] = None) -> Union[MultivariateDataType, ISmoothingSpline, AutoSmoothingResult]:
+          smooth: Optional[Union[float, str, Sequence[Optional[Union[float, str]]]]] = None,
+          axis: Optional[int] = None,
+          engine: str = 'banded',
+          dtype: Union[np.dtype, str, type] = np.float64,
+          workers: Optional[int] = None,
+          ) -> Union[MultivariateDataType, ISmoothingSpline, AutoSmoothingResult]:
     """Smooths the univariate/multivariate/gridded data or computes the corresponding splines
 
     This function might be used as the main API for smoothing any data.
@@ -124,13 +150,17 @@ def csaps(xdata: Union[UnivariateDataType, NdGridDataType],
             - 1-D data vector/sequence (array-like) for univariate/multivariate ``ydata`` case
             - The sequence of 1-D data vectors for nd-gridded ``ydata`` case
 
-    smooth : [*Optional*] float, Sequence[float]
+    smooth : [*Optional*] float, str, Sequence[float]
         The smoothing factor value(s):
             - float value in the range ``[0, 1]`` for univariate/multivariate ``ydata`` case
             - the sequence of float in the range ``[0, 1]`` or None for nd-gridded ``ydata`` case
 
-        If this argument was not set or None or sequence with None-items, the function will return
-        named tuple :class:`AutoSmoothingResult` with computed smoothed data values and smoothing factor value(s).
+        The value can also be the name of the method for data-driven choice of the smoothing factor:
+        'gcv' (generalized cross-validation) or 'loocv' (leave-one-out cross-validation).
+
+        If this argument was not set or None or a method name or sequence with None/method name items,
+        the function will return named tuple :class:`AutoSmoothingResult` with computed smoothed data
+        values and smoothing factor value(s).
 
     axis : [*Optional*] int
         The ``ydata`` axis. Axis along which ``ydata`` is assumed to be varying.
@@ -139,6 +169,18 @@ def csaps(xdata: Union[UnivariateDataType, NdGridDataType],
         .. note::
             Currently, `axis` will be ignored for nd-gridded ``ydata`` case.
 
+    engine : [*Optional*] str
+        The linear system solver engine: 'banded' (default) or 'sparse'.
+        See :class:`CubicSmoothingSpline` for details.
+
+    dtype : [*Optional*] np.dtype, str
+        The floating-point type of the spline coefficients and the smoothed data values:
+        ``np.float64`` (default) or ``np.float32``. See :class:`CubicSmoothingSpline` for details.
+
+    workers : [*Optional*] int
+        The maximum number of threads for computing the spline for the data columns in parallel.
+        See :class:`CubicSmoothingSpline` for details.
+
     Returns
     -------
 
@@ -200,18 +242,23 @@ def csaps(xdata: Union[UnivariateDataType, NdGridDataType],
 
     if umv:
         axis = -1 if axis is None else axis
-        sp = CubicSmoothingSpline(xdata, ydata, weights=weights, smooth=smooth, axis=axis)
+        sp = CubicSmoothingSpline(xdata, ydata, weights=weights, smooth=smooth, axis=axis,
+                                  engine=engine, dtype=dtype, workers=workers)
     else:
-        sp = NdGridCubicSmoothingSpline(xdata, ydata, weights, smooth)
+        sp = NdGridCubicSmoothingSpline(xdata, ydata, weights, smooth, engine=engine,
+                                        dtype=dtype, workers=workers)
 
     if xidata is None:
         return sp
 
     yidata = sp(xidata)
 
-    auto_smooth = smooth is None
-    if isinstance(smooth, Sequence):
-        auto_smooth = any(sm is None for sm in smooth)
+    def is_auto(sm):
+        return sm is None or isinstance(sm, str)
+
+    auto_smooth = is_auto(smooth)
+    if not isinstance(smooth, str) and isinstance(smooth, Sequence):
+        auto_smooth = any(is_auto(sm) for sm in smooth)
 
     if auto_smooth:
         return AutoSmoothingResult(yidata, sp.smooth)
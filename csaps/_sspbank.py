@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+"""
+The bank of many univariate/multivariate splines with different breaks
+
+"""
+
+from typing import Optional, Union, Sequence
+
+import numpy as np
+
+from ._base import ISmoothingSpline
+from ._types import UnivariateDataType
+from ._sspumv import SplinePPForm
+from ._ppeval import bisect_segments, derivative_coeffs
+from ._storage import PathType, save_arrays, load_arrays
+
+
+class SplineBank:
+    """The bank of many splines with different breaks packed in the concatenated arrays
+
+    The breaks of all splines are concatenated in one vector and the coefficients
+    are concatenated along the pieces axis. The offsets vector (like CSR matrix index pointers)
+    defines the breaks of every spline: ``breaks[offsets[k]:offsets[k + 1]]``. The pieces
+    of k-th spline are ``coeffs[:, offsets[k] - k:offsets[k + 1] - k - 1]``.
+
+    The bank evaluates the batches of ``(spline_id, x)`` pairs in one vectorized call.
+
+    Usually, the instance of this class is created by :meth:`from_splines` or :meth:`load` methods.
+
+    Parameters
+    ----------
+
+    breaks : np.ndarray
+        The concatenated breaks vector
+
+    coeffs : np.ndarray
+        The concatenated coefficients array with shape ``(k, P, ...)`` where ``k`` is the splines order
+        and ``P`` is the total number of the pieces
+
+    offsets : np.ndarray
+        The offsets vector of the splines breaks with size ``N + 1`` where ``N`` is the number of splines
+
+    axis : [*Optional*] int
+        The interpolation axis of the splines (see :class:`SplinePPForm`). It is used only for
+        the splines returned by ``bank[k]``.
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self,
+                 breaks: np.ndarray,
+                 coeffs: np.ndarray,
+                 offsets: np.ndarray,
+                 axis: int = 0) -> None:
+
+        # The memory-mapped arrays are kept without copying
+        breaks = np.asanyarray(breaks)
+        coeffs = np.asanyarray(coeffs)
+        offsets = np.asanyarray(offsets)
+
+        if breaks.ndim != 1 or offsets.ndim != 1 or coeffs.ndim < 2:
+            raise ValueError("'breaks' and 'offsets' must be vectors and 'coeffs' must be at least 2-D array")
+        if offsets.size < 1 or offsets[0] != 0 or offsets[-1] != breaks.size:
+            raise ValueError(f"'offsets' must start with 0 and end with 'breaks' size ({breaks.size})")
+        if np.any(np.diff(offsets) < 2):
+            raise ValueError('Every spline must have at least 2 breaks')
+        if coeffs.shape[1] != breaks.size - (offsets.size - 1):
+            raise ValueError(
+                f"'coeffs' shape {coeffs.shape} does not match the total number of the pieces "
+                f"({breaks.size - (offsets.size - 1)})")
+
+        self._breaks = breaks
+        self._coeffs = coeffs
+        self._offsets = offsets
+        self._axis = axis
+
+    @classmethod
+    def from_splines(cls, splines: Sequence[Union[SplinePPForm, ISmoothingSpline]]) -> 'SplineBank':
+        """Packs the splines into the bank
+
+        Parameters
+        ----------
+
+        splines : Sequence[SplinePPForm, CubicSmoothingSpline]
+            The univariate/multivariate splines with the same data dimensions.
+            The splines with the lower order (for example, the splines for 2 data points)
+            are packed with the leading zero coefficients.
+
+        Returns
+        -------
+
+        bank : SplineBank
+            The splines bank
+        """
+
+        splines = [getattr(spline, 'spline', spline) for spline in splines]
+
+        if not splines:
+            raise ValueError("'splines' must not be empty")
+
+        value_shape = splines[0].c.shape[2:]
+        axis = splines[0].axis
+
+        if any(spline.c.shape[2:] != value_shape for spline in splines):
+            raise ValueError('All splines must have the same data dimensions')
+
+        order = max(spline.c.shape[0] for spline in splines)
+        dtype = np.result_type(*(spline.c.dtype for spline in splines))
+
+        sizes = np.array([spline.x.size for spline in splines])
+        offsets = np.zeros(sizes.size + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        breaks = np.concatenate([spline.x for spline in splines]).astype(np.float64, copy=False)
+        coeffs = np.zeros((order, breaks.size - sizes.size) + value_shape, dtype=dtype)
+
+        for k, spline in enumerate(splines):
+            start = offsets[k] - k
+            c = spline.c
+            coeffs[order - c.shape[0]:, start:start + c.shape[1]] = c
+
+        return cls(breaks, coeffs, offsets, axis=axis)
+
+    @property
+    def breaks(self) -> np.ndarray:
+        """Returns the concatenated breaks vector
+        """
+        return self._breaks
+
+    @property
+    def coeffs(self) -> np.ndarray:
+        """Returns the concatenated coefficients array
+        """
+        return self._coeffs
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Returns the offsets vector of the splines breaks
+        """
+        return self._offsets
+
+    @property
+    def order(self) -> int:
+        """Returns the splines order
+        """
+        return self._coeffs.shape[0]
+
+    def __len__(self) -> int:
+        return self._offsets.size - 1
+
+    def __getitem__(self, index: int) -> SplinePPForm:
+        """Returns the spline from the bank as :class:`SplinePPForm` instance (without copying)
+        """
+        size = len(self)
+
+        if not -size <= index < size:
+            raise IndexError(f'The spline index {index} is out of range')
+        if index < 0:
+            index += size
+
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        coeffs = self._coeffs[:, start - index:stop - index - 1]
+
+        return SplinePPForm.construct_fast(coeffs, self._breaks[start:stop], axis=self._axis)
+
+    def __call__(self,
+                 spline_ids: Union[int, Sequence[int], np.ndarray],
+                 x: UnivariateDataType,
+                 nu: int = 0,
+                 extrapolate: bool = True) -> np.ndarray:
+        """Evaluates the splines for the batch of ``(spline_id, x)`` pairs
+
+        Parameters
+        ----------
+
+        spline_ids : int, array-like
+            The splines indices. The indices and the points are broadcast together.
+
+        x : array-like
+            Points to evaluate the splines at
+
+        nu : [*Optional*] int
+            Order of derivative to evaluate. Must be non-negative.
+
+        extrapolate : [*Optional*] bool
+            Whether to extrapolate to out-of-bounds points based on first and last
+            intervals, or to return NaNs. Default is True.
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Evaluated values with shape ``pairs_shape + data_shape`` where ``pairs_shape``
+            is the broadcast shape of the indices and the points
+        """
+
+        if nu < 0:
+            raise ValueError('Order of derivative cannot be negative')
+
+        spline_ids, x = np.broadcast_arrays(np.asarray(spline_ids), np.asarray(x, dtype=np.float64))
+
+        if not np.issubdtype(spline_ids.dtype, np.integer):
+            raise ValueError("'spline_ids' must be integers")
+
+        pairs_shape = x.shape
+        spline_ids = spline_ids.ravel()
+        x = x.ravel()
+
+        size = len(self)
+        if spline_ids.size > 0 and (spline_ids.min() < -size or spline_ids.max() >= size):
+            raise IndexError('The spline indices are out of range')
+
+        spline_ids = np.where(spline_ids < 0, spline_ids + size, spline_ids)
+
+        first = self._offsets[spline_ids]
+        last = self._offsets[spline_ids + 1] - 1
+
+        indices = bisect_segments(self._breaks, first, last, x)
+        pieces = indices - spline_ids
+
+        value_ndim = self._coeffs.ndim - 2
+        t = (x - self._breaks[indices]).astype(self._coeffs.dtype).reshape((-1,) + (1,) * value_ndim)
+
+        # Horner's scheme gathering the coefficients of the pieces one by one
+        coeffs = derivative_coeffs(self._coeffs, nu)
+        values = np.take(coeffs[0], pieces, axis=0)
+
+        for c in coeffs[1:]:
+            values *= t
+            values += np.take(c, pieces, axis=0)
+
+        if not extrapolate:
+            values[(x < self._breaks[first]) | (x > self._breaks[last])] = np.nan
+
+        return values.reshape(pairs_shape + self._coeffs.shape[2:])
+
+    def save(self, file: PathType) -> None:
+        """Saves the bank to the file
+
+        The arrays are stored aligned in the binary file, so the bank can be loaded
+        by :meth:`load` method without copying the arrays (as memory-mapped arrays).
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+        """
+        save_arrays(file, type(self).__name__,
+                    arrays={'breaks': self._breaks, 'coeffs': self._coeffs, 'offsets': self._offsets},
+                    meta={'axis': self._axis})
+
+    @classmethod
+    def load(cls, file: PathType, mmap_mode: Optional[str] = 'r') -> 'SplineBank':
+        """Loads the bank from the file saved by :meth:`save` method
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+
+        mmap_mode : [*Optional*] str, None
+            The memory-map mode for the arrays (see :class:`numpy.memmap`).
+            By default, the arrays are memory-mapped read-only without copying.
+            If it is None, the arrays are read into memory.
+
+        Returns
+        -------
+
+        bank : SplineBank
+            The splines bank
+        """
+        arrays, meta = load_arrays(file, cls.__name__, mmap_mode=mmap_mode)
+        return cls(arrays['breaks'], arrays['coeffs'], arrays['offsets'], axis=meta['axis'])
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f'{type(self).__name__}\n'
+            f'  splines: {len(self)}\n'
+            f'  breaks: {self._breaks.size}\n'
+            f'  coeffs shape: {self._coeffs.shape}\n'
+            f'  order: {self.order}\n'
+        )
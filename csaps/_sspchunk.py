@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Chunked univariate/multivariate smoothing for very long data series
+
+"""
+
+from typing import Optional, Union, Iterator, Tuple
+
+import numpy as np
+
+from ._types import UnivariateDataType, MultivariateDataType
+from ._sspumv import SplinePPForm, CubicSmoothingSpline, _ENGINES
+from ._banded import umv_band_matrices, band_trace
+
+_OUTPUTS = ('spline', 'values')
+
+
+def _compute_smooth(x: np.ndarray, w: Optional[np.ndarray], chunk_size: int) -> float:
+    """Computes the default smoothing parameter for all data sites chunk by chunk
+    """
+
+    size = x.size - 2
+    trace_r = 0.
+    trace_qtw = 0.
+
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size) + 2
+
+        xc = np.asarray(x[start:stop], dtype=np.float64)
+        wc = np.ones_like(xc) if w is None else np.asarray(w[start:stop], dtype=np.float64)
+
+        r, qtw = umv_band_matrices(np.diff(xc), wc)
+        trace_r += band_trace(r)
+        trace_qtw += band_trace(qtw)
+
+    return CubicSmoothingSpline._compute_smooth(trace_r, trace_qtw)
+
+
+def smooth_chunks(xdata: UnivariateDataType,
+                  ydata: MultivariateDataType,
+                  chunk_size: int,
+                  overlap: int,
+                  weights: Optional[UnivariateDataType] = None,
+                  smooth: Optional[float] = None,
+                  axis: int = -1,
+                  output: str = 'spline',
+                  engine: str = 'banded') -> Iterator[Union[SplinePPForm, Tuple[np.ndarray, np.ndarray]]]:
+    """Smooths the very long data series chunk by chunk in overlapping windows
+
+    The function computes the smoothing spline for the data series in the windows
+    ``[chunk_start - overlap, chunk_stop + overlap]`` and stitches the results taking
+    from each window only the chunk pieces that are far from the window edges.
+    The influence of the data on the smoothing spline decays exponentially with distance,
+    so with sufficient overlap the result matches the smoothing spline for all data
+    within a small tolerance.
+
+    The peak memory is bounded by the window size, so the function can be used
+    for the data from memory-mapped files (``np.memmap``/``np.load(..., mmap_mode='r')``).
+
+    Parameters
+    ----------
+
+    xdata : np.ndarray, sequence, vector-like
+        X input 1-D data vector (data sites: ``x1 < x2 < ... < xN``)
+
+    ydata : np.ndarray, vector-like, sequence[vector-like]
+        Y input 1-D data vector or ND-array with shape[axis] equal of `xdata` size)
+
+    chunk_size : int
+        The number of spline pieces (or data sites for 'values' output) in each chunk
+
+    overlap : int
+        The number of additional data sites on each side of the chunk used for computing the spline.
+        The overlap should be much greater than the smoothing kernel width
+        (it grows when the smoothing parameter decreases).
+
+    weights : [*Optional*] np.ndarray, list
+        Weights 1-D vector with size equal of ``xdata`` size
+
+    smooth : [*Optional*] float
+        Smoothing parameter in range [0, 1]. If it is not set, the parameter is computed
+        automatically for all data sites (not for each window).
+
+    axis : [*Optional*] int
+        Axis along which ``ydata`` is assumed to be varying.
+        By default is -1 (the last axis).
+
+    output : [*Optional*] str
+        The chunk output type:
+            - 'spline': :class:`SplinePPForm` instance for the chunk pieces (default).
+              The last break of each chunk spline is the first break of the next chunk spline.
+            - 'values': the tuple ``(x, values)`` of the chunk data sites and smoothed data values on them
+
+    engine : [*Optional*] str
+        The linear system solver engine: 'banded' (default) or 'sparse'
+
+    Yields
+    ------
+
+    spline : SplinePPForm
+        The spline for the chunk pieces if ``output`` is 'spline'
+
+    xy : Tuple[np.ndarray, np.ndarray]
+        The chunk data sites and smoothed values if ``output`` is 'values'
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        import numpy as np
+        from csaps import smooth_chunks
+
+        x = np.load('x.npy', mmap_mode='r')
+        y = np.load('y.npy', mmap_mode='r')
+
+        for xs, ys in smooth_chunks(x, y, chunk_size=100000, overlap=1000, smooth=0.9, output='values'):
+            ...
+
+    """
+
+    if output not in _OUTPUTS:
+        raise ValueError(f"'output' must be one of {_OUTPUTS}, but given {output!r}")
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be positive")
+    if overlap < 0:
+        raise ValueError("'overlap' must be non-negative")
+    if isinstance(smooth, str):
+        raise ValueError("'smooth' must be a float or None")
+    if engine not in _ENGINES:
+        raise ValueError(f"'engine' must be one of {_ENGINES}, but given {engine!r}")
+
+    xdata = np.asarray(xdata)
+    ydata = np.asarray(ydata)
+
+    if xdata.ndim != 1:
+        raise ValueError("'xdata' must be a vector")
+    if xdata.size < 2:
+        raise ValueError("'xdata' must contain at least 2 data points.")
+
+    size = xdata.size
+    axis = ydata.ndim + axis if axis < 0 else axis
+
+    if ydata.ndim == 0 or axis >= ydata.ndim or ydata.shape[axis] != size:
+        raise ValueError(
+            f"'ydata' data must be a 1-D or N-D array with shape[{axis}] "
+            f"that is equal to 'xdata' size ({size})")
+
+    if weights is not None:
+        weights = np.asarray(weights)
+        if weights.size != size:
+            raise ValueError('Weights vector size must be equal of xdata size')
+
+    if smooth is None:
+        smooth = 1.0 if size == 2 else _compute_smooth(xdata, weights, chunk_size)
+
+    # The number of the chunk items: spline pieces or data sites
+    count = size - 1 if output == 'spline' else size
+
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+
+        win_stop = min(size, stop + 1 + overlap)
+
+        # The window contains at least 2 data sites (the last chunk of values can contain only one site)
+        win_start = max(0, min(start - overlap, win_stop - 2))
+
+        index = [slice(None)] * ydata.ndim
+        index[axis] = slice(win_start, win_stop)
+
+        x = np.asarray(xdata[win_start:win_stop], dtype=np.float64)
+        y = ydata[tuple(index)]
+        w = None if weights is None else weights[win_start:win_stop]
+
+        x, y, w, shape, y_axis = CubicSmoothingSpline._prepare_data(x, y, w, axis)
+        dx = CubicSmoothingSpline._diff_xdata(x)
+        solve, p = CubicSmoothingSpline._factorize(dx, w, smooth, engine)
+
+        offset = start - win_start
+        chunk_len = stop - start
+
+        if output == 'spline':
+            coeffs = CubicSmoothingSpline._make_coeffs(dx, y, w, p, solve, shape)
+            # The chunk spline does not keep the coefficients of the whole window
+            coeffs = coeffs[:, offset:offset + chunk_len].copy()
+            breaks = x[offset:offset + chunk_len + 1].copy()
+
+            yield SplinePPForm.construct_fast(coeffs, breaks, axis=y_axis)
+        else:
+            y = CubicSmoothingSpline._ydata_columns(y)
+
+            if solve is None:
+                yi = y.astype(np.float64)
+            else:
+                _, yi = CubicSmoothingSpline._smooth_sites(dx, y, w, p, solve)
+
+            yi = yi[offset:offset + chunk_len].reshape((chunk_len,) + shape[1:])
+
+            yield x[offset:offset + chunk_len], np.moveaxis(yi, 0, y_axis)
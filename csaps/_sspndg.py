@@ -10,11 +10,15 @@ from numbers import Number
 from typing import Tuple, Sequence, Optional, Union
 
 import numpy as np
-from scipy.interpolate import PPoly, NdPPoly
+from scipy.interpolate import NdPPoly
 
 from ._base import ISplinePPForm, ISmoothingSpline
 from ._types import UnivariateDataType, NdGridDataType
-from ._sspumv import CubicSmoothingSpline
+from ._ppplan import NdGridEvaluationPlan
+from ._storage import PathType, save_arrays, load_arrays
+from ._instrument import phase
+from ._ppcompress import cubic_coeffs, compress_breaks
+from ._sspumv import SplinePPForm, CubicSmoothingSpline, _SMOOTH_METHODS, _check_dtype
 from ._reshape import (
     prod,
     umv_coeffs_to_canonical,
@@ -80,10 +84,179 @@ class NdGridSplinePPForm(ISplinePPForm[Tuple[np.ndarray, ...], Tuple[int, ...]],
     def shape(self) -> Tuple[int, ...]:
         return tuple(len(xi) for xi in self.x)
 
+    def integrate(self, ranges: Sequence[Tuple[float, float]], extrapolate: Optional[bool] = None) -> np.ndarray:
+        """Computes the definite integral of the spline (see :meth:`scipy.interpolate.NdPPoly.integrate`)
+
+        The float32 coefficients are integrated in float64 and the result is rounded to float32.
+        """
+        if self.c.dtype != np.float32:
+            return super().integrate(ranges, extrapolate)
+        return self._as_float64().integrate(ranges, extrapolate).astype(np.float32)
+
+    def integrate_1d(self, a: float, b: float, axis: int,
+                     extrapolate: Optional[bool] = None) -> Union['NdGridSplinePPForm', np.ndarray]:
+        """Computes the definite integral along one dimension
+        (see :meth:`scipy.interpolate.NdPPoly.integrate_1d`)
+
+        The float32 coefficients are integrated in float64 and the result is rounded to float32.
+        """
+        if self.c.dtype != np.float32:
+            return super().integrate_1d(a, b, axis, extrapolate)
+        return self._as_float32(self._as_float64().integrate_1d(a, b, axis, extrapolate))
+
+    def antiderivative(self, nu: Tuple[int, ...]) -> 'NdGridSplinePPForm':
+        """Returns the antiderivative spline (see :meth:`scipy.interpolate.NdPPoly.antiderivative`)
+
+        The float32 coefficients are integrated in float64 and the result is rounded to float32.
+        """
+        if self.c.dtype != np.float32:
+            return super().antiderivative(nu)
+        return self._as_float32(self._as_float64().antiderivative(nu))
+
+    def _as_float64(self) -> 'NdGridSplinePPForm':
+        # SciPy integration routines support only float64/complex128 coefficients
+        return self.construct_fast(self.c.astype(np.float64), self.x, extrapolate=self.extrapolate)
+
+    def _as_float32(self, result):
+        if isinstance(result, NdGridSplinePPForm):
+            return self.construct_fast(result.c.astype(np.float32), result.x, extrapolate=result.extrapolate)
+        return result.astype(np.float32)
+
+    def compress(self, tol: Union[float, Sequence[float]]) -> 'NdGridSplinePPForm':
+        """Returns the compressed spline with the reduced number of the pieces for each dimension
+
+        The adjacent pieces along each dimension are merged into the cubic pieces
+        (see :meth:`SplinePPForm.compress`) while the bound of the maximum absolute deviation
+        from the spline before the merging is not greater than the tolerance for this dimension.
+        The dimensions are compressed one by one, so the maximum deviation of the compressed
+        spline from this spline on the breaks ranges is not greater than the sum of the tolerances.
+        For float32 coefficients the deviation can additionally include the float32 round-off
+        of the compressed coefficients.
+
+        Parameters
+        ----------
+
+        tol : float, Sequence[float]
+            The maximum absolute deviation for all dimensions or the sequence of the maximum
+            deviations for each dimension
+
+        Returns
+        -------
+
+        spline : NdGridSplinePPForm
+            The compressed spline
+        """
+        if isinstance(tol, Number):
+            tol = [tol] * self.ndim
+
+        tol = list(tol)
+
+        if len(tol) != self.ndim:
+            raise ValueError(f"'tol' sequence must have length {self.ndim} according to 'breaks'")
+        if any(t < 0 for t in tol):
+            raise ValueError("'tol' must be non-negative")
+
+        coeffs = self.c
+        breaks = list(self.x)
+
+        with phase('ndg.compress', lambda: dict(pieces=self.pieces)):
+            for axis, axis_tol in enumerate(tol):
+                coeffs, breaks[axis] = self._compress_axis(coeffs, breaks, axis, axis_tol)
+
+        if coeffs is self.c:
+            coeffs = coeffs.copy()
+
+        return self.construct_fast(coeffs, tuple(breaks), extrapolate=self.extrapolate)
+
+    @staticmethod
+    def _compress_axis(coeffs, breaks, axis, tol):
+        ndim = len(breaks)
+
+        # (k, m, other orders..., other pieces...) where k, m are the order and the pieces along the axis
+        c = np.moveaxis(coeffs, (axis, ndim + axis), (0, 1))
+        other_shape = c.shape[2:]
+
+        # The maximum absolute values of the local monomials of the other dimensions on the pieces
+        weights = np.ones(other_shape)
+        other_axes = [i for i in range(ndim) if i != axis]
+
+        for j, other_axis in enumerate(other_axes):
+            order = coeffs.shape[other_axis]
+            powers = np.arange(order - 1, -1, -1)
+            w = np.diff(breaks[other_axis])[np.newaxis, :] ** powers[:, np.newaxis]
+
+            shape = [1] * len(other_shape)
+            shape[j] = order
+            shape[len(other_axes) + j] = w.shape[1]
+            weights = weights * w.reshape(shape)
+
+        order_axes = tuple(range(1, len(other_axes) + 1))
+
+        def piece_errors(errors):
+            errors = errors.reshape((-1,) + other_shape) * weights
+            return errors.sum(axis=order_axes).reshape(errors.shape[0], -1).max(axis=1)
+
+        kept, new_coeffs = compress_breaks(
+            breaks[axis], cubic_coeffs(c.reshape(c.shape[:2] + (-1,))), tol, piece_errors)
+
+        if kept.all():
+            return coeffs, breaks[axis]
+
+        new_coeffs = new_coeffs.reshape(new_coeffs.shape[:2] + other_shape).astype(coeffs.dtype, copy=False)
+        new_coeffs = np.ascontiguousarray(np.moveaxis(new_coeffs, (0, 1), (axis, ndim + axis)))
+
+        return new_coeffs, breaks[axis][kept]
+
+    def save(self, file: PathType) -> None:
+        """Saves the spline to the file
+
+        The breaks for each dimension and the coefficients are stored aligned in the binary file,
+        so the spline can be loaded by :meth:`load` method without copying the arrays
+        (as memory-mapped arrays).
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+        """
+        arrays = {f'breaks_{i}': xi for i, xi in enumerate(self.x)}
+        arrays['coeffs'] = self.c
+
+        save_arrays(file, type(self).__name__, arrays=arrays,
+                    meta={'ndim': self.ndim, 'extrapolate': self.extrapolate, 'order': list(self.order)})
+
+    @classmethod
+    def load(cls, file: PathType, mmap_mode: Optional[str] = 'r') -> 'NdGridSplinePPForm':
+        """Loads the spline from the file saved by :meth:`save` method
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+
+        mmap_mode : [*Optional*] str, None
+            The memory-map mode for the arrays (see :class:`numpy.memmap`).
+            By default, the arrays are memory-mapped read-only without copying.
+            If it is None, the arrays are read into memory.
+
+        Returns
+        -------
+
+        spline : NdGridSplinePPForm
+            The n-d grid spline
+        """
+        arrays, meta = load_arrays(file, cls.__name__, mmap_mode=mmap_mode)
+        breaks = tuple(arrays[f'breaks_{i}'] for i in range(meta['ndim']))
+
+        return cls.construct_fast(arrays['coeffs'], breaks, extrapolate=meta['extrapolate'])
+
     def __call__(self,
                  x: Sequence[UnivariateDataType],
-                 nu: Optional[Tuple[int, ...]] = None,
-                 extrapolate: Optional[bool] = None) -> np.ndarray:
+                 nu: Optional[Union[Tuple[int, ...], Sequence[Tuple[int, ...]]]] = None,
+                 extrapolate: Optional[bool] = None,
+                 assume_sorted: bool = False) -> np.ndarray:
         """Evaluate the spline for given data
 
         Parameters
@@ -92,13 +265,21 @@ class NdGridSplinePPForm(ISplinePPForm[Tuple[np.ndarray, ...], Tuple[int, ...]],
         x : tuple of 1-d array-like
             The tuple of point values for each dimension to evaluate the spline at.
 
-        nu : [*Optional*] tuple of int
+        nu : [*Optional*] tuple of int, Sequence[tuple of int]
             Orders of derivatives to evaluate. Each must be non-negative.
+            If it is a sequence of the tuples (for example, ``[(0, 0), (1, 0), (0, 1)]``),
+            the values for all tuples are stacked along the new first axis. The orders
+            for each axis are evaluated in a single pass sharing the interval lookup.
 
         extrapolate : [*Optional*] bool
             Whether to extrapolate to out-of-bounds points based on first and last
             intervals, or to return NaNs.
 
+        assume_sorted : [*Optional*] bool
+            If True, the point values for each dimension are assumed to be sorted
+            in ascending order (it is not checked), so the sortedness check is skipped
+            and the intervals are found by the linear merge of the points and the breaks.
+
         Returns
         -------
 
@@ -114,36 +295,117 @@ class NdGridSplinePPForm(ISplinePPForm[Tuple[np.ndarray, ...], Tuple[int, ...]],
             raise ValueError(
                 f"'x' sequence must have length {self.ndim} according to 'breaks'")
 
-        if nu is None:
-            nu = (0,) * len(x)
-
         if extrapolate is None:
             extrapolate = True
 
         shape = tuple(x.size for x in x)
 
+        def evaluate_axis(axis, spline, orders):
+            return spline(x[axis], nu=orders, extrapolate=extrapolate, assume_sorted=assume_sorted)
+
+        with phase('ndg.evaluate', lambda: dict(pieces=self.pieces), shape=shape):
+            return self._evaluate_axes(shape, nu, evaluate_axis)
+
+    def plan(self,
+             x: Sequence[UnivariateDataType],
+             extrapolate: Optional[bool] = None,
+             assume_sorted: bool = False) -> NdGridEvaluationPlan:
+        """Makes the evaluation plan for the grid points
+
+        The plan can be used for evaluating this spline and any other n-d grid spline
+        with the same breaks and orders at the grid points without searching the intervals
+        again for each dimension (see :class:`NdGridEvaluationPlan`).
+
+        Parameters
+        ----------
+
+        x : tuple of 1-d array-like
+            The tuple of point values for each dimension to evaluate the spline at.
+
+        extrapolate : [*Optional*] bool
+            Whether to extrapolate to out-of-bounds points based on first and last
+            intervals, or to return NaNs. Default is True.
+
+        assume_sorted : [*Optional*] bool
+            If True, the point values are assumed to be sorted in ascending order (it is not checked)
+            and the intervals are found by the linear merge of the points and the breaks
+
+        Returns
+        -------
+
+        plan : NdGridEvaluationPlan
+            The evaluation plan
+        """
+
+        x = ndgrid_prepare_data_vectors(x, 'x', min_size=1)
+
+        if len(x) != self.ndim:
+            raise ValueError(
+                f"'x' sequence must have length {self.ndim} according to 'breaks'")
+
+        if extrapolate is None:
+            extrapolate = True
+
+        return NdGridEvaluationPlan(self.breaks, x, order=self.order,
+                                    extrapolate=extrapolate, assume_sorted=assume_sorted)
+
+    def _evaluate_axes(self, shape, nu, evaluate_axis):
+        """Evaluates the spline axis by axis
+
+        ``evaluate_axis(axis, spline, orders)`` evaluates the univariate spline for the axis
+        for the derivative order (int) or the sequence of orders.
+        """
+
+        if nu is None:
+            nu = (0,) * self.ndim
+
+        multi_nu = len(nu) > 0 and not isinstance(nu[0], Number)
+        nus = [tuple(int(n) for n in nu_i) for nu_i in nu] if multi_nu else [tuple(int(n) for n in nu)]
+
+        if any(len(nu_i) != self.ndim for nu_i in nus):
+            raise ValueError(
+                f"'nu' must be a tuple of derivative orders with length {self.ndim} or a sequence of such tuples")
+
         coeffs = ndg_coeffs_to_flatten(self.coeffs)
         coeffs_shape = coeffs.shape
 
         ndim_m1 = self.ndim - 1
         permuted_axes = (ndim_m1, *range(ndim_m1))
 
+        # The evaluated coefficients for the trailing derivative orders ``nu[i + 1:]``.
+        # The axis pass evaluates all orders ``nu[i]`` for the same trailing orders at once.
+        branches = {(): coeffs}
+
         for i in reversed(range(self.ndim)):
             umv_ndim = prod(coeffs_shape[:ndim_m1])
             c_shape = (umv_ndim, self.pieces[i] * self.order[i])
-            if c_shape != coeffs_shape:
-                coeffs = coeffs.reshape(c_shape)
+            shape_r = (*coeffs_shape[:ndim_m1], shape[i])
 
-            coeffs_cnl = umv_coeffs_to_canonical(coeffs, self.pieces[i])
+            evaluated = {}
 
-            spline = PPoly.construct_fast(coeffs_cnl, self.breaks[i], axis=1)
-            coeffs = spline(x[i], nu=nu[i], extrapolate=extrapolate)
+            for suffix, coeffs in branches.items():
+                orders = sorted({nu_i[i] for nu_i in nus if nu_i[i + 1:] == suffix})
 
-            shape_r = (*coeffs_shape[:ndim_m1], shape[i])
-            coeffs = coeffs.reshape(shape_r).transpose(permuted_axes)
-            coeffs_shape = coeffs.shape
+                if c_shape != coeffs_shape:
+                    coeffs = coeffs.reshape(c_shape)
+
+                coeffs_cnl = umv_coeffs_to_canonical(coeffs, self.pieces[i])
+                spline = SplinePPForm.construct_fast(coeffs_cnl, self.breaks[i], axis=1)
+
+                if len(orders) == 1:
+                    values = [evaluate_axis(i, spline, orders[0])]
+                else:
+                    values = evaluate_axis(i, spline, orders)
+
+                for order, value in zip(orders, values):
+                    evaluated[(order,) + suffix] = value.reshape(shape_r).transpose(permuted_axes)
 
-        return coeffs.reshape(shape)
+            branches = evaluated
+            coeffs_shape = tuple(shape_r[axis] for axis in permuted_axes)
+
+        if multi_nu:
+            return np.stack([branches[nu_i].reshape(shape) for nu_i in nus])
+        return branches[nus[0]].reshape(shape)
 
     def __repr__(self):  # pragma: no cover
         return (
@@ -188,11 +450,26 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
         Weights data vector(s) for all dimensions or each dimension with
         size(s) equal to ``xdata`` sizes
 
-    smooth : [*Optional*] float, Sequence[float]
+    smooth : [*Optional*] float, str, Sequence[float]
         The smoothing parameter (or a sequence of parameters for each dimension) in range ``[0, 1]`` where:
             - 0: The smoothing spline is the least-squares straight line fit
             - 1: The cubic spline interpolant with natural condition
 
+        The parameter can also be 'gcv' or 'loocv' method name (see :class:`CubicSmoothingSpline`).
+        In this case the parameter for the dimension is chosen using the data along this dimension.
+
+    engine : [*Optional*] str
+        The linear system solver engine: 'banded' (default) or 'sparse'.
+        See :class:`CubicSmoothingSpline` for details.
+
+    dtype : [*Optional*] np.dtype, str
+        The floating-point type of ``ydata``, the spline coefficients and the evaluated values:
+        ``np.float64`` (default) or ``np.float32``. See :class:`CubicSmoothingSpline` for details.
+
+    workers : [*Optional*] int
+        The maximum number of threads for computing the coordinatewise splines columns in parallel.
+        See :class:`CubicSmoothingSpline` for details.
+
     """
 
     __module__ = 'csaps'
@@ -201,18 +478,33 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
                  xdata: NdGridDataType,
                  ydata: np.ndarray,
                  weights: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
-                 smooth: Optional[Union[float, Sequence[Optional[float]]]] = None) -> None:
+                 smooth: Optional[Union[float, str, Sequence[Optional[Union[float, str]]]]] = None,
+                 engine: str = 'banded',
+                 dtype: Union[np.dtype, str, type] = np.float64,
+                 workers: Optional[int] = None) -> None:
+
+        dtype = _check_dtype(dtype)
 
-        x, y, w, s = self._prepare_data(xdata, ydata, weights, smooth)
-        coeffs, smooth = self._make_spline(x, y, w, s)
+        with phase('ndg.prepare_data') as ph:
+            x, y, w, s = self._prepare_data(xdata, ydata, weights, smooth, dtype)
+            ph.update(shape=y.shape)
+        coeffs, smooth = self._make_spline(x, y, w, s, engine, workers)
 
         self._spline = NdGridSplinePPForm.construct_fast(coeffs, x)
         self._smooth = smooth
 
+    @classmethod
+    def _from_spline(cls, spline: NdGridSplinePPForm, smooth: Tuple[float, ...]) -> 'NdGridCubicSmoothingSpline':
+        obj = cls.__new__(cls)
+        obj._smooth = smooth
+        obj._spline = spline
+        return obj
+
     def __call__(self,
                  x: Union[NdGridDataType, Sequence[Number]],
-                 nu: Optional[Tuple[int, ...]] = None,
-                 extrapolate: Optional[bool] = None) -> np.ndarray:
+                 nu: Optional[Union[Tuple[int, ...], Sequence[Tuple[int, ...]]]] = None,
+                 extrapolate: Optional[bool] = None,
+                 assume_sorted: bool = False) -> np.ndarray:
         """Evaluate the spline for given data
 
         Parameters
@@ -221,13 +513,21 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
         x : tuple of 1-d array-like
             The tuple of point values for each dimension to evaluate the spline at.
 
-        nu : [*Optional*] tuple of int
+        nu : [*Optional*] tuple of int, Sequence[tuple of int]
             Orders of derivatives to evaluate. Each must be non-negative.
+            If it is a sequence of the tuples (for example, ``[(0, 0), (1, 0), (0, 1)]``),
+            the values for all tuples are stacked along the new first axis. The orders
+            for each axis are evaluated in a single pass sharing the interval lookup.
 
         extrapolate : [*Optional*] bool
             Whether to extrapolate to out-of-bounds points based on first and last
             intervals, or to return NaNs.
 
+        assume_sorted : [*Optional*] bool
+            If True, the point values for each dimension are assumed to be sorted
+            in ascending order (it is not checked), so the sortedness check is skipped
+            and the intervals are found by the linear merge of the points and the breaks.
+
         Returns
         -------
 
@@ -236,7 +536,7 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
             interpolation axis in the original array with the shape of x.
 
         """
-        return self._spline(x, nu=nu, extrapolate=extrapolate)
+        return self._spline(x, nu=nu, extrapolate=extrapolate, assume_sorted=assume_sorted)
 
     @property
     def smooth(self) -> Tuple[float, ...]:
@@ -261,9 +561,9 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
         return self._spline
 
     @classmethod
-    def _prepare_data(cls, xdata, ydata, weights, smooth):
+    def _prepare_data(cls, xdata, ydata, weights, smooth, dtype=np.float64):
         xdata = ndgrid_prepare_data_vectors(xdata, 'xdata')
-        ydata = np.asarray(ydata)
+        ydata = np.asarray(ydata, dtype=dtype)
         data_ndim = len(xdata)
 
         if ydata.ndim != data_ndim:
@@ -293,7 +593,9 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
         if smooth is None:
             smooth = [None] * data_ndim
 
-        if not isinstance(smooth, c_abc.Sequence):
+        if isinstance(smooth, str):
+            smooth = [smooth] * data_ndim
+        elif not isinstance(smooth, c_abc.Sequence):
             smooth = [float(smooth)] * data_ndim
         else:
             smooth = list(smooth)
@@ -306,40 +608,88 @@ class NdGridCubicSmoothingSpline(ISmoothingSpline[
         return xdata, ydata, weights, smooth
 
     @staticmethod
-    def _make_spline(xdata, ydata, weights, smooth):
+    def _compute_smooth_cv(x, ydata, w, method, axis):
+        if method not in _SMOOTH_METHODS:
+            raise ValueError(f"'smooth' method must be one of {_SMOOTH_METHODS}, but given {method!r}")
+
+        x, w = CubicSmoothingSpline._prepare_xdata(x, w)
+        y, _, _ = CubicSmoothingSpline._prepare_ydata(ydata, x.size, axis)
+        dx = CubicSmoothingSpline._diff_xdata(x)
+
+        if dx.size == 1:
+            return 1.0
+
+        return CubicSmoothingSpline._compute_smooth_cv(dx, w, CubicSmoothingSpline._ydata_columns(y), method)
+
+    @staticmethod
+    def _make_spline(xdata, ydata, weights, smooth, engine='banded', workers=None):
+        steps = NdGridCubicSmoothingSpline._make_spline_steps(xdata, ydata, weights, smooth, engine, workers)
+
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                return stop.value
+
+    @staticmethod
+    def _make_spline_steps(xdata, ydata, weights, smooth, engine='banded', workers=None):
+        """The generator computing the spline coefficients axis by axis
+
+        The generator yields after each step (computing the smoothing parameters and fitting each axis)
+        and returns the coefficients and the smoothing parameters. It is used for running the steps
+        separately (for example, with cancellation between the steps in the asynchronous API).
+        """
         ndim = len(xdata)
 
         if ndim == 1:
             s = CubicSmoothingSpline(
-                xdata[0], ydata, weights=weights[0], smooth=smooth[0])
+                xdata[0], ydata, weights=weights[0], smooth=smooth[0], engine=engine,
+                dtype=ydata.dtype, workers=workers)
             return s.spline.coeffs, (s.smooth,)
 
         shape = ydata.shape
         coeffs = ydata
         coeffs_shape = list(shape)
 
+        # The data-driven smoothing parameters are computed using the source data along each axis
+        with phase('ndg.smooth_cv', shape=shape):
+            smooth = [
+                NdGridCubicSmoothingSpline._compute_smooth_cv(xdata[i], ydata, weights[i], sm, i)
+                if isinstance(sm, str) else sm
+                for i, sm in enumerate(smooth)
+            ]
+        yield
+
         smooths = []
         permute_axes = (ndim - 1, *range(ndim - 1))
 
         # computing coordinatewise smoothing spline
         for i in reversed(range(ndim)):
-            if ndim > 2:
-                coeffs = coeffs.reshape(prod(coeffs.shape[:-1]), coeffs.shape[-1])
+            with phase('ndg.reshape', axis=i, shape=coeffs.shape):
+                if ndim > 2:
+                    coeffs = coeffs.reshape(prod(coeffs.shape[:-1]), coeffs.shape[-1])
 
-            s = CubicSmoothingSpline(
-                xdata[i], coeffs, weights=weights[i], smooth=smooth[i])
+            with phase('ndg.fit_axis', lambda: dict(size=coeffs.shape[-1], columns=prod(coeffs.shape[:-1])), axis=i):
+                s = CubicSmoothingSpline(
+                    xdata[i], coeffs, weights=weights[i], smooth=smooth[i], engine=engine,
+                    dtype=ydata.dtype, workers=workers)
 
             smooths.append(s.smooth)
-            coeffs = umv_coeffs_to_flatten(s.spline.coeffs)
 
-            if ndim > 2:
-                coeffs_shape[-1] = s.spline.pieces * s.spline.order
-                coeffs = coeffs.reshape(coeffs_shape)
+            with phase('ndg.reshape', lambda: dict(shape=s.spline.coeffs.shape), axis=i):
+                coeffs = umv_coeffs_to_flatten(s.spline.coeffs)
 
-            coeffs = coeffs.transpose(permute_axes)
-            coeffs_shape = list(coeffs.shape)
+                if ndim > 2:
+                    coeffs_shape[-1] = s.spline.pieces * s.spline.order
+                    coeffs = coeffs.reshape(coeffs_shape)
+
+                coeffs = coeffs.transpose(permute_axes)
+                coeffs_shape = list(coeffs.shape)
+            yield
 
         pieces = tuple(int(size - 1) for size in shape)
-        coeffs = ndg_coeffs_to_canonical(coeffs.squeeze(), pieces)
+
+        with phase('ndg.reshape', shape=coeffs.shape):
+            coeffs = ndg_coeffs_to_canonical(coeffs.squeeze(), pieces)
 
         return coeffs, tuple(reversed(smooths))
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stacked (batched) univariate cubic smoothing splines implementation
+
+"""
+
+from numbers import Number
+from typing import Optional, Union, Sequence, Tuple
+
+import numpy as np
+
+from ._base import ISplinePPForm, ISmoothingSpline
+from ._types import UnivariateDataType, MultivariateDataType
+from ._sspumv import SplinePPForm, CubicSmoothingSpline
+from ._banded import umv_band_matrices, band_trace, batch_pentadiagonal_solve
+from ._ppeval import bisect_intervals, derivative_coeffs, evaluate_local
+
+
+class StackedSplinePPForm(ISplinePPForm[np.ndarray, int]):
+    """The stack of univariate splines with different breaks in piecewise polynomial form
+
+    All splines in the stack have the same order and the same number of pieces.
+
+    Parameters
+    ----------
+
+    coeffs : np.ndarray
+        The coefficients array with shape ``(batch, k, m)`` where ``k`` is the spline order
+        and ``m`` is the number of spline pieces
+    breaks : np.ndarray
+        The breaks array with shape ``(batch, m + 1)``
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self, coeffs: np.ndarray, breaks: np.ndarray) -> None:
+        coeffs = np.asarray(coeffs)
+        breaks = np.asarray(breaks, dtype=np.float64)
+
+        if coeffs.ndim != 3 or breaks.ndim != 2:
+            raise ValueError("'coeffs' must be a 3-D array and 'breaks' must be a 2-D array")
+        if coeffs.shape[0] != breaks.shape[0] or coeffs.shape[2] != breaks.shape[1] - 1:
+            raise ValueError(
+                f"'coeffs' shape {coeffs.shape} does not match 'breaks' shape {breaks.shape}")
+
+        self._coeffs = coeffs
+        self._breaks = breaks
+
+    @property
+    def breaks(self) -> np.ndarray:
+        return self._breaks
+
+    @property
+    def coeffs(self) -> np.ndarray:
+        return self._coeffs
+
+    @property
+    def order(self) -> int:
+        return self._coeffs.shape[1]
+
+    @property
+    def pieces(self) -> int:
+        return self._coeffs.shape[2]
+
+    @property
+    def ndim(self) -> int:
+        """Returns the number of spline dimensions (univariate splines are stacked)
+        """
+        return 1
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Returns the source data shape ``(batch, n)``
+        """
+        return self._breaks.shape
+
+    def __len__(self) -> int:
+        return self._breaks.shape[0]
+
+    def __getitem__(self, index: int) -> SplinePPForm:
+        """Returns the spline from the stack as :class:`SplinePPForm` instance (without copying)
+        """
+        return SplinePPForm.construct_fast(self._coeffs[index], self._breaks[index])
+
+    def __call__(self,
+                 x: Union[UnivariateDataType, MultivariateDataType],
+                 nu: int = 0,
+                 extrapolate: bool = True) -> np.ndarray:
+        """Evaluates all splines in the stack
+
+        Parameters
+        ----------
+
+        x : 1-d or 2-d array-like
+            Points to evaluate the splines at. 1-D vector ``(m,)`` of points
+            for all splines or 2-D array ``(batch, m)`` of points for each spline.
+
+        nu : [*Optional*] int
+            Order of derivative to evaluate. Must be non-negative.
+
+        extrapolate : [*Optional*] bool
+            Whether to extrapolate to out-of-bounds points based on first and last
+            intervals, or to return NaNs. Default is True.
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Evaluated values with shape ``(batch, m)``
+
+        """
+
+        x = np.asarray(x, dtype=np.float64)
+        batch = len(self)
+
+        if x.ndim == 1:
+            x = np.broadcast_to(x, (batch, x.size))
+        if x.ndim != 2 or x.shape[0] != batch:
+            raise ValueError(
+                f"'x' must be a vector or 2-D array with shape ({batch}, m)")
+
+        if nu < 0:
+            raise ValueError("'nu' must be non-negative")
+
+        indices = bisect_intervals(self._breaks, x)
+        rows = np.arange(batch)[:, np.newaxis]
+
+        t = x - self._breaks[rows, indices]
+        coeffs = np.moveaxis(self._coeffs, 1, 0)[:, rows, indices]
+        values = evaluate_local(derivative_coeffs(coeffs, nu), t)
+
+        if not extrapolate:
+            out_of_bounds = (x < self._breaks[:, :1]) | (x > self._breaks[:, -1:])
+            values[out_of_bounds] = np.nan
+
+        return values
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f'{type(self).__name__}\n'
+            f'  breaks shape: {self.breaks.shape}\n'
+            f'  coeffs shape: {self.coeffs.shape}\n'
+            f'  batch: {len(self)}\n'
+            f'  pieces: {self.pieces}\n'
+            f'  order: {self.order}\n'
+        )
+
+
+class StackedCubicSmoothingSpline(ISmoothingSpline[
+                                      StackedSplinePPForm,
+                                      np.ndarray,
+                                      MultivariateDataType,
+                                      int,
+                                      bool,
+                                  ]):
+    """The stack of univariate cubic smoothing splines with different data sites
+
+    The class computes many univariate smoothing splines with the same number of data sites
+    in one vectorized call. All pentadiagonal linear systems are solved at once.
+
+    Parameters
+    ----------
+
+    xdata : np.ndarray, array-like
+        X input 2-D data array with shape ``(batch, n)``, the data sites for each spline
+        (every row must satisfy ``x1 < x2 < ... < xN``)
+
+    ydata : np.ndarray, array-like
+        Y input 2-D data array with shape ``(batch, n)``
+
+    weights : [*Optional*] np.ndarray, array-like
+        Weights 1-D vector with size ``n`` for all splines or 2-D array ``(batch, n)``
+
+    smooth : [*Optional*] float, Sequence[float]
+        Smoothing parameter in range [0, 1] for all splines or a sequence of parameters
+        for each spline. If it is not set, the parameters will be computed automatically
+        for each spline.
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self,
+                 xdata: MultivariateDataType,
+                 ydata: MultivariateDataType,
+                 weights: Optional[MultivariateDataType] = None,
+                 smooth: Optional[Union[float, Sequence[float]]] = None) -> None:
+
+        x, y, w, smooth = self._prepare_data(xdata, ydata, weights, smooth)
+        coeffs, smooth = self._make_spline(x, y, w, smooth)
+
+        self._spline = StackedSplinePPForm(coeffs, x)
+        self._smooth = smooth
+
+    def __call__(self,
+                 x: Union[UnivariateDataType, MultivariateDataType],
+                 nu: Optional[int] = None,
+                 extrapolate: Optional[bool] = None) -> np.ndarray:
+        """Evaluates all splines in the stack
+
+        Parameters
+        ----------
+
+        x : 1-d or 2-d array-like
+            Points to evaluate the splines at. 1-D vector ``(m,)`` of points
+            for all splines or 2-D array ``(batch, m)`` of points for each spline.
+
+        nu : [*Optional*] int
+            Order of derivative to evaluate. Must be non-negative.
+
+        extrapolate : [*Optional*] bool
+            Whether to extrapolate to out-of-bounds points based on first and last
+            intervals, or to return NaNs. Default is True.
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Evaluated values with shape ``(batch, m)``
+
+        """
+        if nu is None:
+            nu = 0
+        if extrapolate is None:
+            extrapolate = True
+        return self._spline(x, nu=nu, extrapolate=extrapolate)
+
+    @property
+    def smooth(self) -> np.ndarray:
+        """Returns the smoothing factors for each spline
+
+        Returns
+        -------
+        smooth : np.ndarray
+            Smoothing factors vector with size ``batch``
+        """
+        return self._smooth
+
+    @property
+    def spline(self) -> StackedSplinePPForm:
+        """Returns the splines description in `StackedSplinePPForm` instance
+
+        Returns
+        -------
+        spline : StackedSplinePPForm
+            The splines representation in :class:`StackedSplinePPForm` instance
+        """
+        return self._spline
+
+    @staticmethod
+    def _prepare_data(xdata, ydata, weights, smooth):
+        xdata = np.asarray(xdata, dtype=np.float64)
+        ydata = np.asarray(ydata, dtype=np.float64)
+
+        if xdata.ndim != 2:
+            raise ValueError("'xdata' must be a 2-D array with shape (batch, n)")
+        if xdata.shape[1] < 2:
+            raise ValueError("'xdata' must contain at least 2 data points.")
+        if ydata.shape != xdata.shape:
+            raise ValueError(
+                f"'ydata' shape {ydata.shape} must be equal to 'xdata' shape {xdata.shape}")
+
+        if not np.all(np.diff(xdata, axis=1) > 0):
+            raise ValueError(
+                "Items of 'xdata' rows must satisfy the condition: x1 < x2 < ... < xN")
+
+        if weights is None:
+            weights = np.ones_like(xdata)
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape not in (xdata.shape, xdata.shape[1:]):
+                raise ValueError(
+                    f"'weights' must be a vector with size {xdata.shape[1]} "
+                    f"or 2-D array with shape {xdata.shape}")
+            weights = np.broadcast_to(weights, xdata.shape)
+
+        batch = xdata.shape[0]
+
+        if smooth is None or isinstance(smooth, Number):
+            smooth = np.full(batch, np.nan if smooth is None else float(smooth))
+        else:
+            smooth = np.array([np.nan if s is None else float(s) for s in smooth])
+            if smooth.size != batch:
+                raise ValueError(
+                    f"The number of smoothing parameter values must be equal to batch size ({batch})")
+
+        return xdata, ydata, weights, smooth
+
+    @staticmethod
+    def _make_spline(x, y, w, smooth):
+        batch, pcount = x.shape
+
+        dx = np.diff(x, axis=1)
+        dy_dx = np.diff(y, axis=1) / dx
+
+        if pcount == 2:
+            # The corner case for the data with 2 points (1 breaks interval)
+            # In this case we have 2-ordered splines and linear interpolation in fact
+            coeffs = np.stack((dy_dx, y[:, :1]), axis=1)
+            return coeffs, np.ones(batch)
+
+        r, qtw = umv_band_matrices(dx, w)
+
+        auto_smooth = np.isnan(smooth)
+        p = np.where(auto_smooth, 0., smooth)
+        if auto_smooth.any():
+            p_auto = CubicSmoothingSpline._compute_smooth(band_trace(r), band_trace(qtw))
+            p = np.where(auto_smooth, p_auto, p)
+
+        pp = 6. * (1. - p)
+
+        # Solve linear systems for the 2nd derivatives
+        a = pp[:, np.newaxis, np.newaxis] * qtw + p[:, np.newaxis, np.newaxis] * r
+        b = np.diff(dy_dx, axis=1)
+        u = batch_pentadiagonal_solve(a, b)
+
+        pad_width = [(0, 0), (1, 1)]
+
+        d1 = np.diff(np.pad(u, pad_width, mode='constant'), axis=1) / dx
+        d2 = np.diff(np.pad(d1, pad_width, mode='constant'), axis=1)
+
+        yi = y - pp[:, np.newaxis] / w * d2
+        pu = np.pad(p[:, np.newaxis] * u, pad_width, mode='constant')
+
+        c1 = np.diff(pu, axis=1) / dx
+        c2 = 3. * pu[:, :-1]
+        c3 = np.diff(yi, axis=1) / dx - dx * (2. * pu[:, :-1] + pu[:, 1:])
+        c4 = yi[:, :-1]
+
+        coeffs = np.stack((c1, c2, c3, c4), axis=1)
+
+        return coeffs, p
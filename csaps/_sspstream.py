@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming (online) univariate/multivariate cubic smoothing spline implementation
+
+The cubic smoothing spline is the posterior mean of integrated Wiener process
+observed with noise (Wecker & Ansley, 1983). This state-space formulation
+allows to filter data points in constant time per point using Kalman filter
+and to compute the smoothing spline for the trailing window of data points
+using Rauch-Tung-Striebel smoother.
+
+"""
+
+from collections import deque
+from numbers import Number
+from typing import Optional, Union, Tuple, Deque, NamedTuple
+
+import numpy as np
+
+from ._types import UnivariateDataType
+from ._sspumv import SplinePPForm
+
+
+class _State(NamedTuple):
+    x: float
+    w: float
+    y: np.ndarray
+    # filtered state mean (f, f') and covariance (p00, p01, p11)
+    mean: np.ndarray
+    cov: Tuple[float, float, float]
+    # predicted state mean and covariance before the observation
+    pred_mean: Optional[np.ndarray]
+    pred_cov: Optional[Tuple[float, float, float]]
+
+
+class StreamingCubicSmoothingSpline:
+    """Streaming cubic smoothing spline
+
+    The class computes the cubic smoothing spline for data points which arrive
+    one by one. Every appended point is processed in constant time by Kalman filter,
+    the current filtered estimate and its derivative at the latest data site are
+    the values of the smoothing spline computed for all data points received so far.
+
+    The smoothing spline for the trailing window of the data points can be computed
+    on demand using fixed-lag Rauch-Tung-Striebel smoothing pass. The result is the same
+    (up to round-off errors) as :class:`CubicSmoothingSpline` computed for all data points.
+
+    Parameters
+    ----------
+
+    smooth : float
+        Smoothing parameter in range [0, 1] where:
+            - 0: The smoothing spline is the least-squares straight line fit
+            - 1: The cubic spline interpolant with natural condition
+
+    history : [*Optional*] int
+        The maximum number of the latest data points which are kept for computing the spline
+        in :meth:`make_spline`. By default, all data points are kept.
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        from csaps import StreamingCubicSmoothingSpline
+
+        stream = StreamingCubicSmoothingSpline(smooth=0.9, history=1000)
+
+        for x, y in telemetry:
+            stream.append(x, y)
+            print(stream.value, stream.derivative)
+
+        spline = stream.make_spline(window=100)
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self, smooth: float, history: Optional[int] = None) -> None:
+        if not isinstance(smooth, Number) or not (0. <= smooth <= 1.):
+            raise ValueError("'smooth' must be a float in range [0, 1]")
+        if history is not None and history < 2:
+            raise ValueError("'history' must be at least 2")
+
+        self._smooth = float(smooth)
+
+        # The variances of the observation noise (for unit weight) and the process noise
+        self._r = 1. - self._smooth
+        self._q = self._smooth
+
+        self._states: Deque[_State] = deque(maxlen=history)
+        self._size = 0
+
+    @property
+    def smooth(self) -> float:
+        """Returns the smoothing factor
+
+        Returns
+        -------
+        smooth : float
+            Smoothing factor in the range [0, 1]
+        """
+        return self._smooth
+
+    @property
+    def size(self) -> int:
+        """Returns the number of appended data points
+        """
+        return self._size
+
+    @property
+    def xdata(self) -> float:
+        """Returns the latest data site
+        """
+        self._check_empty()
+        return self._states[-1].x
+
+    @property
+    def value(self) -> Union[float, np.ndarray]:
+        """Returns the filtered estimate (the spline value) at the latest data site
+        """
+        self._check_empty()
+        return self._scalar(self._states[-1].mean[0])
+
+    @property
+    def derivative(self) -> Union[float, np.ndarray]:
+        """Returns the filtered estimate of the spline derivative at the latest data site
+
+        The derivative is NaN if only one data point was appended.
+        """
+        self._check_empty()
+        return self._scalar(self._states[-1].mean[1])
+
+    def append(self,
+               x: float,
+               y: Union[float, UnivariateDataType],
+               w: float = 1.0) -> None:
+        """Appends the data point and updates the filtered estimate
+
+        Parameters
+        ----------
+
+        x : float
+            The data site. It must be greater than the previous data site.
+
+        y : float, vector-like
+            The data value (scalar or vector for multivariate data)
+
+        w : [*Optional*] float
+            The weight of the data point, by default 1.0
+        """
+
+        x = float(x)
+        w = float(w)
+        y = np.array(y, dtype=np.float64)
+
+        if w <= 0.:
+            raise ValueError("'w' must be positive")
+
+        if not self._states:
+            self._append_first(x, y, w)
+            return
+
+        prev = self._states[-1]
+
+        if y.shape != prev.y.shape:
+            raise ValueError(f"'y' shape {y.shape} must be equal to the previous data shape {prev.y.shape}")
+        if x <= prev.x:
+            raise ValueError(
+                f"'x' ({x}) must be greater than the previous data site ({prev.x})")
+
+        h = x - prev.x
+        r = self._r / w
+
+        if self._size == 1:
+            state = self._init_state(prev, x, y, w, h, r)
+        else:
+            state = self._update_state(prev, x, y, w, h, r)
+
+        self._states.append(state)
+        self._size += 1
+
+    def make_spline(self, window: Optional[int] = None) -> SplinePPForm:
+        """Computes the smoothing spline for the trailing window of the data points
+
+        Parameters
+        ----------
+
+        window : [*Optional*] int
+            The number of the latest data points for computing the spline.
+            By default, all kept data points are used (see ``history`` parameter).
+
+        Returns
+        -------
+
+        spline : SplinePPForm
+            The spline for the window data sites in PP-form. The spline coincides
+            with the smoothing spline computed for all data points on this window.
+        """
+
+        count = len(self._states)
+
+        if window is None:
+            window = count
+        if window < 2:
+            raise ValueError("'window' must be at least 2")
+        if count < window:
+            raise ValueError(
+                f"Not enough data points ({count}) for the window ({window})")
+
+        states = list(self._states)[-window:]
+        means = [None] * window
+        means[-1] = states[-1].mean
+
+        # Backward Rauch-Tung-Striebel smoothing pass (only the means are needed)
+        for k in range(window - 2, -1, -1):
+            state = states[k]
+            next_state = states[k + 1]
+            h = next_state.x - state.x
+
+            if next_state.pred_mean is None:
+                means[k] = self._smooth_first(state, means[k + 1], h)
+            else:
+                gain = self._smoother_gain(state.cov, next_state.pred_cov, h)
+                diff = means[k + 1] - next_state.pred_mean
+                means[k] = state.mean + np.tensordot(gain, diff, axes=1)
+
+        x = np.array([state.x for state in states])
+        f = np.stack([m[0] for m in means], axis=-1)
+        df = np.stack([m[1] for m in means], axis=-1)
+
+        coeffs = self._hermite_coeffs(x, f, df)
+        axis = f.ndim - 1
+
+        return SplinePPForm.construct_fast(coeffs, x, axis=axis)
+
+    def _append_first(self, x, y, w):
+        mean = np.stack((y, np.full_like(y, np.nan)))
+        state = _State(x=x, w=w, y=y, mean=mean, cov=(self._r / w, np.nan, np.inf),
+                       pred_mean=None, pred_cov=None)
+
+        self._states.append(state)
+        self._size = 1
+
+    def _init_state(self, prev, x, y, w, h, r):
+        # Exact diffuse initialization: with flat prior the state at the second
+        # data site is estimated from two observations: y1 = f1, y0 = f1 - h * df1
+        r0 = self._r / prev.w + self._q * h ** 3 / 3.
+
+        f = y
+        df = (y - prev.y) / h
+        mean = np.stack((f, df))
+
+        # cov = H^-1 R H^-T, H^-1 = [[1, 0], [1/h, -1/h]]
+        cov = (r, r / h, (r + r0) / h ** 2)
+
+        return _State(x=x, w=w, y=y, mean=mean, cov=cov, pred_mean=None, pred_cov=None)
+
+    def _update_state(self, prev, x, y, w, h, r):
+        p00, p01, p11 = prev.cov
+        q = self._q
+
+        # Predict: F = [[1, h], [0, 1]], Q = q * [[h^3/3, h^2/2], [h^2/2, h]]
+        pred_mean = np.stack((prev.mean[0] + h * prev.mean[1], prev.mean[1]))
+        pp00 = p00 + 2. * h * p01 + h * h * p11 + q * h ** 3 / 3.
+        pp01 = p01 + h * p11 + q * h ** 2 / 2.
+        pp11 = p11 + q * h
+
+        # Update
+        s = pp00 + r
+        k0 = pp00 / s
+        k1 = pp01 / s
+
+        innovation = y - pred_mean[0]
+        mean = np.stack((pred_mean[0] + k0 * innovation, pred_mean[1] + k1 * innovation))
+        cov = (pp00 - k0 * pp00, pp01 - k0 * pp01, pp11 - k1 * pp01)
+
+        return _State(x=x, w=w, y=y, mean=mean, cov=cov,
+                      pred_mean=pred_mean, pred_cov=(pp00, pp01, pp11))
+
+    def _smoother_gain(self, cov, pred_cov, h):
+        # J = P F^T Pp^-1
+        p00, p01, p11 = cov
+        pp00, pp01, pp11 = pred_cov
+
+        pf = np.array([[p00 + h * p01, p01], [p01 + h * p11, p11]])
+        det = pp00 * pp11 - pp01 * pp01
+        pp_inv = np.array([[pp11, -pp01], [-pp01, pp00]]) / det
+
+        return pf @ pp_inv
+
+    def _smooth_first(self, state, next_mean, h):
+        # The state at the first data site has diffuse prior: s0 = F^-1 (s1 - e),
+        # the process noise e is estimated from the observation y0 given s1
+        q = self._q
+        r0 = self._r / state.w
+
+        f0 = next_mean[0] - h * next_mean[1]
+        z = state.y - f0
+
+        # G = -H F^-1 = [-1, h], Q G^T
+        qg0 = q * (-h ** 3 / 3. + h * h ** 2 / 2.)
+        qg1 = q * (-h ** 2 / 2. + h * h)
+        s = q * h ** 3 / 3. + r0
+
+        e0 = qg0 * z / s
+        e1 = qg1 * z / s
+
+        df0 = next_mean[1] - e1
+        return np.stack((next_mean[0] - e0 - h * df0, df0))
+
+    @staticmethod
+    def _hermite_coeffs(x, f, df):
+        h = np.diff(x)
+        dfdx = np.diff(f, axis=-1) / h
+
+        c1 = (df[..., :-1] + df[..., 1:] - 2. * dfdx) / h ** 2
+        c2 = (3. * dfdx - 2. * df[..., :-1] - df[..., 1:]) / h
+        c3 = df[..., :-1]
+        c4 = f[..., :-1]
+
+        coeffs = np.stack((c1, c2, c3, c4))
+        return np.moveaxis(coeffs, -1, 1)
+
+    def _check_empty(self):
+        if not self._states:
+            raise ValueError('There are no data points')
+
+    @staticmethod
+    def _scalar(value: np.ndarray):
+        return float(value) if value.ndim == 0 else value
+
+    def __repr__(self):  # pragma: no cover
+        return (
+            f'{type(self).__name__}\n'
+            f'  smooth: {self.smooth}\n'
+            f'  size: {self.size}\n'
+            f'  history: {self._states.maxlen}\n'
+        )
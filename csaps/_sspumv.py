@@ -5,18 +5,154 @@ Univariate/multivariate cubic smoothing spline implementation
 
 """
 
+import copy
 import functools
-from typing import Optional, Union, Tuple, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Number
+from typing import Optional, Union, Tuple, List, Sequence
 
 import numpy as np
 
 import scipy.sparse as sp
 import scipy.sparse.linalg as la
 from scipy.interpolate import PPoly
+from scipy.optimize import minimize_scalar
 
 from ._base import ISplinePPForm, ISmoothingSpline
 from ._types import UnivariateDataType, MultivariateDataType
-from ._reshape import to_2d, prod
+from ._reshape import prod
+from ._ppplan import EvaluationPlan
+from ._storage import PathType, save_arrays, load_arrays
+from ._instrument import phase
+from ._ppeval import evaluate_ppoly, evaluate_ppoly_derivatives, ppoly_output, uniform_step
+from ._banded import (
+    umv_band_matrices,
+    uniform_band_matrices,
+    band_trace,
+    cholesky_factorize,
+    cholesky_solve,
+    cholesky_band_inverse,
+    lu_factorize,
+    lu_solve,
+)
+from ._ppcompress import cubic_coeffs, compress_breaks
+from ._bspline import (
+    normal_band_matrices,
+    penalty_band_matrix,
+    natural_basis_transform,
+    band_to_sparse,
+    sparse_to_band,
+    bspline_ppoly_coeffs,
+)
+
+_ENGINES = ('banded', 'sparse')
+_SMOOTH_METHODS = ('gcv', 'loocv')
+_NAN_POLICIES = ('propagate', 'omit', 'raise')
+_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+# The maximum number of the data items computed at once by default in the blocks mode
+_BLOCK_SIZE = 2 ** 20
+
+# The estimated number of float64 temporary arrays per data column while computing the coefficients
+_BLOCK_TEMPORARIES = 16
+
+# The minimum number of the trailing data columns solved at once without copying the data blocks
+_MIN_GROUP_COLUMNS = 256
+
+# The minimum number of the copied blocks of the leading rows for the middle axis data
+_MIDDLE_AXIS_BLOCKS = 8
+
+# The maximum number of the cached linear system factorizations for uniform data sites
+_UNIFORM_CACHE_SIZE = 8
+
+# The maximum total size in bytes of the cached factorizations (the larger factorizations are not cached)
+_UNIFORM_CACHE_BYTES = 64 * 2 ** 20
+
+# The grid of the smoothing parameter exponents for GCV/LOOCV search (see ``_compute_smooth_cv``)
+_CV_GRID = np.arange(-6., 7.)
+
+# The exponent tolerance and the maximum number of the score evaluations of the refining GCV/LOOCV search
+_CV_XATOL = 1e-2
+_CV_MAX_ITER = 16
+
+# The bound of the float32 round-off of the compressed spline values in the units of
+# the float32 machine epsilon of the maximum absolute spline value
+_FLOAT32_COMPRESS_ROUNDING = 4.
+
+_uniform_cache_lock = threading.Lock()
+_uniform_cache: 'OrderedDict[tuple, Tuple[functools.partial, int]]' = OrderedDict()
+
+
+def _check_dtype(dtype) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if dtype not in _DTYPES:
+        raise ValueError(f"'dtype' must be one of {tuple(d.name for d in _DTYPES)}, but given {dtype.name!r}")
+    return dtype
+
+
+def _check_engine_smooth(engine: str, smooth) -> None:
+    if engine not in _ENGINES:
+        raise ValueError(f"'engine' must be one of {_ENGINES}, but given {engine!r}")
+    if isinstance(smooth, str) and smooth not in _SMOOTH_METHODS:
+        raise ValueError(f"'smooth' method must be one of {_SMOOTH_METHODS}, but given {smooth!r}")
+
+
+def clear_factorization_cache() -> None:
+    """Clears the cache of the linear system factorizations for uniform data sites
+
+    The factorizations for evenly spaced data sites with the constant weights are cached
+    (up to 8 factorizations and 64 MiB in total), so the system is factorized only once for fitting
+    many data series on the same regular grid. The function releases the cached factorizations.
+    """
+    with _uniform_cache_lock:
+        _uniform_cache.clear()
+
+
+def _factorize_uniform(size: int, h: float, w: float, p: float):
+    """Factorizes the linear system for uniform data sites with the constant weights
+
+    The factorizations are cached by ``(size, h, w, p)`` key in LRU order, the cache
+    is bounded by the number of the factorizations and their total size in bytes.
+    """
+    key = (size, h, w, p)
+
+    with _uniform_cache_lock:
+        item = _uniform_cache.get(key)
+        if item is not None:
+            _uniform_cache.move_to_end(key)
+            return item[0]
+
+    r, qtw = uniform_band_matrices(size, h, w)
+    a = 6. * (1. - p) * qtw + p * r
+
+    try:
+        factor, solve = cholesky_factorize(a), cholesky_solve
+    except np.linalg.LinAlgError:
+        factor, solve = lu_factorize(a), lu_solve
+
+    arrays = factor if isinstance(factor, tuple) else (factor,)
+    nbytes = sum(array.nbytes for array in arrays)
+    solve = functools.partial(solve, factor)
+
+    if nbytes > _UNIFORM_CACHE_BYTES:
+        return solve
+
+    # The cached factors are shared between the splines
+    for array in arrays:
+        array.flags.writeable = False
+
+    with _uniform_cache_lock:
+        _uniform_cache[key] = (solve, nbytes)
+
+        total = sum(item[1] for item in _uniform_cache.values())
+
+        while len(_uniform_cache) > _UNIFORM_CACHE_SIZE or total > _UNIFORM_CACHE_BYTES:
+            _, (_, evicted) = _uniform_cache.popitem(last=False)
+            total -= evicted
+
+    return solve
 
 
 class SplinePPForm(ISplinePPForm[np.ndarray, int], PPoly):
@@ -33,6 +169,151 @@ class SplinePPForm(ISplinePPForm[np.ndarray, int], PPoly):
 
     __module__ = 'csaps'
 
+    # Whether the evaluation points are known to be sorted (see ``__call__``)
+    _assume_sorted = False
+
+    def __call__(self,
+                 x: UnivariateDataType,
+                 nu: Union[int, Sequence[int]] = 0,
+                 extrapolate: Optional[Union[bool, str]] = None,
+                 assume_sorted: bool = False) -> np.ndarray:
+        """Evaluates the piecewise polynomial or its derivative
+
+        Parameters
+        ----------
+
+        x : array-like
+            Points to evaluate the spline at.
+
+        nu : [*Optional*] int, Sequence[int]
+            Order of derivative to evaluate. Must be non-negative.
+            If it is a sequence of orders (for example, ``[0, 1, 2]``), the value and the derivatives
+            are evaluated in a single pass finding the intervals for the points once.
+
+        extrapolate : [*Optional*] bool or 'periodic'
+            If bool, determines whether to extrapolate to out-of-bounds points
+            based on first and last intervals, or to return NaNs. If 'periodic',
+            periodic extrapolation is used. If None (default), use ``self.extrapolate``.
+
+        assume_sorted : [*Optional*] bool
+            If True, the points are assumed to be sorted in ascending order (it is not checked),
+            so the sortedness check of the points is skipped. The intervals for the sorted points
+            are found by the linear merge of the points and the breaks for the float32 coefficients
+            and for the sequence of the derivative orders. The float64 coefficients are evaluated
+            by SciPy for the sorted points. By default, the points are checked to be sorted
+            when it is needed.
+
+        Returns
+        -------
+
+        y : np.ndarray
+            Interpolated values. Shape is determined by replacing
+            the interpolation axis in the original array with the shape of x.
+            If ``nu`` is a sequence, the values for all orders are stacked along the new first axis.
+
+        """
+        if extrapolate is None:
+            extrapolate = self.extrapolate
+
+        with phase('umv.evaluate', lambda: dict(points=np.size(x), pieces=self.pieces, columns=prod(self.c.shape[2:]))):
+            if not isinstance(nu, Number):
+                return self._evaluate_derivatives(x, nu, extrapolate, assume_sorted)
+
+            if not assume_sorted or extrapolate == 'periodic':
+                return super().__call__(x, nu, extrapolate)
+
+            # The shallow copy shares the coefficients and the breaks
+            spline = copy.copy(self)
+            spline._assume_sorted = True
+
+            return PPoly.__call__(spline, x, nu, extrapolate)
+
+    def plan(self,
+             x: UnivariateDataType,
+             extrapolate: Optional[Union[bool, str]] = None,
+             assume_sorted: bool = False) -> EvaluationPlan:
+        """Makes the evaluation plan for the points
+
+        The plan can be used for evaluating this spline and any other spline with the same breaks
+        and order at the points without searching the intervals again (see :class:`EvaluationPlan`).
+
+        Parameters
+        ----------
+
+        x : array-like
+            Points to evaluate the spline at.
+
+        extrapolate : [*Optional*] bool or 'periodic'
+            If bool, determines whether to extrapolate to out-of-bounds points
+            based on first and last intervals, or to return NaNs. If 'periodic',
+            periodic extrapolation is used. If None (default), use ``self.extrapolate``.
+
+        assume_sorted : [*Optional*] bool
+            If True, the points are assumed to be sorted in ascending order (it is not checked)
+            and the intervals are found by the linear merge of the points and the breaks
+
+        Returns
+        -------
+
+        plan : EvaluationPlan
+            The evaluation plan
+        """
+        if extrapolate is None:
+            extrapolate = self.extrapolate
+        return EvaluationPlan(self.x, x, order=self.order, extrapolate=extrapolate, assume_sorted=assume_sorted)
+
+    def _evaluate_derivatives(self, x, nu, extrapolate, assume_sorted):
+        nu = [int(n) for n in nu]
+
+        x = np.asarray(x)
+        x_shape = x.shape
+        x = np.ascontiguousarray(x.ravel(), dtype=np.float64)
+
+        if extrapolate == 'periodic':
+            x = self.x[0] + (x - self.x[0]) % (self.x[-1] - self.x[0])
+            extrapolate = False
+            assume_sorted = False
+
+        step = self._uniform_step()
+        if not assume_sorted and x.size > 1:
+            assume_sorted = bool(np.all(x[1:] >= x[:-1]))
+
+        c = self.c.reshape(self.c.shape[0], self.c.shape[1], -1)
+        out = np.empty((len(nu), x.size, c.shape[2]), dtype=self.c.dtype)
+
+        evaluate_ppoly_derivatives(c, self.x, x, nu, extrapolate, out, step, assume_sorted)
+
+        return ppoly_output(out, x_shape, self.c.shape, self.axis)
+
+    def _evaluate(self, x, nu, extrapolate, out):
+        step = self._uniform_step()
+        c = self.c
+
+        if step is None and c.dtype != np.float32:
+            super()._evaluate(x, nu, extrapolate, out)
+            return
+
+        # SciPy evaluates only float64/complex128 coefficients. It starts the interval search
+        # for every point from the interval of the previous point that suits the sorted points,
+        # but for unsorted points the arithmetic lookup in the uniform breaks is faster.
+        assume_sorted = self._assume_sorted or x.size < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+        if assume_sorted and c.dtype != np.float32:
+            super()._evaluate(x, nu, extrapolate, out)
+        else:
+            evaluate_ppoly(c.reshape(c.shape[0], c.shape[1], -1), self.x, x, nu, extrapolate, out, step, assume_sorted)
+
+    def _uniform_step(self) -> Optional[float]:
+        """Returns the step of the uniform breaks or None (the result is cached for the breaks array)
+        """
+        cache = getattr(self, '_uniform_step_cache', None)
+
+        if cache is None or cache[0] is not self.x:
+            cache = (self.x, uniform_step(np.diff(self.x)))
+            self._uniform_step_cache = cache
+
+        return cache[1]
+
     @property
     def breaks(self) -> np.ndarray:
         return self.x
@@ -69,6 +350,141 @@ class SplinePPForm(ISplinePPForm[np.ndarray, int], PPoly):
 
         return tuple(shape)
 
+    def integrate(self, a: float, b: float, extrapolate: Optional[Union[bool, str]] = None) -> np.ndarray:
+        """Computes the definite integral of the spline (see :meth:`scipy.interpolate.PPoly.integrate`)
+
+        The float32 coefficients are integrated in float64 and the result is rounded to float32.
+        """
+        if self.c.dtype != np.float32:
+            return super().integrate(a, b, extrapolate)
+        return self._as_float64().integrate(a, b, extrapolate).astype(np.float32)
+
+    def antiderivative(self, nu: int = 1) -> 'SplinePPForm':
+        """Returns the antiderivative spline (see :meth:`scipy.interpolate.PPoly.antiderivative`)
+
+        The float32 coefficients are integrated in float64 and the result is rounded to float32.
+        """
+        if self.c.dtype != np.float32:
+            return super().antiderivative(nu)
+
+        spline = self._as_float64().antiderivative(nu)
+        return self.construct_fast(spline.c.astype(np.float32), spline.x, extrapolate=spline.extrapolate,
+                                   axis=spline.axis)
+
+    def solve(self,
+              y: float = 0.,
+              discontinuity: bool = True,
+              extrapolate: Optional[Union[bool, str]] = None) -> np.ndarray:
+        """Finds the real solutions of ``spline(x) == y`` (see :meth:`scipy.interpolate.PPoly.solve`)
+
+        The solutions for the float32 coefficients are found in float64.
+        """
+        if self.c.dtype != np.float32:
+            return super().solve(y, discontinuity, extrapolate)
+        return self._as_float64().solve(y, discontinuity, extrapolate)
+
+    def roots(self, discontinuity: bool = True, extrapolate: Optional[Union[bool, str]] = None) -> np.ndarray:
+        """Finds the real roots of the spline (see :meth:`scipy.interpolate.PPoly.roots`)
+
+        The roots for the float32 coefficients are found in float64.
+        """
+        return self.solve(0., discontinuity, extrapolate)
+
+    def _as_float64(self) -> 'SplinePPForm':
+        # SciPy integration and root finding routines support only float64/complex128 coefficients
+        return self.construct_fast(self.c.astype(np.float64), self.x, extrapolate=self.extrapolate, axis=self.axis)
+
+    def compress(self, tol: float) -> 'SplinePPForm':
+        """Returns the compressed spline with the reduced number of the pieces
+
+        The adjacent pieces are merged into the cubic pieces while the maximum absolute deviation
+        from this spline (over all data dimensions) on the breaks range is not greater than ``tol``.
+        For float32 coefficients the deviation includes the float32 round-off of the compressed
+        coefficients, so the pieces are merged only if ``tol`` exceeds the round-off.
+        The merged pieces interpolate the values and the 1st derivatives of this spline at
+        the remaining breaks, so the compressed spline is C1-continuous. The pieces that cannot
+        be merged are kept as is.
+
+        Parameters
+        ----------
+
+        tol : float
+            The maximum absolute deviation from this spline
+
+        Returns
+        -------
+
+        spline : SplinePPForm
+            The compressed spline (the cubic spline or the copy of this spline if no pieces are merged)
+        """
+        if tol < 0:
+            raise ValueError("'tol' must be non-negative")
+
+        c = self.c
+
+        if c.dtype == np.float32 and c.size > 0:
+            # The compressed coefficients are rounded to float32, so the round-off is reserved in the tolerance
+            rounding = _FLOAT32_COMPRESS_ROUNDING * np.finfo(np.float32).eps * float(np.abs(c[-1]).max())
+            tol = max(tol - rounding, 0.)
+
+        with phase('umv.compress', lambda: dict(pieces=self.pieces, columns=prod(c.shape[2:]))):
+            kept, coeffs = compress_breaks(
+                self.x, cubic_coeffs(c.reshape(c.shape[:2] + (-1,))), tol,
+                piece_errors=lambda errors: errors.max(axis=1))
+
+            if kept.all():
+                coeffs, breaks = c.copy(), self.x.copy()
+            else:
+                coeffs = coeffs.reshape(coeffs.shape[:2] + c.shape[2:]).astype(c.dtype, copy=False)
+                breaks = self.x[kept]
+
+        return self.construct_fast(coeffs, breaks, extrapolate=self.extrapolate, axis=self.axis)
+
+    def save(self, file: PathType) -> None:
+        """Saves the spline to the file
+
+        The breaks and coefficients are stored aligned in the binary file with the axis and
+        the extrapolation mode, so the spline can be loaded by :meth:`load` method without
+        copying the arrays (as memory-mapped arrays).
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+        """
+        save_arrays(file, type(self).__name__,
+                    arrays={'breaks': self.x, 'coeffs': self.c},
+                    meta={'axis': self.axis, 'extrapolate': self.extrapolate, 'order': self.order})
+
+    @classmethod
+    def load(cls, file: PathType, mmap_mode: Optional[str] = 'r') -> 'SplinePPForm':
+        """Loads the spline from the file saved by :meth:`save` method
+
+        The memory-mapped arrays are shared between the processes that load the same file,
+        and the spline can be evaluated immediately without reading all coefficients.
+
+        Parameters
+        ----------
+
+        file : str, os.PathLike
+            The file path
+
+        mmap_mode : [*Optional*] str, None
+            The memory-map mode for the arrays (see :class:`numpy.memmap`).
+            By default, the arrays are memory-mapped read-only without copying.
+            If it is None, the arrays are read into memory.
+
+        Returns
+        -------
+
+        spline : SplinePPForm
+            The spline
+        """
+        arrays, meta = load_arrays(file, cls.__name__, mmap_mode=mmap_mode)
+        return cls.construct_fast(arrays['coeffs'], arrays['breaks'],
+                                  extrapolate=meta['extrapolate'], axis=meta['axis'])
+
     def __repr__(self):  # pragma: no cover
         return (
             f'{type(self).__name__}\n'
@@ -105,15 +521,85 @@ class CubicSmoothingSpline(ISmoothingSpline[
     weights : [*Optional*] np.ndarray, list
         Weights 1-D vector with size equal of ``xdata`` size
 
-    smooth : [*Optional*] float
+    smooth : [*Optional*] float, str
         Smoothing parameter in range [0, 1] where:
             - 0: The smoothing spline is the least-squares straight line fit
             - 1: The cubic spline interpolant with natural condition
 
+        If it is not set, the parameter is computed by a heuristic that depends only on ``xdata``.
+        It also can be the name of the method for data-driven choice of the parameter:
+            - 'gcv': minimizing generalized cross-validation score
+            - 'loocv': minimizing ordinary leave-one-out cross-validation score
+
     axis : [*Optional*] int
         Axis along which ``ydata`` is assumed to be varying.
         Meaning that for x[i] the corresponding values are np.take(ydata, i, axis=axis).
         By default is -1 (the last axis).
+
+    engine : [*Optional*] str
+        The linear system solver engine:
+            - 'banded': the system is assembled in LAPACK band storage and solved
+              with banded Cholesky factorization in O(n) time and memory (default)
+            - 'sparse': the system is assembled as SciPy sparse matrices and solved with SuperLU
+
+    dtype : [*Optional*] np.dtype, str
+        The floating-point type of ``ydata``, the spline coefficients and the evaluated values:
+        ``np.float64`` (default) or ``np.float32``. The float32 mode halves the memory for large
+        multivariate data. The coefficients are computed in float64 by the blocks of data columns
+        and are rounded to float32, the spline is evaluated in float32. The relative error of the
+        spline values is about ``1e-6`` and the error of the derivatives grows as the inverse
+        of the data sites spacing. It is reasonable when the data noise is much greater than
+        float32 round-off.
+
+    block_columns : [*Optional*] int
+        The number of data columns (the data vectors along ``axis``) for which the coefficients
+        are computed at once. The linear system is factorized once and the columns are solved
+        by the blocks, so the temporary memory is bounded by the block size. It allows to
+        fit memory-mapped ``ydata`` which does not fit in RAM (``axis`` should be the first or
+        the last axis of ``ydata``, otherwise the data is copied while reshaping).
+        By default, all columns are computed at once for float64 data.
+
+    max_memory : [*Optional*] int
+        The approximate limit of the temporary memory in bytes for computing the blocks
+        of columns. It is used to compute ``block_columns`` if it is not set.
+
+    out : [*Optional*] np.ndarray
+        The C-contiguous output array (it can be ``np.memmap``) for the spline coefficients with
+        shape ``(4, n - 1, ...)`` (or ``(2, 1, ...)`` for 2 data sites) and ``dtype``, where ``...``
+        is the shape of ``ydata`` without ``axis``. The spline uses this array without copying.
+
+    workers : [*Optional*] int
+        The maximum number of threads for computing the blocks of data columns in parallel.
+        The linear system factorization is shared, and the back-substitutions and the coefficients
+        assembly for the blocks are independent (LAPACK and NumPy release the GIL).
+        If ``block_columns`` is not set, the columns are split evenly between the threads.
+        The temporary memory grows proportionally to the number of threads.
+        By default the columns are computed in the calling thread.
+
+    nan_policy : [*Optional*] str
+        Defines how to handle NaN values in ``ydata``:
+            - 'propagate': NaN values are propagated to the spline (default)
+            - 'omit': NaN values are treated as the data sites with zero weight.
+              The data columns are grouped by the missing values mask, and the linear system
+              is factorized once for each group. The spline is linear outside of the range
+              of the data sites without NaN values. The columns with less than 2 valid values
+              have NaN coefficients. The smoothing parameter is computed using all data sites
+              (the data-driven methods pool the score over the groups using their valid data sites).
+            - 'raise': ValueError is raised if ``ydata`` contains NaN values
+
+    knots : [*Optional*] int, np.ndarray
+        The reduced set of the spline breaks for the penalized regression spline:
+            - int: the number of the knots placed at the quantiles of the data sites
+            - array: the strictly increasing knots vector covering the data sites range
+
+        The spline minimizes the same smoothing spline functional over the natural cubic
+        splines with the given knots instead of the data sites. The cost is linear in the number
+        of the data sites and the number of the knots, and the spline has ``knots - 1`` pieces,
+        so it is much smaller and faster to evaluate for large data. If the knots are the data
+        sites, the spline is equal to the smoothing spline. The data-driven smoothing methods,
+        ``nan_policy`` other than 'propagate', ``out``, ``block_columns``, ``max_memory``
+        and ``workers`` are not supported with the knots.
+        By default, the breaks are the data sites.
     """
 
     __module__ = 'csaps'
@@ -122,20 +608,60 @@ class CubicSmoothingSpline(ISmoothingSpline[
                  xdata: UnivariateDataType,
                  ydata: MultivariateDataType,
                  weights: Optional[UnivariateDataType] = None,
-                 smooth: Optional[float] = None,
-                 axis: int = -1):
+                 smooth: Optional[Union[float, str]] = None,
+                 axis: int = -1,
+                 engine: str = 'banded',
+                 dtype: Union[np.dtype, str, type] = np.float64,
+                 block_columns: Optional[int] = None,
+                 max_memory: Optional[int] = None,
+                 out: Optional[np.ndarray] = None,
+                 workers: Optional[int] = None,
+                 nan_policy: str = 'propagate',
+                 knots: Optional[Union[int, UnivariateDataType]] = None):
+
+        _check_engine_smooth(engine, smooth)
+
+        if nan_policy not in _NAN_POLICIES:
+            raise ValueError(f"'nan_policy' must be one of {_NAN_POLICIES}, but given {nan_policy!r}")
+        if block_columns is not None and block_columns < 1:
+            raise ValueError("'block_columns' must be positive")
+        if max_memory is not None and max_memory <= 0:
+            raise ValueError("'max_memory' must be positive")
+
+        dtype = _check_dtype(dtype)
+
+        with phase('umv.prepare_data') as ph:
+            x, y, w, shape, axis = self._prepare_data(xdata, ydata, weights, axis, dtype)
+            ph.update(size=x.size, columns=prod(shape) // x.size)
+
+        if knots is not None:
+            if (isinstance(smooth, str) or nan_policy != 'propagate' or
+                    any(arg is not None for arg in (out, block_columns, max_memory, workers))):
+                raise ValueError(
+                    "The data-driven 'smooth' methods, 'nan_policy', 'out', 'block_columns', "
+                    "'max_memory' and 'workers' are not supported with 'knots'")
+
+            knots = self._prepare_knots(knots, x)
+            coeffs, smooth = self._make_spline_knots(x, y, w, smooth, shape, knots, engine, dtype)
+            spline = SplinePPForm.construct_fast(coeffs, knots, axis=axis)
+        else:
+            if block_columns is None and max_memory is not None:
+                block_columns = max(1, max_memory // (x.size * 8 * _BLOCK_TEMPORARIES))
+            if out is not None:
+                self._check_out(out, shape, dtype)
 
-        x, y, w, shape, axis = self._prepare_data(xdata, ydata, weights, axis)
-        coeffs, smooth = self._make_spline(x, y, w, smooth, shape)
-        spline = SplinePPForm.construct_fast(coeffs, x, axis=axis)
+            coeffs, smooth = self._make_spline(x, y, w, smooth, shape, engine, dtype,
+                                               block_columns, out, workers, nan_policy)
+            spline = SplinePPForm.construct_fast(coeffs, x, axis=axis)
 
         self._smooth = smooth
         self._spline = spline
 
     def __call__(self,
                  x: UnivariateDataType,
-                 nu: Optional[int] = None,
-                 extrapolate: Optional[Union[bool, str]] = None) -> np.ndarray:
+                 nu: Optional[Union[int, Sequence[int]]] = None,
+                 extrapolate: Optional[Union[bool, str]] = None,
+                 assume_sorted: bool = False) -> np.ndarray:
         """Evaluate the spline for given data
 
         Parameters
@@ -144,14 +670,20 @@ class CubicSmoothingSpline(ISmoothingSpline[
         x : 1-d array-like
             Points to evaluate the spline at.
 
-        nu : [*Optional*] int
+        nu : [*Optional*] int, Sequence[int]
             Order of derivative to evaluate. Must be non-negative.
+            If it is a sequence of orders (for example, ``[0, 1, 2]``), the values for all orders
+            are evaluated in a single pass and stacked along the new first axis.
 
         extrapolate : [*Optional*] bool or 'periodic'
             If bool, determines whether to extrapolate to out-of-bounds points
             based on first and last intervals, or to return NaNs. If 'periodic',
             periodic extrapolation is used. Default is True.
 
+        assume_sorted : [*Optional*] bool
+            If True, the points are assumed to be sorted in ascending order (it is not checked),
+            so the sortedness check of the points is skipped (see :meth:`SplinePPForm.__call__`).
+
         Notes
         -----
 
@@ -164,7 +696,7 @@ class CubicSmoothingSpline(ISmoothingSpline[
         """
         if nu is None:
             nu = 0
-        return self._spline(x, nu=nu, extrapolate=extrapolate)
+        return self._spline(x, nu=nu, extrapolate=extrapolate, assume_sorted=assume_sorted)
 
     @property
     def smooth(self) -> float:
@@ -188,124 +720,967 @@ class CubicSmoothingSpline(ISmoothingSpline[
         """
         return self._spline
 
+    @classmethod
+    def prepare(cls,
+                xdata: UnivariateDataType,
+                weights: Optional[UnivariateDataType] = None,
+                smooth: Optional[float] = None,
+                engine: str = 'banded') -> 'PreparedCubicSmoothingSpline':
+        """Prepares the smoothing spline linear system for the given data sites
+
+        The linear system is assembled and factorized once, and then it can be used
+        for fitting many ``ydata`` with the same ``xdata``, ``weights`` and ``smooth``.
+
+        Parameters
+        ----------
+
+        xdata : np.ndarray, sequence, vector-like
+            X input 1-D data vector (data sites: ``x1 < x2 < ... < xN``)
+
+        weights : [*Optional*] np.ndarray, list
+            Weights 1-D vector with size equal of ``xdata`` size
+
+        smooth : [*Optional*] float
+            Smoothing parameter in range [0, 1]
+
+        engine : [*Optional*] str
+            The linear system solver engine: 'banded' (default) or 'sparse'
+
+        Returns
+        -------
+        prepared : PreparedCubicSmoothingSpline
+            The prepared smoothing spline object
+
+        See Also
+        --------
+        PreparedCubicSmoothingSpline
+
+        """
+        return PreparedCubicSmoothingSpline(xdata, weights=weights, smooth=smooth, engine=engine)
+
+    @classmethod
+    def path(cls,
+             xdata: UnivariateDataType,
+             ydata: MultivariateDataType,
+             smooths: Sequence[Optional[float]],
+             weights: Optional[UnivariateDataType] = None,
+             axis: int = -1,
+             xi: Optional[UnivariateDataType] = None,
+             workers: Optional[int] = None) -> Union[List['CubicSmoothingSpline'], np.ndarray]:
+        """Computes the smoothing splines for the sequence of smoothing parameters
+
+        The linear system matrices are assembled once and their diagonals are reused
+        for all smoothing parameters, only the linear combination ``6(1-p) QtW^-1Q + p R``
+        is factorized for each parameter.
+
+        Parameters
+        ----------
+
+        xdata : np.ndarray, sequence, vector-like
+            X input 1-D data vector (data sites: ``x1 < x2 < ... < xN``)
+
+        ydata : np.ndarray, vector-like, sequence[vector-like]
+            Y input 1-D data vector or ND-array with shape[axis] equal of `xdata` size)
+
+        smooths : Sequence[float]
+            The sequence of smoothing parameters in range [0, 1].
+            None item means the parameter is computed automatically.
+
+        weights : [*Optional*] np.ndarray, list
+            Weights 1-D vector with size equal of ``xdata`` size
+
+        axis : [*Optional*] int
+            Axis along which ``ydata`` is assumed to be varying.
+            By default is -1 (the last axis).
+
+        xi : [*Optional*] np.ndarray, sequence, vector-like
+            The data sites for evaluating the splines. If it is set, the method returns
+            the stacked array of evaluated values instead of the splines.
+
+        workers : [*Optional*] int
+            The maximum number of threads for computing the splines in parallel.
+            By default the splines are computed sequentially.
+
+        Returns
+        -------
+
+        splines : List[CubicSmoothingSpline]
+            The list of smoothing splines for each smoothing parameter if ``xi`` is not set
+
+        values : np.ndarray
+            The array of the evaluated values with shape ``(len(smooths), ...)``
+            where ``...`` is the shape of the evaluated values for one spline
+
+        """
+
+        if any(isinstance(sm, str) for sm in smooths):
+            raise ValueError("'smooths' items must be floats or None")
+
+        x, y, w, shape, axis = cls._prepare_data(xdata, ydata, weights, axis)
+        dx = cls._diff_xdata(x)
+        bands = umv_band_matrices(dx, w) if dx.size > 1 else None
+
+        def fit(smooth):
+            if bands is None:
+                solve, p = None, 1.0
+            else:
+                solve, p = cls._factorize_banded(dx, w, smooth, bands)
+
+            coeffs = cls._make_coeffs(dx, y, w, p, solve, shape)
+            spline = cls._from_spline(SplinePPForm.construct_fast(coeffs, x, axis=axis), p)
+
+            return spline if xi is None else spline(xi)
+
+        if workers is None or workers <= 1:
+            results = [fit(smooth) for smooth in smooths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(fit, smooths))
+
+        if xi is None:
+            return results
+        return np.stack(results)
+
+    @classmethod
+    def _from_spline(cls, spline: SplinePPForm, smooth: float) -> 'CubicSmoothingSpline':
+        obj = cls.__new__(cls)
+        obj._smooth = smooth
+        obj._spline = spline
+        return obj
+
     @staticmethod
-    def _prepare_data(xdata, ydata, weights, axis):
+    def _prepare_data(xdata, ydata, weights, axis, dtype=np.float64):
+        xdata, weights = CubicSmoothingSpline._prepare_xdata(xdata, weights)
+        ydata, shape, axis = CubicSmoothingSpline._prepare_ydata(ydata, xdata.size, axis, dtype)
+
+        return xdata, ydata, weights, shape, axis
+
+    @staticmethod
+    def _prepare_xdata(xdata, weights):
         xdata = np.asarray(xdata, dtype=np.float64)
-        ydata = np.asarray(ydata, dtype=np.float64)
 
         if xdata.ndim > 1:
             raise ValueError("'xdata' must be a vector")
         if xdata.size < 2:
             raise ValueError("'xdata' must contain at least 2 data points.")
 
+        if weights is None:
+            weights = np.ones_like(xdata)
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.size != xdata.size:
+                raise ValueError('Weights vector size must be equal of xdata size')
+
+        return xdata, weights
+
+    @staticmethod
+    def _prepare_ydata(ydata, size, axis, dtype=np.float64):
+        ydata = np.asarray(ydata)
+
+        # The floating-point data is cast by the blocks while computing the coefficients,
+        # so memory-mapped data is not loaded at once
+        if ydata.dtype not in _DTYPES:
+            ydata = ydata.astype(dtype)
+
+        if ydata.ndim == 0:
+            raise ValueError("'ydata' must be a 1-D or N-D array")
+
         axis = ydata.ndim + axis if axis < 0 else axis
 
-        if ydata.shape[axis] != xdata.size:
+        if ydata.shape[axis] != size:
             raise ValueError(
                 f"'ydata' data must be a 1-D or N-D array with shape[{axis}] "
-                f"that is equal to 'xdata' size ({xdata.size})")
+                f"that is equal to 'xdata' size ({size})")
 
         # Rolling axis for using its shape while constructing coeffs array
         shape = np.rollaxis(ydata, axis).shape
 
-        # Reshape ydata N-D array to 2-D NxM array where N is the data
-        # dimension and M is the number of data points.
-        ydata = to_2d(ydata, axis)
+        # Reshape ydata N-D array to 3-D array (pre, n, post) where n is the number of data points.
+        # It is the view for contiguous data, the data axis is not transposed.
+        ydata = ydata.reshape(prod(ydata.shape[:axis]), size, prod(ydata.shape[axis + 1:]))
 
-        if weights is None:
-            weights = np.ones_like(xdata)
-        else:
-            weights = np.asarray(weights, dtype=np.float64)
-            if weights.size != xdata.size:
-                raise ValueError('Weights vector size must be equal of xdata size')
+        return ydata, shape, axis
 
-        return xdata, ydata, weights, shape, axis
+    @staticmethod
+    def _ydata_columns(ydata):
+        """Returns 2-D array of the data columns with shape (n, M) for 3-D ydata view (pre, n, post)
+        """
+        pre, size, post = ydata.shape
+
+        if pre == 1:
+            return ydata[0]
+        if post == 1:
+            return ydata[:, :, 0].T
+
+        return ydata.transpose(1, 0, 2).reshape(size, pre * post)
+
+    @staticmethod
+    def _check_out(out, shape, dtype):
+        order = 2 if shape[0] == 2 else 4
+        c_shape = (order, shape[0] - 1) + shape[1:]
+
+        if not isinstance(out, np.ndarray):
+            raise ValueError("'out' must be a numpy array")
+        if out.shape != c_shape or out.dtype != dtype:
+            raise ValueError(
+                f"'out' must have shape {c_shape} and dtype {dtype.name}, "
+                f"but given shape {out.shape} and dtype {out.dtype.name}")
+        if not out.flags.c_contiguous or not out.flags.writeable:
+            raise ValueError("'out' must be C-contiguous and writeable")
 
     @staticmethod
-    def _compute_smooth(a, b):
+    def _compute_smooth(trace_r, trace_qtw):
         """
         The calculation of the smoothing spline requires the solution of a
         linear system whose coefficient matrix has the form p*A + (1-p)*B, with
         the matrices A and B depending on the data sites x. The default value
         of p makes p*trace(A) equal (1 - p)*trace(B).
         """
+        return 1. / (1. + trace_r / (6. * trace_qtw))
 
-        def trace(m: sp.dia_matrix):
-            return m.diagonal().sum()
+    @staticmethod
+    def _cv_score(lam, dx, w, b, r, qtw, method):
+        """Computes GCV or LOOCV score for the smoothing parameter ``p = 1 / (1 + lam)``
+        """
+        terms = CubicSmoothingSpline._cv_score_terms(lam, dx, w, b, r, qtw, method)
+        return CubicSmoothingSpline._pooled_cv_score([terms], method)
+
+    @staticmethod
+    def _pooled_cv_score(terms, method):
+        """Computes GCV or LOOCV score pooled over the terms of the groups of the columns
+
+        GCV score is ``N * RSS / trace(I - H)^2`` and LOOCV score is the mean of the weighted
+        squared leave-one-out residuals over all ``N`` data values of the groups.
+        """
+        if any(item is None for item in terms):
+            return np.inf
+
+        errors, trace, count = (sum(items) for items in zip(*terms))
+
+        if method == 'gcv':
+            score = count * errors / trace ** 2
+        else:
+            score = errors / count
+
+        return score if np.isfinite(score) else np.inf
+
+    @staticmethod
+    def _cv_score_terms(lam, dx, w, b, r, qtw, method):
+        """Computes the terms of GCV or LOOCV score for the smoothing parameter ``p = 1 / (1 + lam)``
+
+        Returns the sum of the weighted squared residuals (GCV) or leave-one-out residuals (LOOCV),
+        the trace of ``I - H`` for all columns and the number of the data values
+        or None if the linear system cannot be factorized.
+
+        The linear system is scaled by ``1 / p`` to keep the precision for ``p`` close to 1.
+        The smoothed values residuals are ``y - f(x) = 6 lam W^-1 Q u`` and the influence
+        matrix diagonal is ``1 - 6 lam W^-1 diag(Q A^-1 Q^T)``. The band of ``A^-1``
+        is computed from the banded Cholesky factor in O(n).
+        """
+
+        pp = 6. * lam
+
+        try:
+            cb = cholesky_factorize(pp * qtw + r)
+        except np.linalg.LinAlgError:
+            return None
+
+        u = cholesky_solve(cb, b)
+        sb = cholesky_band_inverse(cb)
+
+        # Q u
+        pad_width = [(1, 1), (0, 0)]
+        d1 = np.diff(np.pad(u, pad_width, mode='constant'), axis=0) / dx[:, np.newaxis]
+        qu = np.diff(np.pad(d1, pad_width, mode='constant'), axis=0)
+
+        # Q has three non-zero items in each row for the columns (i-2, i-1, i)
+        dx_recip = 1. / dx
+        qa = np.pad(dx_recip[:-1], (0, 2), mode='constant')
+        qc = np.pad(dx_recip[1:], (2, 0), mode='constant')
+        qb = -np.pad(dx_recip[:-1] + dx_recip[1:], (1, 1), mode='constant')
+
+        # A^-1 diagonals in rows form: S[k, k], S[k, k+1], S[k, k+2]
+        s0 = sb[2]
+        s1 = np.pad(sb[1, 1:], (0, 1), mode='constant')
+        s2 = np.pad(sb[0, 2:], (0, 2), mode='constant')
+
+        def shift(v, k):
+            return np.pad(v, (k, 2 - k), mode='constant')
+
+        qsq_diag = (qc * qc * shift(s0, 2) + qb * qb * shift(s0, 1) + qa * qa * shift(s0, 0) +
+                    2. * qc * qb * shift(s1, 2) + 2. * qc * qa * shift(s2, 2) + 2. * qb * qa * shift(s1, 1))
+
+        columns = qu.shape[1]
+
+        if method == 'gcv':
+            errors = np.sum((pp * qu) ** 2 / w[:, np.newaxis])
+            trace = columns * pp * np.sum(qsq_diag / w)
+        else:
+            errors = np.sum(w[:, np.newaxis] * (qu / qsq_diag[:, np.newaxis]) ** 2)
+            trace = 0.
 
-        return 1. / (1. + trace(a) / (6. * trace(b)))
+        return errors, trace, w.size * columns
 
     @staticmethod
-    def _make_spline(x, y, w, smooth, shape):
-        pcount = x.size
+    def _compute_smooth_cv(dx, w, y, method, groups=None):
+        """Computes the smoothing parameter by minimizing GCV or LOOCV score
+
+        The parameter is searched as ``p = 1 / (1 + rho * 10^t)`` where ``rho`` is chosen
+        such that ``t = 0`` gives the default (trace-balancing) smoothing parameter.
+
+        If ``groups`` is given, it is the list of ``(dx, w, y)`` for the groups of the columns
+        with the different valid data sites. The score is pooled over the groups and ``dx``, ``w``
+        of all data sites define ``rho``.
+        """
+
+        r, qtw = umv_band_matrices(dx, w)
+        rho = band_trace(r) / (6. * band_trace(qtw))
+
+        if groups is None:
+            systems = [(dx, w, y, r, qtw)]
+        else:
+            systems = [(dxg, wg, yg) + umv_band_matrices(dxg, wg) for dxg, wg, yg in groups]
+
+        systems = [
+            (dxg, wg, np.diff(np.diff(yg, axis=0) / dxg[:, np.newaxis], axis=0), rg, qg)
+            for dxg, wg, yg, rg, qg in systems
+        ]
+
+        def score(t):
+            lam = rho * 10. ** t
+            terms = [CubicSmoothingSpline._cv_score_terms(lam, *system, method) for system in systems]
+            return CubicSmoothingSpline._pooled_cv_score(terms, method)
+
+        # The coarse grid search brackets the minimum for the bounded refining search
+        grid_scores = [score(t) for t in _CV_GRID]
+        best = int(np.argmin(grid_scores))
+        t_grid = _CV_GRID[best]
+
+        res = minimize_scalar(score, bounds=(t_grid - 1., t_grid + 1.), method='bounded',
+                              options={'xatol': _CV_XATOL, 'maxiter': _CV_MAX_ITER})
+        t = res.x if res.fun <= grid_scores[best] else t_grid
+
+        return 1. / (1. + rho * 10. ** t)
+
+    @staticmethod
+    def _diff_xdata(x):
         dx = np.diff(x)
 
         if not all(dx > 0):  # pragma: no cover
             raise ValueError(
                 "Items of 'xdata' vector must satisfy the condition: x1 < x2 < ... < xN")
 
-        dy = np.diff(y, axis=1)
-        dy_dx = dy / dx
+        return dx
 
-        if pcount == 2:
-            # The corner case for the data with 2 points (1 breaks interval)
-            # In this case we have 2-ordered spline and linear interpolation in fact
-            yi = y[:, 0][:, np.newaxis]
+    @staticmethod
+    def _factorize_sparse(dx, w, smooth):
+        pcount = dx.size + 1
 
-            c_shape = (2, pcount - 1) + shape[1:]
-            c = np.vstack((dy_dx, yi)).reshape(c_shape)
-            p = 1.0
+        with phase('umv.assemble', size=pcount, engine='sparse'):
+            # Create diagonal sparse matrices
+            diags_r = np.vstack((dx[1:], 2 * (dx[1:] + dx[:-1]), dx[:-1]))
+            r = sp.spdiags(diags_r, [-1, 0, 1], pcount - 2, pcount - 2)
 
-            return c, p
+            dx_recip = 1. / dx
+            diags_qtw = np.vstack((dx_recip[:-1], -(dx_recip[1:] + dx_recip[:-1]), dx_recip[1:]))
+            diags_sqrw_recip = 1. / np.sqrt(w)
 
-        # Create diagonal sparse matrices
-        diags_r = np.vstack((dx[1:], 2 * (dx[1:] + dx[:-1]), dx[:-1]))
-        r = sp.spdiags(diags_r, [-1, 0, 1], pcount - 2, pcount - 2)
+            qtw = (sp.diags(diags_qtw, [0, 1, 2], (pcount - 2, pcount)) @
+                   sp.diags(diags_sqrw_recip, 0, (pcount, pcount)))
+            qtw = qtw @ qtw.T
 
-        dx_recip = 1. / dx
-        diags_qtw = np.vstack((dx_recip[:-1], -(dx_recip[1:] + dx_recip[:-1]), dx_recip[1:]))
-        diags_sqrw_recip = 1. / np.sqrt(w)
+            if smooth is None:
+                p = CubicSmoothingSpline._compute_smooth(r.diagonal().sum(), qtw.diagonal().sum())
+            else:
+                p = smooth
+
+            pp = (6. * (1. - p))
+
+            a = (pp * qtw + p * r).tocsc()
+
+        with phase('umv.factorize', size=pcount, engine='sparse'):
+            solve = la.splu(a).solve
+
+        return solve, p
+
+    @staticmethod
+    def _factorize_banded(dx, w, smooth, bands=None):
+        with phase('umv.assemble', size=dx.size + 1, engine='banded'):
+            r, qtw = umv_band_matrices(dx, w) if bands is None else bands
+
+            if smooth is None:
+                p = CubicSmoothingSpline._compute_smooth(band_trace(r), band_trace(qtw))
+            else:
+                p = smooth
 
-        qtw = (sp.diags(diags_qtw, [0, 1, 2], (pcount - 2, pcount)) @
-               sp.diags(diags_sqrw_recip, 0, (pcount, pcount)))
-        qtw = qtw @ qtw.T
+            pp = (6. * (1. - p))
 
+            a = pp * qtw + p * r
+
+        with phase('umv.factorize', size=dx.size + 1, engine='banded'):
+            try:
+                solve = functools.partial(cholesky_solve, cholesky_factorize(a))
+            except np.linalg.LinAlgError:
+                # The matrix is not positive-definite numerically for extremely ill-conditioned systems
+                solve = functools.partial(lu_solve, lu_factorize(a))
+
+        return solve, p
+
+    @staticmethod
+    def _factorize(dx, w, smooth, engine):
+        """Assembles and factorizes the linear system for the 2nd derivatives
+
+        Returns the solver function for the factorized system and the smoothing parameter.
+        """
+        if dx.size == 1:
+            # The corner case for the data with 2 points (1 breaks interval)
+            # In this case we have 2-ordered spline and linear interpolation in fact
+            return None, 1.0
+
+        if engine == 'sparse':
+            return CubicSmoothingSpline._factorize_sparse(dx, w, smooth)
+
+        h = uniform_step(dx)
+        if h is not None and np.all(w == w[0]):
+            return CubicSmoothingSpline._factorize_uniform(dx.size + 1, h, float(w[0]), smooth)
+
+        return CubicSmoothingSpline._factorize_banded(dx, w, smooth)
+
+    @staticmethod
+    def _factorize_uniform(size, h, w, smooth):
         if smooth is None:
-            p = CubicSmoothingSpline._compute_smooth(r, qtw)
+            # The traces of the matrices with constant diagonals
+            trace_r = 4. * h * (size - 2)
+            trace_qtw = 6. / (h * h * w) * (size - 2)
+            p = CubicSmoothingSpline._compute_smooth(trace_r, trace_qtw)
         else:
-            p = smooth
+            p = float(smooth)
 
-        pp = (6. * (1. - p))
+        # The factorizations are cached, so the phase is short for the repeated fitting
+        with phase('umv.factorize', size=size, engine='uniform'):
+            solve = _factorize_uniform(size, h, w, p)
 
-        # Solve linear system for the 2nd derivatives
-        a = pp * qtw + p * r
-        b = np.diff(dy_dx, axis=1).T
+        return solve, p
 
-        u = la.spsolve(a, b)
-        if u.ndim < 2:
-            u = u[np.newaxis]
-        if y.shape[0] == 1:
-            u = u.T
+    @staticmethod
+    def _smooth_sites(dx, y, w, p, solve):
+        """Solves the linear system and computes smoothed values on the data sites
 
+        ``y`` is the 2-D array of the data columns with shape ``(n, M)``.
+        """
         dx = dx[:, np.newaxis]
+        dy_dx = np.diff(y, axis=0) / dx
+
+        # Solve linear system for the 2nd derivatives
+        b = np.diff(dy_dx, axis=0)
+        u = solve(b)
 
         vpad = functools.partial(np.pad, pad_width=[(1, 1), (0, 0)], mode='constant')
 
         d1 = np.diff(vpad(u), axis=0) / dx
         d2 = np.diff(vpad(d1), axis=0)
 
-        diags_w_recip = 1. / w
-        w = sp.diags(diags_w_recip, 0, (pcount, pcount))
+        pp = (6. * (1. - p))
+        yi = y - (pp / w)[:, np.newaxis] * d2
 
-        yi = y.T - (pp * w) @ d2
-        pu = vpad(p * u)
+        return u, yi
 
-        c1 = np.diff(pu, axis=0) / dx
-        c2 = 3. * pu[:-1, :]
-        c3 = np.diff(yi, axis=0) / dx - dx * (2. * pu[:-1, :] + pu[1:, :])
-        c4 = yi[:-1, :]
+    @staticmethod
+    def _make_coeffs(dx, y, w, p, solve, shape, dtype=np.float64, block_columns=None, out=None, workers=None):
+        """Computes the spline coefficients array with shape ``(order, n - 1, ...)``
+
+        ``y`` is the 3-D view of the data with shape ``(pre, n, post)`` (see `_prepare_ydata`).
+        The coefficients are computed by the blocks of data columns directly in the output array.
+        """
+        pre, pcount, post = y.shape
+        order = 2 if pcount == 2 else 4
+        c_shape = (order, pcount - 1) + shape[1:]
+        columns = pre * post
+        parallel = workers is not None and workers > 1
+
+        if block_columns is None:
+            if y.dtype == dtype == np.float64:
+                block_columns = columns
+            else:
+                block_columns = max(1, _BLOCK_SIZE // pcount)
+            if parallel:
+                block_columns = min(block_columns, -(-columns // workers))
+
+        c = np.empty(c_shape, dtype=dtype) if out is None else out
+        c_3d = c.reshape(order * (pcount - 1), pre, post)
+
+        # The data columns groups (n, M) and the corresponding coefficients (order * (n - 1), M) views
+        if post == 1:
+            groups = [(y[:, :, 0].T, c_3d[:, :, 0])]
+        elif post >= _MIN_GROUP_COLUMNS or pre == 1:
+            groups = [(y[i], c_3d[:, i]) for i in range(pre)]
+        else:
+            groups = []
+
+        blocks = [
+            (yg[:, i:i + block_columns], cg[:, i:i + block_columns])
+            for yg, cg in groups for i in range(0, yg.shape[1], block_columns)
+        ]
+
+        if not groups:
+            # The middle axis with a few trailing columns: the blocks of the leading rows (rows, n, post)
+            # are copied to the contiguous columns and solved at once. The blocks are limited
+            # to the part of the data to bound the temporary memory of the copies.
+            block_size = min(block_columns, max(1, _BLOCK_SIZE // pcount), -(-columns // _MIDDLE_AXIS_BLOCKS))
+            block_rows = max(1, block_size // post)
+            blocks = [(y[i:i + block_rows], c_3d[:, i:i + block_rows]) for i in range(0, pre, block_rows)]
+
+        def compute_block(block):
+            # The coefficients are computed in float64 to avoid the round-off errors growth for float32 data
+            yb, cb = block
+
+            if yb.ndim == 3:
+                yb = np.ascontiguousarray(yb.transpose(1, 0, 2), dtype=np.float64).reshape(pcount, -1)
+                cb[...] = CubicSmoothingSpline._compute_coeffs(
+                    dx, yb, w, p, solve, np.empty((cb.shape[0], yb.shape[1]))).reshape(cb.shape)
+                return
+
+            yb = np.asarray(yb, dtype=np.float64)
+
+            if cb.dtype == np.float64:
+                CubicSmoothingSpline._compute_coeffs(dx, yb, w, p, solve, cb)
+            else:
+                cb[...] = CubicSmoothingSpline._compute_coeffs(dx, yb, w, p, solve, np.empty(cb.shape))
+
+        with phase('umv.coeffs', size=pcount, columns=columns, blocks=len(blocks)):
+            if parallel and len(blocks) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(compute_block, blocks))
+            else:
+                for block in blocks:
+                    compute_block(block)
+
+        return c
 
-        c_shape = (4, pcount - 1) + shape[1:]
-        c = np.vstack((c1, c2, c3, c4)).reshape(c_shape)
+    @staticmethod
+    def _compute_coeffs(dx, y, w, p, solve, out):
+        """Computes the spline coefficients in-place
+
+        ``y`` is the 2-D array of the data columns with shape ``(n, M)`` and ``out`` is
+        float64 array with shape ``(order * (n - 1), M)``. The output array is used as
+        the workspace, so only the linear system solution is allocated additionally.
+        """
+        pcount = dx.size + 1
+
+        if pcount == 2:
+            np.subtract(y[1], y[0], out=out[0])
+            out[0] /= dx[0]
+            out[1] = y[0]
+
+            return out
+
+        m = pcount - 1
+        c1, c2, c3, c4 = out[:m], out[m:2 * m], out[2 * m:3 * m], out[3 * m:]
+        dx = dx[:, np.newaxis]
+
+        # Solve linear system for the 2nd derivatives: b = diff(dy/dx)
+        np.subtract(y[1:], y[:-1], out=c3)
+        c3 /= dx
+        b = c2[:-1]
+        np.subtract(c3[1:], c3[:-1], out=b)
+
+        u = solve(b)
+
+        # d1 = diff([0, u, 0]) / dx
+        c1[0] = u[0]
+        np.subtract(u[1:], u[:-1], out=c1[1:-1])
+        np.negative(u[-1], out=c1[-1])
+        c1 /= dx
+
+        # The smoothed values: yi = y - 6(1-p) / w * diff([0, d1, 0])
+        q = (6. * (1. - p) / w)[:, np.newaxis]
+        yi_last = y[-1] + q[-1] * c1[-1]
+
+        c4[0] = c1[0]
+        np.subtract(c1[1:], c1[:-1], out=c4[1:])
+        c4 *= -q[:-1]
+        c4 += y[:-1]
+
+        # c3 = diff(yi) / dx - dx * (2 * pu[:-1] + pu[1:]), where pu = [0, p * u, 0]
+        np.subtract(c4[1:], c4[:-1], out=c3[:-1])
+        np.subtract(yi_last, c4[-1], out=c3[-1])
+        c3 /= dx
+
+        u *= p
+        np.multiply(u, dx[:-1], out=c2[:-1])
+        c3[:-1] -= c2[:-1]
+        np.multiply(u, 2. * dx[1:], out=c2[1:])
+        c3[1:] -= c2[1:]
+
+        # c2 = 3 * pu[:-1], c1 = diff(pu) / dx
+        c2[0] = 0.
+        np.multiply(u, 3., out=c2[1:])
+        c1 *= p
+
+        return out
+
+    @staticmethod
+    def _make_spline(x, y, w, smooth, shape, engine='banded', dtype=np.float64,
+                     block_columns=None, out=None, workers=None, nan_policy='propagate'):
+        dx = CubicSmoothingSpline._diff_xdata(x)
+
+        if nan_policy != 'propagate':
+            nan_mask = CubicSmoothingSpline._ydata_columns(np.isnan(y))
+
+            if nan_mask.any():
+                if nan_policy == 'raise':
+                    raise ValueError("'ydata' contains NaN values")
+                return CubicSmoothingSpline._make_spline_omit_nan(
+                    x, dx, y, w, smooth, shape, engine, dtype, out, nan_mask)
+
+        if isinstance(smooth, str) and dx.size > 1:
+            with phase('umv.smooth_cv', lambda: dict(columns=prod(shape) // x.size), size=x.size):
+                smooth = CubicSmoothingSpline._compute_smooth_cv(
+                    dx, w, CubicSmoothingSpline._ydata_columns(y), smooth)
+        solve, p = CubicSmoothingSpline._factorize(dx, w, smooth, engine)
+        c = CubicSmoothingSpline._make_coeffs(dx, y, w, p, solve, shape, dtype, block_columns, out, workers)
 
         return c, p
+
+    @staticmethod
+    def _make_spline_omit_nan(x, dx, y, w, smooth, shape, engine, dtype, out, nan_mask):
+        """Computes the spline omitting NaN values
+
+        The smoothing spline with zero weights for some data sites is the smoothing spline
+        for the rest data sites which is re-expressed in terms of all breaks.
+        """
+        size, columns = nan_mask.shape
+        y = CubicSmoothingSpline._ydata_columns(y)
+
+        # Group the columns by the missing values mask
+        packed_mask = np.packbits(nan_mask, axis=0)
+        _, group_columns, group_indices = np.unique(
+            packed_mask, axis=1, return_index=True, return_inverse=True)
+        group_indices = group_indices.ravel()
+
+        groups = [(np.flatnonzero(group_indices == group), ~nan_mask[:, column])
+                  for group, column in enumerate(group_columns)]
+
+        if isinstance(smooth, str):
+            # The score is pooled over the groups, the groups with less than 3 valid data sites
+            # are fitted by the straight lines for any smoothing parameter
+            cv_groups = [
+                (np.diff(x[valid]), w[valid], y[np.ix_(valid, cols)])
+                for cols, valid in groups if np.count_nonzero(valid) >= 3
+            ]
+            if not cv_groups:
+                raise ValueError(
+                    "At least 3 data sites without NaN values in some column are required "
+                    "for choosing the smoothing parameter")
+            smooth = CubicSmoothingSpline._compute_smooth_cv(dx, w, None, smooth, cv_groups)
+        elif smooth is None:
+            if size == 2:
+                smooth = 1.0
+            else:
+                r, qtw = umv_band_matrices(dx, w)
+                smooth = CubicSmoothingSpline._compute_smooth(band_trace(r), band_trace(qtw))
+
+        order = 2 if size == 2 else 4
+        c = np.empty((order, size - 1) + shape[1:], dtype=dtype) if out is None else out
+        c_2d = c.reshape(order * (size - 1), columns)
+
+        for cols, valid in groups:
+            valid_size = np.count_nonzero(valid)
+
+            if valid_size < 2:
+                c_2d[:, cols] = np.nan
+                continue
+
+            xv = x[valid]
+            wv = w[valid]
+            yv = y[np.ix_(valid, cols)]
+            dxv = np.diff(xv)
+
+            solve, p = CubicSmoothingSpline._factorize(dxv, wv, smooth, engine)
+            cv = CubicSmoothingSpline._make_coeffs(dxv, yv[np.newaxis], wv, p, solve, (valid_size, cols.size))
+
+            if valid_size < size:
+                cv = CubicSmoothingSpline._rebreak_coeffs(cv, xv, x)
+
+            c_2d[:, cols] = cv.reshape(order * (size - 1), cols.size)
+
+        return c, smooth
+
+    @staticmethod
+    def _prepare_knots(knots, x):
+        if isinstance(knots, (int, np.integer)):
+            if knots < 2:
+                raise ValueError("The number of 'knots' must be greater or equal 2")
+
+            # The knots at the quantiles of the data sites (the data sites are strictly increasing)
+            positions = np.linspace(0., x.size - 1, knots)
+            return np.interp(positions, np.arange(x.size), x)
+
+        knots = np.asarray(knots, dtype=np.float64)
+
+        if knots.ndim != 1 or knots.size < 2:
+            raise ValueError("'knots' must be a vector with size greater or equal 2")
+        if np.any(np.diff(knots) <= 0.):
+            raise ValueError("'knots' must be strictly increasing")
+        if knots[0] > x[0] or knots[-1] < x[-1]:
+            raise ValueError(
+                f"'knots' range [{knots[0]}, {knots[-1]}] must cover 'xdata' range [{x[0]}, {x[-1]}]")
+
+        return knots
+
+    @staticmethod
+    def _make_spline_knots(x, y, w, smooth, shape, knots, engine='banded', dtype=np.float64):
+        """Computes the penalized regression spline with the reduced knots
+
+        The natural cubic spline is represented in the B-spline basis on the knots.
+        The minimized functional is the same as for the smoothing spline:
+        ``p * sum(w * (y - s(x))^2) + (1 - p) * integral(s''(x)^2)``, so the coefficients are
+        the solution of the banded system ``(p * B^T W B + (1 - p) * P) c = p * B^T W y``.
+        """
+        dx = CubicSmoothingSpline._diff_xdata(x)
+
+        if smooth is None:
+            # The default parameter depends only on the data sites as for the smoothing spline
+            if dx.size > 1:
+                smooth = CubicSmoothingSpline._compute_smooth(*map(band_trace, umv_band_matrices(dx, w)))
+            else:
+                smooth = 1.0
+
+        p = smooth
+        columns = prod(shape) // x.size
+        yc = CubicSmoothingSpline._ydata_columns(y)
+
+        if p == 0.:
+            # The penalty matrix is singular, the spline is the weighted least-squares straight line
+            xm = np.dot(w, x) / w.sum()
+            wx = w * (x - xm)
+            slope = (wx @ yc) / np.dot(wx, x - xm)
+
+            coeffs = np.zeros((4, knots.size - 1, columns))
+            coeffs[2] = slope
+            coeffs[3] = (w @ yc) / w.sum() + (knots[:-1] - xm)[:, np.newaxis] * slope
+
+            return coeffs.reshape((4, knots.size - 1) + shape[1:]).astype(dtype, copy=False), p
+
+        with phase('umv.assemble', size=x.size, knots=knots.size, columns=columns, engine=engine):
+            gram_band, rhs = normal_band_matrices(knots, x, w, yc, _BLOCK_SIZE)
+            penalty_band = penalty_band_matrix(knots)
+
+            t = natural_basis_transform(knots)
+            tt = t.T.tocsr()
+
+            a = tt @ band_to_sparse(p * gram_band + (1. - p) * penalty_band) @ t
+            b = tt @ (p * rhs)
+
+        with phase('umv.factorize', size=x.size, knots=knots.size, engine=engine):
+            if engine == 'sparse':
+                solve = la.splu(a.tocsc()).solve
+            else:
+                ab = sparse_to_band(a)
+                try:
+                    solve = functools.partial(cholesky_solve, cholesky_factorize(ab))
+                except np.linalg.LinAlgError:
+                    solve = functools.partial(lu_solve, lu_factorize(ab))
+
+        with phase('umv.coeffs', size=x.size, knots=knots.size, columns=columns):
+            c = t @ solve(b)
+            coeffs = bspline_ppoly_coeffs(knots, c)
+            coeffs = coeffs.reshape((4, knots.size - 1) + shape[1:]).astype(dtype, copy=False)
+
+        return coeffs, p
+
+    @staticmethod
+    def _rebreak_coeffs(coeffs, xr, x):
+        """Re-expresses the spline with breaks ``xr`` in terms of breaks ``x`` (``xr`` is the subset of ``x``)
+
+        The spline is extended linearly outside of ``[xr[0], xr[-1]]`` (the natural spline condition).
+        """
+        if coeffs.shape[0] == 2:
+            coeffs = np.concatenate((np.zeros_like(coeffs), coeffs))
+
+        xb = x[:-1]
+        indices = np.clip(np.searchsorted(xr, xb, side='right') - 1, 0, xr.size - 2)
+        s = (xb - xr[indices])[:, np.newaxis]
+
+        a, b, c, d = coeffs[:, indices]
+
+        # Taylor expansion of the pieces at the new breaks
+        new_coeffs = np.stack((
+            a,
+            3. * a * s + b,
+            (3. * a * s + 2. * b) * s + c,
+            ((a * s + b) * s + c) * s + d,
+        ))
+
+        # The linear extension to the left of the first data site (the 2nd derivative is zero here)
+        left = xb < xr[0]
+
+        new_coeffs[:2, left] = 0.
+        new_coeffs[2, left] = c[left]
+        new_coeffs[3, left] = d[left] + c[left] * s[left]
+
+        # The linear extension to the right of the last data site
+        right = xb >= xr[-1]
+
+        if right.any():
+            a, b, c, d = coeffs[:, -1]
+            h = xr[-1] - xr[-2]
+            t = (xb[right] - xr[-1])[:, np.newaxis]
+
+            value = ((a * h + b) * h + c) * h + d
+            slope = (3. * a * h + 2. * b) * h + c
+
+            new_coeffs[:2, right] = 0.
+            new_coeffs[2, right] = slope
+            new_coeffs[3, right] = value + slope * t
+
+        return new_coeffs
+
+
+class PreparedCubicSmoothingSpline:
+    """Cubic smoothing spline prepared for the given data sites
+
+    The class assembles and factorizes the smoothing spline linear system once for
+    the given data sites, weights and smoothing parameter. After that it can be used
+    for fitting many ``ydata`` with a single back-substitution for each one.
+
+    Usually, the instance of this class is created by :meth:`CubicSmoothingSpline.prepare` method.
+
+    Parameters
+    ----------
+
+    xdata : np.ndarray, sequence, vector-like
+        X input 1-D data vector (data sites: ``x1 < x2 < ... < xN``)
+
+    weights : [*Optional*] np.ndarray, list
+        Weights 1-D vector with size equal of ``xdata`` size
+
+    smooth : [*Optional*] float
+        Smoothing parameter in range [0, 1] where:
+            - 0: The smoothing spline is the least-squares straight line fit
+            - 1: The cubic spline interpolant with natural condition
+
+    engine : [*Optional*] str
+        The linear system solver engine: 'banded' (default) or 'sparse'.
+        See :class:`CubicSmoothingSpline` for details.
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        import numpy as np
+        from csaps import CubicSmoothingSpline
+
+        x = np.linspace(0., 10., 100)
+        prepared = CubicSmoothingSpline.prepare(x, smooth=0.8)
+
+        for y in signals:
+            spline = prepared.fit(y)
+            ys = prepared.apply(y)
+
+    """
+
+    __module__ = 'csaps'
+
+    def __init__(self,
+                 xdata: UnivariateDataType,
+                 weights: Optional[UnivariateDataType] = None,
+                 smooth: Optional[float] = None,
+                 engine: str = 'banded'):
+
+        if engine not in _ENGINES:
+            raise ValueError(f"'engine' must be one of {_ENGINES}, but given {engine!r}")
+        if isinstance(smooth, str):
+            raise ValueError("'smooth' must be a float or None, the data-driven methods "
+                             "are not supported for the prepared smoothing spline")
+
+        x, w = CubicSmoothingSpline._prepare_xdata(xdata, weights)
+        dx = CubicSmoothingSpline._diff_xdata(x)
+        solve, p = CubicSmoothingSpline._factorize(dx, w, smooth, engine)
+
+        self._x = x
+        self._dx = dx
+        self._w = w
+        self._smooth = p
+        self._solve = solve
+
+    @property
+    def xdata(self) -> np.ndarray:
+        """Returns the data sites
+
+        Returns
+        -------
+        xdata : np.ndarray
+            The data sites vector
+        """
+        return self._x
+
+    @property
+    def smooth(self) -> float:
+        """Returns the smoothing factor
+
+        Returns
+        -------
+        smooth : float
+            Smoothing factor in the range [0, 1]
+        """
+        return self._smooth
+
+    def fit(self, ydata: MultivariateDataType, axis: int = -1) -> CubicSmoothingSpline:
+        """Computes the smoothing spline for the given data values
+
+        Parameters
+        ----------
+
+        ydata : np.ndarray, vector-like, sequence[vector-like]
+            Y input 1-D data vector or ND-array with shape[axis] equal of `xdata` size)
+
+        axis : [*Optional*] int
+            Axis along which ``ydata`` is assumed to be varying.
+            By default is -1 (the last axis).
+
+        Returns
+        -------
+        spline : CubicSmoothingSpline
+            The smoothing spline object
+        """
+
+        y, shape, axis = CubicSmoothingSpline._prepare_ydata(ydata, self._x.size, axis)
+        coeffs = CubicSmoothingSpline._make_coeffs(self._dx, y, self._w, self._smooth, self._solve, shape)
+        spline = SplinePPForm.construct_fast(coeffs, self._x, axis=axis)
+
+        return CubicSmoothingSpline._from_spline(spline, self._smooth)
+
+    def apply(self, ydata: MultivariateDataType, axis: int = -1) -> np.ndarray:
+        """Computes the smoothed data values on the data sites
+
+        The method does not compute the spline coefficients, so it is faster than
+        ``fit(ydata)(xdata)``.
+
+        Parameters
+        ----------
+
+        ydata : np.ndarray, vector-like, sequence[vector-like]
+            Y input 1-D data vector or ND-array with shape[axis] equal of `xdata` size)
+
+        axis : [*Optional*] int
+            Axis along which ``ydata`` is assumed to be varying.
+            By default is -1 (the last axis).
+
+        Returns
+        -------
+        ysmooth : np.ndarray
+            Smoothed data values with the same shape as ``ydata``
+        """
+
+        y, shape, axis = CubicSmoothingSpline._prepare_ydata(ydata, self._x.size, axis)
+
+        y = CubicSmoothingSpline._ydata_columns(y)
+
+        if self._solve is None:
+            yi = y.astype(np.float64)
+        else:
+            _, yi = CubicSmoothingSpline._smooth_sites(self._dx, y, self._w, self._smooth, self._solve)
+
+        return np.moveaxis(yi.reshape(shape), 0, axis)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+The binary storage of the splines arrays
+
+The storage file contains the header and the raw arrays data. The header is JSON
+with the arrays descriptions (dtype, shape and offset in the file) and the metadata.
+The arrays data are aligned in the file, so the arrays can be loaded as memory-mapped
+arrays without copying (zero-copy loading).
+
+"""
+
+import json
+import os
+import struct
+from typing import Dict, Tuple, Union, Any, Optional
+
+import numpy as np
+
+PathType = Union[str, 'os.PathLike[str]']
+
+_MAGIC = b'CSAPS\x00'
+_VERSION = 1
+
+# The alignment of the arrays data in the file in bytes
+_ALIGNMENT = 64
+
+# Magic, version and header size
+_PREFIX = struct.Struct('<6sHQ')
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def save_arrays(file: PathType,
+                kind: str,
+                arrays: Dict[str, np.ndarray],
+                meta: Optional[Dict[str, Any]] = None) -> None:
+    """Saves the arrays and the metadata to the storage file
+
+    Parameters
+    ----------
+    file : str, os.PathLike
+        The file path
+    kind : str
+        The stored object kind (the class name)
+    arrays : Dict[str, np.ndarray]
+        The arrays to save
+    meta : [*Optional*] dict
+        The JSON-serializable metadata
+    """
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    descriptions = {}
+
+    offset = 0
+    for name, array in arrays.items():
+        descriptions[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        'kind': kind,
+        'arrays': descriptions,
+        'meta': meta or {},
+    }).encode('utf-8')
+
+    data_offset = _align(_PREFIX.size + len(header))
+
+    with open(file, 'wb') as f:
+        f.write(_PREFIX.pack(_MAGIC, _VERSION, len(header)))
+        f.write(header)
+
+        for name, array in arrays.items():
+            f.seek(data_offset + descriptions[name]['offset'])
+            f.write(array.data)
+
+        f.truncate(data_offset + offset)
+
+
+def load_arrays(file: PathType,
+                kind: str,
+                mmap_mode: Optional[str] = 'r') -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Loads the arrays and the metadata from the storage file
+
+    Parameters
+    ----------
+    file : str, os.PathLike
+        The file path
+    kind : str
+        The expected stored object kind (the class name)
+    mmap_mode : [*Optional*] str, None
+        The memory-map mode for the arrays (see :class:`numpy.memmap`).
+        If it is None, the arrays are read into memory.
+
+    Returns
+    -------
+    arrays : Dict[str, np.ndarray]
+        The loaded arrays
+    meta : dict
+        The metadata
+    """
+
+    with open(file, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+
+        if len(prefix) != _PREFIX.size:
+            raise ValueError(f"'{file}' is not a csaps storage file")
+
+        magic, version, header_size = _PREFIX.unpack(prefix)
+
+        if magic != _MAGIC:
+            raise ValueError(f"'{file}' is not a csaps storage file")
+        if version > _VERSION:
+            raise ValueError(f"The storage version {version} is not supported")
+
+        header = json.loads(f.read(header_size).decode('utf-8'))
+
+        if header['kind'] != kind:
+            raise ValueError(f"'{file}' contains {header['kind']}, but {kind} is expected")
+
+        data_offset = _align(_PREFIX.size + header_size)
+        arrays = {}
+
+        for name, description in header['arrays'].items():
+            dtype = np.dtype(description['dtype'])
+            shape = tuple(description['shape'])
+            offset = data_offset + description['offset']
+
+            if mmap_mode is None or 0 in shape:
+                f.seek(offset)
+                array = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            else:
+                array = np.memmap(file, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+
+            arrays[name] = array
+
+    return arrays, header['meta']
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous (asyncio) API for fitting and evaluating the splines
+
+The heavy computations are run in the executor without blocking the event loop.
+The long multivariate and n-d grid fitting jobs are split into the steps (the data columns
+chunks or the grid axes), the job can be cancelled between the steps. The number of the jobs
+running concurrently can be bounded for the predictable memory usage under burst load.
+
+"""
+
+import asyncio
+import collections.abc as c_abc
+import functools
+import threading
+import weakref
+from concurrent.futures import Executor
+from typing import Any, Callable, Generator, Optional, Sequence, Union
+
+import numpy as np
+
+from ._base import ISmoothingSpline, ISplinePPForm
+from ._types import UnivariateDataType, MultivariateDataType, NdGridDataType
+from ._sspumv import SplinePPForm, CubicSmoothingSpline, _check_dtype, _check_engine_smooth
+from ._sspndg import NdGridSplinePPForm, NdGridCubicSmoothingSpline, ndgrid_prepare_data_vectors
+from ._shortcut import AutoSmoothingResult
+
+SmoothType = Optional[Union[float, str, Sequence[Optional[Union[float, str]]]]]
+StepsType = Generator[None, None, Any]
+
+
+class AsyncRunner:
+    """The runner of the spline computations in the executor for asyncio applications
+
+    Parameters
+    ----------
+
+    executor : [*Optional*] concurrent.futures.Executor
+        The executor for running the computations. If it is not set, the event loop
+        default executor is used.
+
+    max_concurrency : [*Optional*] int
+        The maximum number of the jobs running concurrently. The other jobs wait in the queue.
+        By default, the number of the jobs is not bounded.
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        from concurrent.futures import ThreadPoolExecutor
+        from csaps.aio import AsyncRunner
+
+        runner = AsyncRunner(ThreadPoolExecutor(4), max_concurrency=4)
+
+        async def handler(x, y, xi):
+            return await runner.csaps(x, y, xi, smooth=0.8, chunk_columns=1000)
+
+    """
+
+    __module__ = 'csaps.aio'
+
+    def __init__(self, executor: Optional[Executor] = None, max_concurrency: Optional[int] = None) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be positive")
+
+        self._executor = executor
+        self._max_concurrency = max_concurrency
+
+        # asyncio semaphores are bound to the event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """Returns the executor or None for the event loop default executor
+        """
+        return self._executor
+
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """Returns the maximum number of the jobs running concurrently
+        """
+        return self._max_concurrency
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Runs the function in the executor as one job
+
+        Parameters
+        ----------
+
+        func : Callable
+            The function
+
+        args, kwargs
+            The function arguments
+
+        Returns
+        -------
+
+        result : Any
+            The function result
+        """
+
+        async with self._concurrency():
+            return await self._run_in_executor(functools.partial(func, *args, **kwargs))
+
+    async def run_steps(self, steps: StepsType) -> Any:
+        """Runs the generator steps in the executor as one job
+
+        The generator yields after each step and returns the result. Each step is run in the executor
+        (it must be a thread-based executor) separately, so the job can be cancelled between the steps.
+        If the job is cancelled while the step is running, the running step is completed in the executor,
+        but the next steps are not run.
+
+        Parameters
+        ----------
+
+        steps : Generator
+            The generator of the steps
+
+        Returns
+        -------
+
+        result : Any
+            The generator return value
+        """
+
+        # The cancelled asyncio future does not wait for the running step, the lock guards the generator
+        lock = threading.Lock()
+
+        def next_step():
+            with lock:
+                return _next_step(steps)
+
+        def close():
+            with lock:
+                steps.close()
+
+        async with self._concurrency():
+            try:
+                while True:
+                    done, result = await self._run_in_executor(next_step)
+                    if done:
+                        return result
+            finally:
+                if lock.acquire(blocking=False):
+                    try:
+                        steps.close()
+                    finally:
+                        lock.release()
+                else:
+                    # The job is cancelled while the step is running, the generator is closed after the step
+                    asyncio.get_event_loop().run_in_executor(self._executor, close)
+
+    async def fit(self,
+                  xdata: Union[UnivariateDataType, NdGridDataType],
+                  ydata: MultivariateDataType,
+                  *,
+                  weights: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
+                  smooth: SmoothType = None,
+                  axis: Optional[int] = None,
+                  engine: str = 'banded',
+                  dtype: Union[np.dtype, str, type] = np.float64,
+                  workers: Optional[int] = None,
+                  chunk_columns: Optional[int] = None) -> ISmoothingSpline:
+        """Computes the univariate/multivariate or n-d grid smoothing spline
+
+        Parameters
+        ----------
+
+        xdata, ydata, weights, smooth, axis, engine, dtype, workers
+            See :func:`csaps.csaps` function
+
+        chunk_columns : [*Optional*] int
+            The number of the data columns in each step of the univariate/multivariate fitting.
+            The linear system is factorized once and the data columns are fitted by the chunks,
+            so the job can be cancelled between the chunks. By default, the data is fitted
+            in one step. It is not used for the data-driven ``smooth`` methods.
+            The n-d grid spline is always fitted axis by axis.
+
+        Returns
+        -------
+
+        ssp_obj : CubicSmoothingSpline, NdGridCubicSmoothingSpline
+            The smoothing spline object
+        """
+
+        if chunk_columns is not None and chunk_columns < 1:
+            raise ValueError("'chunk_columns' must be positive")
+
+        if _is_ndgrid(xdata):
+            steps = _fit_ndgrid_steps(xdata, ydata, weights, smooth, engine, dtype, workers)
+        else:
+            # The chunked fitting uses the fitting steps directly, so the arguments are checked here
+            _check_engine_smooth(engine, smooth)
+            _check_dtype(dtype)
+
+            axis = -1 if axis is None else axis
+            steps = _fit_umv_steps(xdata, ydata, weights, smooth, axis, engine, dtype, workers, chunk_columns)
+
+        return await self.run_steps(steps)
+
+    async def evaluate(self,
+                       spline: Union[ISmoothingSpline, ISplinePPForm],
+                       xi: Union[UnivariateDataType, NdGridDataType],
+                       *args, **kwargs) -> np.ndarray:
+        """Evaluates the spline in the executor
+
+        Parameters
+        ----------
+
+        spline : ISmoothingSpline, ISplinePPForm
+            The spline object
+
+        xi : np.ndarray, array-like, Sequence[array-like]
+            The points to evaluate the spline at
+
+        args, kwargs
+            The other arguments of the spline ``__call__`` (``nu``, ``extrapolate``, ...)
+
+        Returns
+        -------
+
+        yi : np.ndarray
+            The evaluated values
+        """
+        return await self.run(spline, xi, *args, **kwargs)
+
+    async def csaps(self,
+                    xdata: Union[UnivariateDataType, NdGridDataType],
+                    ydata: MultivariateDataType,
+                    xidata: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
+                    *,
+                    weights: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
+                    smooth: SmoothType = None,
+                    axis: Optional[int] = None,
+                    engine: str = 'banded',
+                    dtype: Union[np.dtype, str, type] = np.float64,
+                    workers: Optional[int] = None,
+                    chunk_columns: Optional[int] = None,
+                    ) -> Union[MultivariateDataType, ISmoothingSpline, AutoSmoothingResult]:
+        """The asynchronous counterpart of :func:`csaps.csaps` function
+
+        The spline is fitted by :meth:`fit` method and evaluated by :meth:`evaluate` method.
+        The arguments and the results are the same as for :func:`csaps.csaps` function
+        (see :meth:`fit` for ``chunk_columns`` argument).
+        """
+
+        spline = await self.fit(xdata, ydata, weights=weights, smooth=smooth, axis=axis, engine=engine,
+                                dtype=dtype, workers=workers, chunk_columns=chunk_columns)
+
+        if xidata is None:
+            return spline
+
+        yidata = await self.evaluate(spline, xidata)
+
+        if _is_auto_smooth(smooth):
+            return AutoSmoothingResult(yidata, spline.smooth)
+        return yidata
+
+    async def _run_in_executor(self, func: Callable) -> Any:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func)
+
+    def _concurrency(self):
+        if self._max_concurrency is None:
+            return _NoConcurrencyLimit()
+
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop)
+
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    def __repr__(self):  # pragma: no cover
+        return f'{type(self).__name__}(executor={self._executor!r}, max_concurrency={self._max_concurrency})'
+
+
+class _NoConcurrencyLimit:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_default_runner = AsyncRunner()
+
+
+def get_default_runner() -> AsyncRunner:
+    """Returns the default runner used by the module functions
+
+    Returns
+    -------
+
+    runner : AsyncRunner
+        The default runner
+    """
+    return _default_runner
+
+
+def set_default_runner(runner: AsyncRunner) -> None:
+    """Sets the default runner used by the module functions
+
+    Parameters
+    ----------
+
+    runner : AsyncRunner
+        The runner (for example, with the configured executor and concurrency limit)
+    """
+    global _default_runner
+
+    if not isinstance(runner, AsyncRunner):
+        raise ValueError("'runner' must be an instance of AsyncRunner")
+    _default_runner = runner
+
+
+async def csaps_async(xdata: Union[UnivariateDataType, NdGridDataType],
+                      ydata: MultivariateDataType,
+                      xidata: Optional[Union[UnivariateDataType, NdGridDataType]] = None,
+                      *,
+                      runner: Optional[AsyncRunner] = None,
+                      **kwargs) -> Union[MultivariateDataType, ISmoothingSpline, AutoSmoothingResult]:
+    """The asynchronous counterpart of :func:`csaps.csaps` function
+
+    Parameters
+    ----------
+
+    xdata, ydata, xidata
+        See :func:`csaps.csaps` function
+
+    runner : [*Optional*] AsyncRunner
+        The runner. By default, the default runner is used (see :func:`set_default_runner`).
+
+    kwargs
+        The keyword arguments of :meth:`AsyncRunner.csaps` method
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        from csaps.aio import csaps_async
+
+        async def handler(x, y, xi):
+            return await csaps_async(x, y, xi, smooth=0.8)
+
+    """
+    runner = _default_runner if runner is None else runner
+    return await runner.csaps(xdata, ydata, xidata, **kwargs)
+
+
+async def fit_async(xdata: Union[UnivariateDataType, NdGridDataType],
+                    ydata: MultivariateDataType,
+                    *,
+                    runner: Optional[AsyncRunner] = None,
+                    **kwargs) -> ISmoothingSpline:
+    """Computes the smoothing spline asynchronously (see :meth:`AsyncRunner.fit`)
+
+    Parameters
+    ----------
+
+    xdata, ydata
+        See :func:`csaps.csaps` function
+
+    runner : [*Optional*] AsyncRunner
+        The runner. By default, the default runner is used (see :func:`set_default_runner`).
+
+    kwargs
+        The keyword arguments of :meth:`AsyncRunner.fit` method
+    """
+    runner = _default_runner if runner is None else runner
+    return await runner.fit(xdata, ydata, **kwargs)
+
+
+async def evaluate_async(spline: Union[ISmoothingSpline, ISplinePPForm],
+                         xi: Union[UnivariateDataType, NdGridDataType],
+                         *args,
+                         runner: Optional[AsyncRunner] = None,
+                         **kwargs) -> np.ndarray:
+    """Evaluates the spline asynchronously (see :meth:`AsyncRunner.evaluate`)
+
+    Parameters
+    ----------
+
+    spline : ISmoothingSpline, ISplinePPForm
+        The spline object
+
+    xi : np.ndarray, array-like, Sequence[array-like]
+        The points to evaluate the spline at
+
+    args, kwargs
+        The other arguments of the spline ``__call__`` (``nu``, ``extrapolate``, ...)
+
+    runner : [*Optional*] AsyncRunner
+        The runner. By default, the default runner is used (see :func:`set_default_runner`).
+    """
+    runner = _default_runner if runner is None else runner
+    return await runner.evaluate(spline, xi, *args, **kwargs)
+
+
+def _next_step(steps: StepsType):
+    # StopIteration cannot be raised into the future
+    try:
+        next(steps)
+    except StopIteration as stop:
+        return True, stop.value
+    return False, None
+
+
+def _is_ndgrid(xdata) -> bool:
+    if not isinstance(xdata, c_abc.Sequence):
+        return False
+
+    try:
+        ndgrid_prepare_data_vectors(xdata, 'xdata')
+    except ValueError:
+        return False
+    return True
+
+
+def _is_auto_smooth(smooth) -> bool:
+    def is_auto(sm):
+        return sm is None or isinstance(sm, str)
+
+    if not isinstance(smooth, str) and isinstance(smooth, Sequence):
+        return any(is_auto(sm) for sm in smooth)
+    return is_auto(smooth)
+
+
+def _fit_umv_steps(xdata, ydata, weights, smooth, axis, engine, dtype, workers, chunk_columns) -> StepsType:
+    if chunk_columns is None or isinstance(smooth, str):
+        return CubicSmoothingSpline(xdata, ydata, weights=weights, smooth=smooth, axis=axis,
+                                    engine=engine, dtype=dtype, workers=workers)
+
+    dtype = _check_dtype(dtype)
+
+    x, y, w, shape, axis = CubicSmoothingSpline._prepare_data(xdata, ydata, weights, axis, dtype)
+    dx = CubicSmoothingSpline._diff_xdata(x)
+    solve, p = CubicSmoothingSpline._factorize(dx, w, smooth, engine)
+    yield
+
+    pre, size, post = y.shape
+    order = 2 if size == 2 else 4
+
+    coeffs = np.empty((order, size - 1) + shape[1:], dtype=dtype)
+    coeffs_4d = coeffs.reshape(order, size - 1, pre, post)
+
+    # The data columns are chunked along the outer dimension of the 3-D data view (pre, n, post)
+    by_pre = pre > 1
+    count = pre if by_pre else post
+    step = max(1, chunk_columns // post) if by_pre else chunk_columns
+
+    for start in range(0, count, step):
+        stop = min(start + step, count)
+        yc = y[start:stop] if by_pre else y[:, :, start:stop]
+
+        cc = CubicSmoothingSpline._make_coeffs(
+            dx, yc, w, p, solve, (size, yc.shape[0] * yc.shape[2]), dtype, workers=workers)
+        cc = cc.reshape(order, size - 1, yc.shape[0], yc.shape[2])
+
+        if by_pre:
+            coeffs_4d[:, :, start:stop] = cc
+        else:
+            coeffs_4d[:, :, :, start:stop] = cc
+        yield
+
+    spline = SplinePPForm.construct_fast(coeffs, x, axis=axis)
+    return CubicSmoothingSpline._from_spline(spline, p)
+
+
+def _fit_ndgrid_steps(xdata, ydata, weights, smooth, engine, dtype, workers) -> StepsType:
+    dtype = _check_dtype(dtype)
+
+    x, y, w, s = NdGridCubicSmoothingSpline._prepare_data(xdata, ydata, weights, smooth, dtype)
+    yield
+
+    coeffs, smooth = yield from NdGridCubicSmoothingSpline._make_spline_steps(x, y, w, s, engine, workers)
+    spline = NdGridSplinePPForm.construct_fast(coeffs, x)
+
+    return NdGridCubicSmoothingSpline._from_spline(spline, smooth)
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Batch fitting of many independent splines in the process pool
+
+The data values are passed to the worker processes and the spline coefficients are received
+from them via the shared memory blocks without pickling. The returned splines are constructed
+over the shared output buffer without copying.
+
+The module requires Python 3.8+ (:mod:`multiprocessing.shared_memory`).
+
+"""
+
+import collections.abc as c_abc
+import os
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor
+from numbers import Number
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
+
+from ._base import ISmoothingSpline
+from ._types import UnivariateDataType, MultivariateDataType, NdGridDataType
+from ._sspumv import SplinePPForm, CubicSmoothingSpline, _check_dtype, _DTYPES
+from ._sspndg import NdGridSplinePPForm, NdGridCubicSmoothingSpline, ndgrid_prepare_data_vectors
+
+# The alignment of the arrays in the shared memory blocks in bytes
+_ALIGNMENT = 64
+
+
+class _ArraySlot(NamedTuple):
+    """The array location in the shared memory block"""
+
+    offset: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class _Job(NamedTuple):
+    """The fitting job passed to the worker process (the data values are in the shared memory)"""
+
+    ndgrid: bool
+    xdata: Any
+    weights: Any
+    smooth: Any
+    axis: int
+    engine: str
+    dtype: str
+    input_name: str
+    ydata: _ArraySlot
+    output_name: str
+    coeffs: _ArraySlot
+
+
+if shared_memory is not None:
+    class _SharedMemory(shared_memory.SharedMemory):
+        """The shared memory block that is released with the last array using its buffer
+
+        The block is unlinked after the batch is computed, so the memory is freed when
+        the returned splines are deleted.
+        """
+
+        def __del__(self):
+            pass
+
+        def close_fd(self):
+            """Closes the block file descriptor keeping the memory mapped"""
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _is_ndgrid(xdata) -> bool:
+    if not isinstance(xdata, c_abc.Sequence):
+        return False
+
+    try:
+        ndgrid_prepare_data_vectors(xdata, 'xdata')
+    except ValueError:
+        return False
+    return True
+
+
+def _spline_order(size: int) -> int:
+    # The spline for 2 data points is linear
+    return 2 if size == 2 else 4
+
+
+def _coeffs_shape(ndgrid: bool, xdata, ydata: np.ndarray, axis: int) -> Tuple[int, ...]:
+    if ndgrid:
+        sizes = [x.size for x in xdata]
+        if ydata.shape != tuple(sizes):
+            raise ValueError(f"'ydata' shape {ydata.shape} must be equal to 'xdata' sizes {tuple(sizes)}")
+
+        return tuple(_spline_order(size) for size in sizes) + tuple(size - 1 for size in sizes)
+
+    shape = list(ydata.shape)
+    size = shape.pop(axis)
+
+    if size != xdata.size:
+        raise ValueError(
+            f"'ydata' data must be a 1-D or N-D array with shape[{axis}] "
+            f"that is equal to 'xdata' size ({xdata.size})")
+
+    return (_spline_order(size), size - 1) + tuple(shape)
+
+
+def _broadcast_jobs_argument(value, count: int, name: str) -> list:
+    if value is None or isinstance(value, (Number, str)):
+        return [value] * count
+
+    value = list(value)
+    if len(value) != count:
+        raise ValueError(f"'{name}' must have the same length as 'xdata' ({count})")
+    return value
+
+
+def _fit_job(job: _Job) -> Union[float, Tuple[float, ...]]:
+    """Fits the spline in the worker process writing the coefficients to the shared output block
+    """
+
+    input_shm = shared_memory.SharedMemory(name=job.input_name)
+    output_shm = shared_memory.SharedMemory(name=job.output_name)
+
+    try:
+        ydata = np.ndarray(job.ydata.shape, dtype=job.ydata.dtype, buffer=input_shm.buf, offset=job.ydata.offset)
+        coeffs = np.ndarray(job.coeffs.shape, dtype=job.coeffs.dtype, buffer=output_shm.buf, offset=job.coeffs.offset)
+        s = None
+
+        try:
+            if job.ndgrid:
+                s = NdGridCubicSmoothingSpline(job.xdata, ydata, weights=job.weights, smooth=job.smooth,
+                                               engine=job.engine, dtype=job.dtype)
+                coeffs[...] = s.spline.coeffs
+            else:
+                s = CubicSmoothingSpline(job.xdata, ydata, weights=job.weights, smooth=job.smooth, axis=job.axis,
+                                         engine=job.engine, dtype=job.dtype, out=coeffs)
+
+            smooth = s.smooth
+        except BaseException as exc:
+            # The frames of the traceback refer to the arrays over the shared memory blocks
+            traceback.clear_frames(exc.__traceback__)
+            raise
+        finally:
+            # The arrays must be released before closing the shared memory blocks,
+            # otherwise closing fails and hides the fitting error
+            del ydata, coeffs, s
+    finally:
+        input_shm.close()
+        output_shm.close()
+
+    return smooth
+
+
+def fit_batch(xdata: Sequence[Union[UnivariateDataType, NdGridDataType]],
+              ydata: Sequence[MultivariateDataType],
+              *,
+              weights: Optional[Sequence[Optional[Union[UnivariateDataType, NdGridDataType]]]] = None,
+              smooth: Optional[Union[float, str, Sequence[Any]]] = None,
+              axis: int = -1,
+              engine: str = 'banded',
+              dtype: Union[np.dtype, str, type] = np.float64,
+              max_workers: Optional[int] = None,
+              executor: Optional[Executor] = None,
+              chunksize: int = 1) -> List[ISmoothingSpline]:
+    """Fits the batch of independent univariate/multivariate or n-d grid smoothing splines in the process pool
+
+    The fits cannot share the linear system factorization (the data sites, weights or smoothing
+    parameters are different), so they are distributed across the worker processes.
+    The data values are passed and the coefficients are received via the shared memory blocks.
+
+    Parameters
+    ----------
+
+    xdata : Sequence[np.ndarray, Sequence[np.ndarray]]
+        The data sites for each fit: the vector for univariate/multivariate data
+        or the sequence of vectors for n-d grid data
+
+    ydata : Sequence[np.ndarray]
+        The data values for each fit
+
+    weights : [*Optional*] Sequence
+        The weights for each fit (None items for the fits without weights)
+
+    smooth : [*Optional*] float, str, Sequence
+        The smoothing parameter for all fits or the sequence of the smoothing parameters for each fit
+        (see :func:`csaps.csaps`)
+
+    axis : [*Optional*] int
+        Axis along which univariate/multivariate ``ydata`` is assumed to be varying
+
+    engine : [*Optional*] str
+        The linear system solver engine: 'banded' (default) or 'sparse'
+
+    dtype : [*Optional*] np.dtype
+        The spline coefficients dtype: ``np.float64`` (default) or ``np.float32``
+
+    max_workers : [*Optional*] int
+        The number of the worker processes (if ``executor`` is not set).
+        By default, it is the number of the processors.
+
+    executor : [*Optional*] concurrent.futures.ProcessPoolExecutor
+        The process pool executor. It can be reused for many batches to avoid starting the processes.
+
+    chunksize : [*Optional*] int
+        The number of the fits sent to the worker process at once
+
+    Returns
+    -------
+
+    splines : List[CubicSmoothingSpline, NdGridCubicSmoothingSpline]
+        The splines for each fit. The coefficients arrays of the splines share one memory block
+        that is freed when all splines are deleted.
+
+    Examples
+    --------
+
+    .. code-block:: python
+
+        from csaps.batch import fit_batch
+
+        splines = fit_batch([x1, x2, x3], [y1, y2, y3], smooth=0.8, max_workers=4)
+        yi = splines[0](xi)
+
+    """
+
+    if shared_memory is None:  # pragma: no cover
+        raise RuntimeError("'csaps.batch' requires Python 3.8+ (multiprocessing.shared_memory)")
+    if len(xdata) != len(ydata):
+        raise ValueError(f"'xdata' and 'ydata' must have the same length ({len(xdata)} != {len(ydata)})")
+    if chunksize < 1:
+        raise ValueError("'chunksize' must be positive")
+
+    count = len(xdata)
+    dtype = _check_dtype(dtype)
+    weights = _broadcast_jobs_argument(weights, count, 'weights')
+    smooth = _broadcast_jobs_argument(smooth, count, 'smooth')
+
+    if count == 0:
+        return []
+
+    # Prepare the jobs layout in the input and output shared memory blocks
+    jobs_data = []
+    input_size = 0
+    output_size = 0
+
+    for x, y, w, sm in zip(xdata, ydata, weights, smooth):
+        ndgrid = _is_ndgrid(x)
+        y = np.asarray(y)
+
+        if y.dtype not in _DTYPES:
+            y = y.astype(np.float64)
+        if y.ndim == 0:
+            raise ValueError("'ydata' must be a 1-D or N-D array")
+
+        if ndgrid:
+            x = ndgrid_prepare_data_vectors(x, 'xdata')
+            y_axis = 0
+        else:
+            x, _ = CubicSmoothingSpline._prepare_xdata(x, w)
+            y_axis = y.ndim + axis if axis < 0 else axis
+
+        c_shape = _coeffs_shape(ndgrid, x, y, y_axis)
+
+        y_slot = _ArraySlot(input_size, y.shape, y.dtype.str)
+        c_slot = _ArraySlot(output_size, c_shape, dtype.str)
+
+        input_size = _align(input_size + y.nbytes)
+        output_size = _align(output_size + int(np.prod(c_shape)) * dtype.itemsize)
+
+        jobs_data.append((ndgrid, x, y, w, sm, y_axis, y_slot, c_slot))
+
+    input_shm = shared_memory.SharedMemory(create=True, size=max(input_size, 1))
+    output_shm = _SharedMemory(create=True, size=max(output_size, 1))
+
+    # The block is already mapped, only the mapping is kept alive by the returned arrays
+    output_shm.close_fd()
+
+    try:
+        jobs = []
+
+        for ndgrid, x, y, w, sm, y_axis, y_slot, c_slot in jobs_data:
+            y_shared = np.ndarray(y.shape, dtype=y.dtype, buffer=input_shm.buf, offset=y_slot.offset)
+            y_shared[...] = y
+            del y_shared
+
+            jobs.append(_Job(ndgrid, x, w, sm, y_axis, engine, dtype.str,
+                             input_shm.name, y_slot, output_shm.name, c_slot))
+
+        del jobs_data
+
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                smooths = list(pool.map(_fit_job, jobs, chunksize=chunksize))
+        else:
+            smooths = list(executor.map(_fit_job, jobs, chunksize=chunksize))
+    except BaseException:
+        output_shm.close()
+        raise
+    finally:
+        input_shm.close()
+        input_shm.unlink()
+
+        # The output block is mapped in this process until the splines are deleted
+        output_shm.unlink()
+
+    splines = []
+
+    for job, sm in zip(jobs, smooths):
+        slot = job.coeffs
+        coeffs = np.ndarray(slot.shape, dtype=slot.dtype, buffer=output_shm.buf, offset=slot.offset)
+
+        if job.ndgrid:
+            spline = NdGridSplinePPForm.construct_fast(coeffs, job.xdata)
+            splines.append(NdGridCubicSmoothingSpline._from_spline(spline, sm))
+        else:
+            spline = SplinePPForm.construct_fast(coeffs, job.xdata, axis=job.axis)
+            splines.append(CubicSmoothingSpline._from_spline(spline, sm))
+
+    return splines
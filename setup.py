@@ -35,6 +35,7 @@ setup(
     extras_require={
         'docs': ['sphinx >=2.3, <3', 'matplotlib >=3.1', 'numpydoc', 'm2r'],
         'tests': ['pytest', 'coverage <6', 'pytest-cov', 'coveralls'],
+        'benchmarks': ['pytest', 'pytest-benchmark', 'matplotlib >=3.1'],
     },
     package_data={"csaps": ["py.typed"]},
     url='https://github.com/espdev/csaps',
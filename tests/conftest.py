@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import NamedTuple, Tuple
+from typing import Callable, NamedTuple, Tuple
 
 import pytest
 import numpy as np
@@ -235,3 +235,19 @@ def surface_data() -> SurfaceData:
     z += (np.random.randn(*z.shape) * 0.75)
 
     return SurfaceData(xy, z)
+
+
+@pytest.fixture(scope='session')
+def is_memory_mapped() -> Callable[[np.ndarray], bool]:
+    """Returns the function that checks whether the array is a view of the memory-mapped array
+    """
+
+    def check(array: np.ndarray) -> bool:
+        # SciPy may wrap the memory-mapped array into the base ndarray view without copying
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = array.base if isinstance(array, np.ndarray) else None
+        return False
+
+    return check
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import csaps
+from csaps.aio import AsyncRunner, csaps_async, fit_async, evaluate_async, get_default_runner, set_default_runner
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize('shape, axis', [
+    ((50,), -1),
+    ((7, 3, 50), -1),
+    ((50, 7, 3), 0),
+    ((4, 50, 5), 1),
+])
+@pytest.mark.parametrize('chunk_columns', [None, 1, 4, 100])
+def test_umv(shape, axis, chunk_columns):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis]))
+    y = np.random.randn(*shape)
+
+    expected = csaps.csaps(x, y, x, smooth=0.8, axis=axis)
+    values = _run(csaps_async(x, y, x, smooth=0.8, axis=axis, chunk_columns=chunk_columns))
+
+    np.testing.assert_allclose(values, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('smooth', [None, 'gcv'])
+def test_umv_auto_smooth(smooth):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(30))
+    y = np.random.randn(2, 30)
+
+    expected = csaps.csaps(x, y, x, smooth=smooth)
+    result = _run(csaps_async(x, y, x, smooth=smooth, chunk_columns=1))
+
+    assert isinstance(result, csaps.AutoSmoothingResult)
+    assert result.smooth == pytest.approx(expected.smooth)
+    np.testing.assert_allclose(result.values, expected.values, rtol=1e-12, atol=1e-12)
+
+
+def test_ndgrid():
+    np.random.seed(1234)
+    x = [np.linspace(0., 1., 10), np.sort(np.random.rand(12)), np.linspace(0., 1., 8)]
+    y = np.random.randn(10, 12, 8)
+
+    expected = csaps.csaps(x, y, x, smooth=[0.8, None, 0.9])
+    result = _run(csaps_async(x, y, x, smooth=[0.8, None, 0.9]))
+
+    assert result.smooth == pytest.approx(expected.smooth)
+    np.testing.assert_allclose(result.values, expected.values, rtol=1e-12, atol=1e-12)
+
+
+def test_fit_evaluate():
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(30))
+    y = np.random.randn(30)
+
+    async def main():
+        spline = await fit_async(x, y, smooth=0.8)
+
+        assert isinstance(spline, csaps.CubicSmoothingSpline)
+
+        values = await spline.evaluate_async(x, nu=1)
+        pp_values = await spline.spline.evaluate_async(x, 1)
+        func_values = await evaluate_async(spline, x, nu=1)
+
+        return spline, values, pp_values, func_values
+
+    spline, values, pp_values, func_values = _run(main())
+    expected = spline(x, nu=1)
+
+    np.testing.assert_array_equal(values, expected)
+    np.testing.assert_array_equal(pp_values, expected)
+    np.testing.assert_array_equal(func_values, expected)
+
+
+def test_executor():
+    thread_names = set()
+
+    def func():
+        thread_names.add(threading.current_thread().name)
+
+    with ThreadPoolExecutor(2, thread_name_prefix='csaps-test') as executor:
+        runner = AsyncRunner(executor)
+        _run(runner.run(func))
+
+    assert all(name.startswith('csaps-test') for name in thread_names)
+
+
+def test_max_concurrency():
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def func():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+
+    runner = AsyncRunner(ThreadPoolExecutor(8), max_concurrency=2)
+
+    async def main():
+        await asyncio.gather(*(runner.run(func) for _ in range(8)))
+
+    _run(main())
+    _run(main())  # the semaphore is created for each event loop
+
+    assert running[1] == 2
+
+
+def test_cancel_between_steps():
+    started = threading.Event()
+    proceed = threading.Event()
+    steps_done = []
+    closed = []
+
+    def steps():
+        try:
+            for i in range(10):
+                started.set()
+                proceed.wait(1.)
+                steps_done.append(i)
+                yield
+        finally:
+            closed.append(True)
+
+    runner = AsyncRunner()
+
+    async def main():
+        task = asyncio.ensure_future(runner.run_steps(steps()))
+
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+
+        task.cancel()
+        proceed.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _run(main())
+
+    # The generator is closed after the running step in the executor
+    for _ in range(100):
+        if closed:
+            break
+        threading.Event().wait(0.01)
+
+    assert len(steps_done) < 10
+    assert closed == [True]
+
+
+def test_default_runner():
+    runner = get_default_runner()
+    new_runner = AsyncRunner(max_concurrency=1)
+
+    set_default_runner(new_runner)
+
+    try:
+        assert get_default_runner() is new_runner
+    finally:
+        set_default_runner(runner)
+
+    with pytest.raises(ValueError):
+        set_default_runner(None)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'max_concurrency': 0},
+])
+def test_invalid_runner(kwargs):
+    with pytest.raises(ValueError):
+        AsyncRunner(**kwargs)
+
+
+def test_invalid_chunk_columns():
+    with pytest.raises(ValueError):
+        _run(csaps_async([1, 2, 3], [1, 2, 3], chunk_columns=0))
+
+
+@pytest.mark.parametrize('chunk_columns', [None, 1])
+@pytest.mark.parametrize('kwargs, match', [
+    ({'engine': 'foo'}, "'engine' must be one of"),
+    ({'smooth': 'foo'}, "'smooth' method must be one of"),
+    ({'dtype': np.int32}, "'dtype' must be one of"),
+])
+def test_invalid_fit_arguments(kwargs, match, chunk_columns):
+    with pytest.raises(ValueError, match=match):
+        _run(fit_async([1, 2, 3, 4], [[1, 2, 3, 4], [4, 3, 2, 1]], chunk_columns=chunk_columns, **kwargs))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import csaps
+
+
+def _make_splines(count, value_shape=(), dtype=np.float64):
+    np.random.seed(1234)
+    splines = []
+
+    for k in range(count):
+        size = np.random.randint(2, 30)
+        x = np.sort(np.random.uniform(0., 10., size))
+        y = np.random.randn(*value_shape, size)
+        splines.append(csaps.CubicSmoothingSpline(x, y, smooth=0.9, dtype=dtype).spline)
+
+    return splines
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('extrapolate', [True, False])
+@pytest.mark.parametrize('nu', [0, 1, 2, 3, 4])
+@pytest.mark.parametrize('value_shape', [(), (3,)])
+def test_bank_evaluate(value_shape, nu, extrapolate, dtype):
+    splines = _make_splines(50, value_shape, dtype)
+    bank = csaps.SplineBank.from_splines(splines)
+
+    assert len(bank) == 50
+    assert bank.order == 4
+    assert bank.coeffs.dtype == dtype
+
+    spline_ids = np.random.randint(0, 50, 300)
+    x = np.random.uniform(-2., 12., 300)
+
+    values = bank(spline_ids, x, nu=nu, extrapolate=extrapolate)
+    expected = np.stack([splines[k](xi, nu=nu, extrapolate=extrapolate) for k, xi in zip(spline_ids, x)])
+
+    assert values.shape == (300,) + value_shape
+    np.testing.assert_allclose(values, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_bank_broadcast():
+    splines = _make_splines(5)
+    bank = csaps.SplineBank.from_splines(splines)
+
+    x = np.linspace(0., 10., 7)
+    values = bank(np.arange(5)[:, np.newaxis], x)
+
+    assert values.shape == (5, 7)
+    np.testing.assert_allclose(values, np.stack([s(x) for s in splines]))
+    np.testing.assert_allclose(bank(-1, x), splines[-1](x))
+
+
+def test_bank_getitem():
+    splines = _make_splines(10, (2,))
+    bank = csaps.SplineBank.from_splines(splines)
+
+    x = np.linspace(0., 10., 20)
+
+    for k in (0, 3, -1):
+        np.testing.assert_allclose(bank[k](x), splines[k](x))
+
+    with pytest.raises(IndexError):
+        _ = bank[10]
+
+
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+def test_bank_save_load(tmp_path, mmap_mode, is_memory_mapped):
+    splines = _make_splines(20, (2,))
+    bank = csaps.SplineBank.from_splines(splines)
+
+    path = tmp_path / 'bank.csaps'
+    bank.save(path)
+
+    loaded = csaps.SplineBank.load(path, mmap_mode=mmap_mode)
+
+    assert is_memory_mapped(loaded.coeffs) == (mmap_mode is not None)
+    np.testing.assert_array_equal(loaded.breaks, bank.breaks)
+    np.testing.assert_array_equal(loaded.coeffs, bank.coeffs)
+    np.testing.assert_array_equal(loaded.offsets, bank.offsets)
+
+    spline_ids = np.random.randint(0, 20, 100)
+    x = np.random.uniform(0., 10., 100)
+
+    np.testing.assert_array_equal(loaded(spline_ids, x), bank(spline_ids, x))
+
+
+def test_bank_load_invalid(tmp_path):
+    path = tmp_path / 'invalid.csaps'
+    path.write_bytes(b'invalid data')
+
+    with pytest.raises(ValueError):
+        csaps.SplineBank.load(path)
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(breaks=[0., 1., 2.], coeffs=np.zeros((4, 2)), offsets=[0, 2]),
+    dict(breaks=[0., 1., 2.], coeffs=np.zeros((4, 1)), offsets=[0, 1, 3]),
+    dict(breaks=[0., 1., 2., 3.], coeffs=np.zeros((4, 3)), offsets=[0, 2, 4]),
+])
+def test_bank_invalid(kwargs):
+    with pytest.raises(ValueError):
+        csaps.SplineBank(**kwargs)
+
+
+def test_bank_invalid_evaluate():
+    bank = csaps.SplineBank.from_splines(_make_splines(3))
+
+    with pytest.raises(IndexError):
+        bank([0, 3], [1., 2.])
+    with pytest.raises(ValueError):
+        bank([0.5], [1.])
+    with pytest.raises(ValueError):
+        bank([0], [1.], nu=-1)
+    with pytest.raises(ValueError):
+        csaps.SplineBank.from_splines([])
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import csaps
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason='multiprocessing.shared_memory requires Python 3.8')
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(2) as pool:
+        yield pool
+
+
+def _batch_data():
+    np.random.seed(1234)
+
+    xdata = [np.sort(np.random.rand(size)) for size in (2, 10, 50)]
+    ydata = [np.random.randn(3, x.size) for x in xdata]
+
+    xdata.append([np.linspace(0., 1., 5), np.sort(np.random.rand(7))])
+    ydata.append(np.random.randn(5, 7))
+
+    return xdata, ydata
+
+
+def test_fit_batch(executor):
+    from csaps.batch import fit_batch
+
+    xdata, ydata = _batch_data()
+    smooth = [0.5, None, 'gcv', [0.5, None]]
+
+    splines = fit_batch(xdata, ydata, smooth=smooth, executor=executor)
+
+    assert len(splines) == len(xdata)
+
+    for x, y, sm, spline in zip(xdata, ydata, smooth, splines):
+        expected = csaps.csaps(x, y, smooth=sm)
+
+        assert type(spline) is type(expected)
+        assert spline.smooth == pytest.approx(expected.smooth)
+        np.testing.assert_array_equal(spline.spline.coeffs, expected.spline.coeffs)
+        np.testing.assert_array_equal(spline(x), expected(x))
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_fit_batch_axis_dtype(executor, dtype):
+    from csaps.batch import fit_batch
+
+    np.random.seed(1234)
+    xdata = [np.sort(np.random.rand(20)), np.sort(np.random.rand(30))]
+    ydata = [np.random.randn(20, 4), np.random.randn(30, 2)]
+    weights = [None, np.random.rand(30) + 0.5]
+
+    splines = fit_batch(xdata, ydata, weights=weights, smooth=0.8, axis=0, dtype=dtype, executor=executor)
+
+    for x, y, w, spline in zip(xdata, ydata, weights, splines):
+        expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=0.8, axis=0, dtype=dtype)
+
+        assert spline.spline.coeffs.dtype == dtype
+        assert spline.spline.axis == 0
+        np.testing.assert_array_equal(spline.spline.coeffs, expected.spline.coeffs)
+
+
+def test_fit_batch_spawn():
+    from csaps.batch import fit_batch
+
+    xdata, ydata = _batch_data()
+
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        splines = fit_batch(xdata[:2], ydata[:2], smooth=0.5, executor=executor)
+
+    np.testing.assert_array_equal(splines[1].spline.coeffs, csaps.csaps(xdata[1], ydata[1], smooth=0.5).spline.coeffs)
+
+
+def test_fit_batch_empty():
+    from csaps.batch import fit_batch
+
+    assert fit_batch([], []) == []
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'xdata': [[1, 2, 3]], 'ydata': []},
+    {'xdata': [[1, 2, 3]], 'ydata': [[1, 2]]},
+    {'xdata': [[1, 2, 3]], 'ydata': [[1, 2, 3]], 'smooth': [0.5, 0.5]},
+    {'xdata': [[1, 2, 3]], 'ydata': [[1, 2, 3]], 'chunksize': 0},
+    {'xdata': [[[1, 2, 3], [1, 2]]], 'ydata': [np.ones((3, 3))]},
+])
+def test_fit_batch_invalid(kwargs):
+    from csaps.batch import fit_batch
+
+    with pytest.raises(ValueError):
+        fit_batch(**kwargs)
+
+
+def test_fit_batch_worker_error(executor):
+    from csaps.batch import fit_batch
+
+    with pytest.raises(ValueError):
+        fit_batch([[1, 2, 3]], [[1, 2, 3]], smooth='unknown', executor=executor)
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='/proc/self/fd is not available')
+def test_fit_batch_no_fd_leak(executor):
+    from csaps.batch import fit_batch
+
+    xdata, ydata = _batch_data()
+
+    def fd_count():
+        return len(os.listdir('/proc/self/fd'))
+
+    # The first call may open the descriptors that are kept for the process lifetime
+    fit_batch(xdata, ydata, smooth=0.8, executor=executor)
+    count = fd_count()
+
+    for _ in range(20):
+        splines = fit_batch(xdata, ydata, smooth=0.8, executor=executor)
+        del splines
+
+        with pytest.raises(ValueError):
+            fit_batch([[1, 2, 3]], [[1, 2, 3]], smooth='unknown', executor=executor)
+
+    assert fd_count() == count
+
+
+def test_fit_job_error():
+    from multiprocessing import shared_memory
+    from csaps.batch import _fit_job, _Job, _ArraySlot
+
+    input_shm = shared_memory.SharedMemory(create=True, size=1024)
+    output_shm = shared_memory.SharedMemory(create=True, size=1024)
+
+    # The data values shape does not match the data sites
+    job = _Job(False, np.array([1., 2., 3.]), None, 0.5, -1, 'banded', '<f8',
+               input_shm.name, _ArraySlot(0, (4,), '<f8'), output_shm.name, _ArraySlot(0, (4, 3), '<f8'))
+
+    try:
+        with pytest.raises(ValueError, match="'ydata' data must be"):
+            _fit_job(job)
+    finally:
+        for shm in (input_shm, output_shm):
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import csaps
+
+
+@pytest.fixture(scope='module')
+def chunk_data():
+    np.random.seed(1234)
+
+    n = 1000
+    x = np.cumsum(np.random.rand(n) + 0.1)
+    y = np.sin(x / 10.) + np.random.randn(n) * 0.1
+    w = np.random.rand(n) + 0.5
+
+    return x, y, w
+
+
+@pytest.mark.parametrize('chunk_size, overlap', [
+    (1, 100),
+    (97, 100),
+    (250, 150),
+    (998, 100),
+    (2000, 0),
+])
+@pytest.mark.parametrize('smooth', [None, 0.5])
+def test_chunks_spline(chunk_data, chunk_size, overlap, smooth):
+    x, y, w = chunk_data
+
+    expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth).spline
+    splines = list(csaps.smooth_chunks(x, y, chunk_size, overlap, weights=w, smooth=smooth))
+
+    coeffs = np.concatenate([s.coeffs for s in splines], axis=1)
+    breaks = np.concatenate([s.breaks[:-1] for s in splines] + [x[-1:]])
+
+    assert len(splines) == int(np.ceil((x.size - 1) / chunk_size))
+    np.testing.assert_array_equal(breaks, x)
+    np.testing.assert_allclose(coeffs, expected.coeffs, atol=1e-8)
+
+
+def test_chunks_values(chunk_data):
+    x, y, w = chunk_data
+
+    expected = csaps.CubicSmoothingSpline(x, y, weights=w)(x)
+    chunks = list(csaps.smooth_chunks(x, y, 300, 100, weights=w, output='values'))
+
+    assert len(chunks) == 4
+
+    xs = np.concatenate([xc for xc, _ in chunks])
+    ys = np.concatenate([yc for _, yc in chunks])
+
+    np.testing.assert_array_equal(xs, x)
+    np.testing.assert_allclose(ys, expected, atol=1e-8)
+
+
+@pytest.mark.parametrize('output', ['spline', 'values'])
+def test_chunks_nd(chunk_data, output):
+    x, y, _ = chunk_data
+    y = np.stack((y, 2 * y, -y))
+
+    y_nd = np.moveaxis(y, -1, 0)
+    expected = csaps.CubicSmoothingSpline(x, y_nd, smooth=0.8, axis=0)
+
+    chunks = list(csaps.smooth_chunks(x, y_nd, 200, 100, smooth=0.8, axis=0, output=output))
+
+    if output == 'spline':
+        assert chunks[0].axis == 0
+        values = np.concatenate([s(s.breaks[:-1]) for s in chunks] + [chunks[-1](x[-1:])], axis=0)
+    else:
+        values = np.concatenate([yc for _, yc in chunks], axis=0)
+
+    np.testing.assert_allclose(values, expected(x), atol=1e-8)
+
+
+def test_chunks_memmap(tmp_path, chunk_data):
+    x, y, _ = chunk_data
+
+    np.save(tmp_path / 'x.npy', x)
+    np.save(tmp_path / 'y.npy', y)
+
+    xm = np.load(tmp_path / 'x.npy', mmap_mode='r')
+    ym = np.load(tmp_path / 'y.npy', mmap_mode='r')
+
+    expected = csaps.CubicSmoothingSpline(x, y)(x)
+    values = np.concatenate([yc for _, yc in csaps.smooth_chunks(xm, ym, 128, 100, output='values')])
+
+    np.testing.assert_allclose(values, expected, atol=1e-8)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5])
+def test_chunks_values_last_single_site(chunk_size):
+    x = np.linspace(0., 10., 11)
+    y = np.sin(x)
+
+    chunks = list(csaps.smooth_chunks(x, y, chunk_size, 0, smooth=0.9, output='values'))
+
+    assert len(chunks[-1][0]) == 1
+    np.testing.assert_array_equal(np.concatenate([xc for xc, _ in chunks]), x)
+    assert all(np.all(np.isfinite(yc)) for _, yc in chunks)
+
+
+def test_chunks_spline_owns_coeffs(chunk_data):
+    x, y, _ = chunk_data
+
+    for spline in csaps.smooth_chunks(x, y, 100, 200, smooth=0.8):
+        assert spline.coeffs.base is None
+        assert spline.coeffs.shape[1] == spline.breaks.size - 1
+
+
+def test_chunks_two_points():
+    x = [1., 2.]
+    y = [3., 5.]
+
+    spline, = csaps.smooth_chunks(x, y, 10, 2)
+    np.testing.assert_allclose(spline([1., 1.5, 2.]), [3., 4., 5.])
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(chunk_size=0, overlap=1),
+    dict(chunk_size=1, overlap=-1),
+    dict(chunk_size=1, overlap=1, output='coeffs'),
+    dict(chunk_size=1, overlap=1, smooth='gcv'),
+    dict(chunk_size=1, overlap=1, engine='dense'),
+    dict(chunk_size=1, overlap=1, weights=[1., 2.]),
+])
+def test_chunks_invalid(kwargs):
+    with pytest.raises(ValueError):
+        next(csaps.smooth_chunks([1., 2., 3.], [1., 2., 3.], **kwargs))
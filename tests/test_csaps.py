@@ -78,3 +78,35 @@ def test_shortcut_ndgrid_smooth_output(surface, smooth, cls):
 
     output = csaps(x, y, x, smooth=smooth)
     assert isinstance(output, cls)
+
+
+@pytest.mark.parametrize('data', [
+    'univariate',
+    'ndgrid',
+], indirect=True)
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+def test_shortcut_smooth_method(data, method):
+    x, y, xi, *_ = data
+
+    output = csaps(x, y, xi, smooth=method)
+    assert isinstance(output, AutoSmoothingResult)
+
+    smooth = output.smooth if isinstance(output.smooth, tuple) else (output.smooth,)
+    assert all(0. < sm < 1. for sm in smooth)
+
+    np.testing.assert_allclose(output.values, csaps(x, y, xi, smooth=output.smooth))
+
+
+def test_shortcut_workers():
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 20)
+    y = np.random.randn(20, 6)
+    xy = (x, np.linspace(0., 5., 6))
+
+    np.testing.assert_allclose(
+        csaps(x, y, x, smooth=0.8, axis=0, workers=3),
+        csaps(x, y, x, smooth=0.8, axis=0))
+
+    np.testing.assert_allclose(
+        csaps(xy, y, xy, smooth=0.8, workers=3),
+        csaps(xy, y, xy, smooth=0.8))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import csaps
+
+
+def _run_python(code):
+    result = subprocess.run([sys.executable, '-c', textwrap.dedent(code)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='Module __getattr__ requires Python 3.7')
+def test_import_does_not_import_scipy():
+    output = _run_python("""
+        import sys
+        import csaps
+        print(sorted(m for m in sys.modules if m == 'scipy' or m.startswith('scipy.')))
+    """)
+
+    assert output == '[]'
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='Module __getattr__ requires Python 3.7')
+def test_import_time_bounded():
+    # The import time of csaps without SciPy is bounded by a few import times of numpy
+    output = _run_python("""
+        import time
+
+        start = time.perf_counter()
+        import numpy
+        numpy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        import csaps
+        csaps_time = time.perf_counter() - start
+
+        print(csaps_time <= 3 * numpy_time + 0.1)
+    """)
+
+    assert output == 'True'
+
+
+def test_lazy_attributes():
+    output = _run_python("""
+        import csaps
+        from csaps import CubicSmoothingSpline
+
+        spline = CubicSmoothingSpline([1, 2, 3, 4], [1, 3, 2, 4], smooth=0.5)
+        print(type(spline).__name__, csaps.CubicSmoothingSpline is CubicSmoothingSpline)
+    """)
+
+    assert output == 'CubicSmoothingSpline True'
+
+
+@pytest.mark.parametrize('name', csaps.__all__)
+def test_public_api(name):
+    assert name in dir(csaps)
+    assert getattr(csaps, name) is not None
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        csaps.unknown_attribute
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import numpy as np
+import pytest
+
+import csaps
+from csaps._instrument import phase
+
+
+@pytest.fixture
+def data():
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(30))
+    y = np.random.randn(3, 30)
+    return x, y
+
+
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+def test_umv_phases(data, engine):
+    x, y = data
+
+    with csaps.instrument() as records:
+        spline = csaps.CubicSmoothingSpline(x, y, smooth=0.8, engine=engine)
+        spline(x)
+
+    names = [r.name for r in records]
+    assert names == ['umv.prepare_data', 'umv.assemble', 'umv.factorize', 'umv.coeffs', 'umv.evaluate']
+
+    sizes = {r.name: r.sizes for r in records}
+    assert sizes['umv.prepare_data'] == {'size': 30, 'columns': 3}
+    assert sizes['umv.factorize']['engine'] == engine
+    assert sizes['umv.evaluate'] == {'points': 30, 'pieces': 29, 'columns': 3}
+
+    assert all(r.elapsed >= 0. for r in records)
+    assert all(r.allocated is None for r in records)
+
+
+def test_ndg_phases():
+    np.random.seed(1234)
+    x = [np.linspace(0., 1., 10), np.sort(np.random.rand(12)), np.linspace(0., 1., 8)]
+    y = np.random.randn(10, 12, 8)
+
+    with csaps.instrument() as records:
+        spline = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.8)
+        spline(x)
+
+    names = [r.name for r in records]
+
+    assert names[0] == 'ndg.prepare_data'
+    assert [r.sizes['axis'] for r in records if r.name == 'ndg.fit_axis'] == [2, 1, 0]
+    assert names.count('umv.coeffs') == 3
+    assert names[-1] == 'ndg.evaluate'
+    assert records[-1].sizes == {'shape': (10, 12, 8), 'pieces': (9, 11, 7)}
+
+
+def test_memory(data):
+    x, y = data
+
+    with csaps.instrument(memory=True) as records:
+        csaps.CubicSmoothingSpline(x, y, smooth=0.8)
+
+    coeffs = next(r for r in records if r.name == 'umv.coeffs')
+    assert coeffs.allocated >= 4 * 29 * 3 * 8
+
+
+def test_hooks(data):
+    x, y = data
+    records = []
+
+    hook = csaps.add_instrument_hook(records.append)
+
+    try:
+        csaps.CubicSmoothingSpline(x, y, smooth=0.8)
+    finally:
+        csaps.remove_instrument_hook(hook)
+
+    count = len(records)
+    assert count > 0
+    assert all(isinstance(r, csaps.PhaseRecord) for r in records)
+
+    csaps.CubicSmoothingSpline(x, y, smooth=0.8)
+    assert len(records) == count
+
+    with pytest.raises(ValueError):
+        csaps.remove_instrument_hook(hook)
+
+
+def test_instrument_hook(data):
+    x, y = data
+    names = []
+
+    with csaps.instrument(hook=lambda r: names.append(r.name)) as records:
+        csaps.CubicSmoothingSpline(x, y, smooth=0.8)
+
+    assert names == [r.name for r in records]
+
+
+def test_instrument_threads():
+    def run():
+        with phase('thread', size=1):
+            pass
+
+    # The phases completed in the other threads are collected by all active contexts
+    with csaps.instrument() as outer_records:
+        with csaps.instrument() as records:
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+
+    assert [r.name for r in records] == ['thread']
+    assert [r.name for r in outer_records] == ['thread']
+
+
+def test_disabled_phase():
+    # The shared no-op phase is used when no hooks are registered
+    assert phase('test') is phase('other', size=1)
+
+    with csaps.instrument():
+        assert phase('test') is not phase('test')
+
+
+def test_lazy_sizes():
+    def lazy_sizes():
+        calls.append(True)
+        return {'columns': 2}
+
+    calls = []
+
+    # The lazy sizes are not computed when no hooks are registered
+    with phase('test', lazy_sizes, size=1):
+        pass
+
+    assert calls == []
+
+    with csaps.instrument() as records:
+        with phase('test', lazy_sizes, size=1):
+            pass
+
+    assert calls == [True]
+    assert records[0].sizes == {'size': 1, 'columns': 2}
+
+
+def test_failed_phase_not_recorded():
+    with csaps.instrument() as records:
+        with pytest.raises(RuntimeError):
+            with phase('test'):
+                raise RuntimeError
+
+        with phase('test', size=1) as ph:
+            ph.update(columns=2)
+
+    assert records == [csaps.PhaseRecord('test', records[0].elapsed, None, {'size': 1, 'columns': 2})]
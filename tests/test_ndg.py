@@ -223,3 +223,156 @@ def test_evaluate_nu_extrapolate(nu: tuple, extrapolate: bool):
     y_pp = pp(xx, nu=nu, extrapolate=extrapolate)
 
     np.testing.assert_allclose(y_ss, y_pp, rtol=1e-05, atol=1e-08, equal_nan=True)
+
+
+@pytest.mark.parametrize('smooth', [None, 0.8])
+def test_float32(ndgrid_2d_data, smooth):
+    xy = ndgrid_2d_data.xy
+    z = np.asarray(ndgrid_2d_data.z, dtype=np.float32)
+
+    s64 = csaps.NdGridCubicSmoothingSpline(xy, z, smooth=smooth)
+    s32 = csaps.NdGridCubicSmoothingSpline(xy, z, smooth=smooth, dtype=np.float32)
+
+    assert s32.spline.coeffs.dtype == np.float32
+
+    zi = s32(xy)
+    assert zi.dtype == np.float32
+    np.testing.assert_allclose(zi, s64(xy), rtol=1e-4, atol=1e-4)
+
+    zi = csaps.csaps(xy, z, xy, smooth=s64.smooth, dtype=np.float32)
+    assert zi.dtype == np.float32
+
+
+@pytest.mark.parametrize('method, args', [
+    ('integrate', ([(0., 1.), (-0.5, 1.5)],)),
+    ('integrate_1d', (0., 1., 0)),
+    ('integrate_1d', (-0.5, 0.5, 1)),
+    ('antiderivative', ((1, 0),)),
+    ('antiderivative', ((1, 2),)),
+    ('derivative', ((0, 1),)),
+])
+def test_float32_ndppoly_methods(method, args):
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 10), np.sort(np.random.uniform(0., 1., 12)))
+    y = np.random.randn(10, 12)
+
+    spline = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.9, dtype=np.float32).spline
+    spline64 = csaps.NdGridSplinePPForm.construct_fast(spline.coeffs.astype(np.float64), spline.breaks)
+
+    result = getattr(spline, method)(*args)
+    expected = getattr(spline64, method)(*args)
+
+    if isinstance(expected, csaps.NdGridSplinePPForm):
+        assert isinstance(result, csaps.NdGridSplinePPForm)
+        assert result.coeffs.dtype == np.float32
+
+        xi = tuple(np.linspace(-0.5, 1.5, 20) for _ in range(result.ndim))
+        result, expected = result(xi), expected(xi)
+    else:
+        assert result.dtype == np.float32
+
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_evaluate_assume_sorted(dtype):
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 10), np.sort(np.random.uniform(0., 1., 12)))
+    y = np.random.randn(10, 12)
+
+    ss = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.9, dtype=dtype)
+    xi = (np.linspace(-0.5, 1.5, 30), np.sort(np.random.uniform(0., 1., 25)))
+
+    np.testing.assert_allclose(ss(xi, assume_sorted=True), ss(xi), rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_evaluate_derivatives(dtype):
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 10), np.sort(np.random.uniform(0., 1., 12)), np.linspace(0., 2., 5))
+    y = np.random.randn(10, 12, 5)
+
+    ss = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.9, dtype=dtype)
+    xi = (np.random.uniform(-0.5, 1.5, 7), np.linspace(0., 1., 9), np.random.uniform(0., 2., 4))
+
+    nu = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (2, 1, 0), (0, 0, 3), (1, 1, 1)]
+    values = ss(xi, nu=nu)
+
+    assert values.shape == (len(nu), 7, 9, 4)
+    np.testing.assert_allclose(values, np.stack([ss(xi, nu=n) for n in nu]), rtol=1e-5, atol=1e-5)
+
+
+def test_evaluate_invalid_nu():
+    ss = csaps.NdGridCubicSmoothingSpline(([1, 2, 3], [1, 2, 3]), np.ones((3, 3)))
+
+    with pytest.raises(ValueError):
+        ss(([1, 2], [1, 2]), nu=(0, 0, 0))
+
+
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_save_load(tmp_path, is_memory_mapped, dtype, mmap_mode):
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 10), np.sort(np.random.uniform(0., 1., 12)), np.linspace(0., 2., 5))
+    y = np.random.randn(10, 12, 5)
+    xi = (np.random.uniform(-0.5, 1.5, 7), np.linspace(0., 1., 9), np.random.uniform(0., 2., 4))
+
+    spline = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.9, dtype=dtype).spline
+
+    path = tmp_path / 'spline.csaps'
+    spline.save(path)
+
+    loaded = csaps.NdGridSplinePPForm.load(path, mmap_mode=mmap_mode)
+
+    assert is_memory_mapped(loaded.coeffs) == (mmap_mode is not None)
+    assert loaded.ndim == spline.ndim
+    assert loaded.coeffs.dtype == spline.coeffs.dtype
+
+    for b1, b2 in zip(loaded.breaks, spline.breaks):
+        np.testing.assert_array_equal(b1, b2)
+
+    np.testing.assert_array_equal(loaded.coeffs, spline.coeffs)
+    np.testing.assert_array_equal(loaded(xi), spline(xi))
+    np.testing.assert_array_equal(loaded(xi, nu=(1, 0, 2)), spline(xi, nu=(1, 0, 2)))
+
+
+@pytest.mark.parametrize('tol', [1e-5, 1e-3, (1e-2, 1e-4)])
+def test_compress(tol):
+    np.random.seed(1234)
+    x = (np.linspace(0., 10., 100), np.sort(np.random.uniform(0., 5., 80)))
+    xx = np.meshgrid(*x, indexing='ij')
+    y = np.sin(xx[0]) * np.cos(xx[1]) + np.random.randn(100, 80) * 0.05
+    xi = (np.linspace(0., 10., 300), np.linspace(x[1][0], x[1][-1], 200))
+
+    spline = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.9).spline
+    compressed = spline.compress(tol)
+
+    total_tol = sum(tol) if isinstance(tol, tuple) else 2 * tol
+
+    assert isinstance(compressed, csaps.NdGridSplinePPForm)
+    assert all(p1 < p2 for p1, p2 in zip(compressed.pieces, spline.pieces))
+    assert np.abs(compressed(xi) - spline(xi)).max() <= total_tol * (1. + 1e-6)
+
+
+def test_compress_3d():
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 30), np.linspace(0., 2., 20), np.linspace(0., 1., 2))
+    xx = np.meshgrid(*x, indexing='ij')
+    y = np.exp(xx[0]) * xx[1] ** 2 + xx[2]
+    xi = (np.linspace(0., 1., 50), np.linspace(0., 2., 40), np.linspace(0., 1., 3))
+
+    spline = csaps.NdGridCubicSmoothingSpline(x, y, smooth=0.99).spline
+    compressed = spline.compress(1e-4)
+
+    assert compressed.order[2] == 2
+    assert compressed.pieces[0] < spline.pieces[0]
+    assert compressed.pieces[2] == 1
+    assert np.abs(compressed(xi) - spline(xi)).max() <= 3e-4
+
+
+@pytest.mark.parametrize('tol', [-1., (1e-3, 1e-3, 1e-3), (1e-3, -1.)])
+def test_compress_invalid(tol):
+    spline = csaps.NdGridCubicSmoothingSpline(([1, 2, 3], [1, 2, 3]), np.ones((3, 3))).spline
+
+    with pytest.raises(ValueError):
+        spline.compress(tol)
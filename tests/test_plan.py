@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import csaps
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('extrapolate', [True, False, 'periodic'])
+@pytest.mark.parametrize('uniform', [True, False])
+@pytest.mark.parametrize('shape, axis', [
+    ((20,), -1),
+    ((2, 20), -1),
+    ((20, 3), 0),
+    ((2, 20, 3), 1),
+])
+def test_evaluation_plan(shape, axis, uniform, extrapolate, dtype):
+    np.random.seed(1234)
+    x = np.linspace(0., 1., 20) if uniform else np.sort(np.random.uniform(0., 1., 20))
+    xi = np.random.uniform(-0.5, 1.5, (5, 7))
+
+    plan = csaps.make_evaluation_plan(x, xi, extrapolate=extrapolate)
+
+    for _ in range(2):
+        spline = csaps.CubicSmoothingSpline(x, np.random.randn(*shape), smooth=0.9, axis=axis, dtype=dtype).spline
+
+        for nu in (0, 1, 3, 4):
+            values = plan.evaluate(spline, nu=nu)
+            assert values.dtype == dtype
+            np.testing.assert_allclose(values, spline(xi, nu=nu, extrapolate=extrapolate), rtol=1e-5, atol=1e-5)
+
+        np.testing.assert_allclose(plan.evaluate(spline, nu=[0, 2]),
+                                   spline(xi, nu=[0, 2], extrapolate=extrapolate), rtol=1e-5, atol=1e-5)
+
+
+def test_spline_plan():
+    x = np.linspace(0., 10., 30)
+    xi = np.linspace(-1., 11., 100)
+    spline = csaps.CubicSmoothingSpline(x, np.sin(x), smooth=0.9).spline
+
+    plan = spline.plan(xi)
+
+    assert plan.size == 100
+    assert plan.order == 4
+    assert plan.breaks is spline.breaks
+    assert plan.basis().shape == (100, 4 * 29)
+    assert plan.basis() is plan.basis()
+
+    np.testing.assert_allclose(plan.evaluate(spline), spline(xi))
+
+
+def test_plan_invalid_spline():
+    x = np.linspace(0., 10., 30)
+    plan = csaps.make_evaluation_plan(x, [1., 2.])
+
+    with pytest.raises(ValueError):
+        plan.evaluate(csaps.CubicSmoothingSpline(x + 1., np.sin(x)).spline)
+    with pytest.raises(ValueError):
+        plan.evaluate(csaps.CubicSmoothingSpline(x[:2], [1., 2.]).spline)
+    with pytest.raises(ValueError):
+        plan.basis(nu=-1)
+
+
+@pytest.mark.parametrize('extrapolate', [True, False])
+def test_ndgrid_plan(extrapolate):
+    np.random.seed(1234)
+    x = (np.linspace(0., 1., 10), np.sort(np.random.uniform(0., 1., 12)))
+    xi = (np.linspace(-0.5, 1.5, 15), np.random.uniform(0., 1., 9))
+
+    spline = csaps.NdGridCubicSmoothingSpline(x, np.random.randn(10, 12), smooth=0.9).spline
+    plan = spline.plan(xi, extrapolate=extrapolate)
+
+    assert plan.shape == (15, 9)
+
+    for _ in range(2):
+        spline = csaps.NdGridCubicSmoothingSpline(x, np.random.randn(10, 12), smooth=0.9).spline
+
+        for nu in (None, (1, 0), (2, 3), [(0, 0), (1, 1)]):
+            np.testing.assert_allclose(plan.evaluate(spline, nu=nu),
+                                       spline(xi, nu=nu, extrapolate=extrapolate), rtol=1e-10, atol=1e-10)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import csaps
+
+
+@pytest.fixture(scope='module')
+def stacked_data():
+    np.random.seed(1234)
+
+    batch, n = 20, 15
+    x = np.cumsum(np.random.rand(batch, n) + 0.1, axis=1)
+    y = np.sin(x) + np.random.randn(batch, n) * 0.2
+    w = np.random.rand(batch, n) + 0.5
+
+    return x, y, w
+
+
+@pytest.mark.parametrize('smooth', [None, 0.0, 0.3, 1.0, 'each'])
+@pytest.mark.parametrize('weighted', [False, True])
+def test_stacked_fit(stacked_data, smooth, weighted):
+    x, y, w = stacked_data
+    w = w if weighted else None
+
+    if smooth == 'each':
+        smooth = list(np.linspace(0.1, 0.9, x.shape[0]))
+        smooth[3] = None
+
+    s = csaps.StackedCubicSmoothingSpline(x, y, weights=w, smooth=smooth)
+
+    assert isinstance(s.spline, csaps.StackedSplinePPForm)
+    assert s.spline.coeffs.shape == (x.shape[0], 4, x.shape[1] - 1)
+    assert len(s.spline) == x.shape[0]
+
+    for i in range(x.shape[0]):
+        sm = smooth[i] if isinstance(smooth, list) else smooth
+        expected = csaps.CubicSmoothingSpline(x[i], y[i], weights=None if w is None else w[i], smooth=sm)
+
+        assert s.smooth[i] == pytest.approx(expected.smooth)
+        np.testing.assert_allclose(s.spline[i].c, expected.spline.c, rtol=1e-7, atol=1e-9)
+
+
+@pytest.mark.parametrize('nu', [0, 1, 2, 3, 4])
+@pytest.mark.parametrize('extrapolate', [True, False])
+def test_stacked_evaluate(stacked_data, nu, extrapolate):
+    x, y, _ = stacked_data
+
+    s = csaps.StackedCubicSmoothingSpline(x, y, smooth=0.8)
+
+    xi_shared = np.linspace(x.min() - 1., x.max() + 1., 50)
+    xi_each = np.sort(np.random.rand(x.shape[0], 30), axis=1) * x[:, -1:] * 1.2
+
+    for xi in (xi_shared, xi_each):
+        yi = s(xi, nu=nu, extrapolate=extrapolate)
+        assert yi.shape == (x.shape[0], xi.shape[-1])
+
+        for i in range(x.shape[0]):
+            xii = xi if xi.ndim == 1 else xi[i]
+            expected = s.spline[i](xii, nu=nu, extrapolate=extrapolate)
+            np.testing.assert_allclose(yi[i], expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+
+def test_stacked_two_points():
+    x = [[0., 1.], [2., 4.]]
+    y = [[1., 2.], [3., 5.]]
+
+    s = csaps.StackedCubicSmoothingSpline(x, y)
+
+    assert s.spline.order == 2
+    np.testing.assert_allclose(s([[0., 0.5, 1.], [2., 3., 4.]]), [[1., 1.5, 2.], [3., 4., 5.]])
+
+
+@pytest.mark.parametrize('x, y, w, p', [
+    ([1, 2, 3], [1, 2, 3], None, None),
+    ([[1, 2, 3]], [[1, 2]], None, None),
+    ([[1]], [[1]], None, None),
+    ([[1, 3, 2]], [[1, 2, 3]], None, None),
+    ([[1, 2, 3]], [[1, 2, 3]], [1, 1], None),
+    ([[1, 2, 3], [1, 2, 3]], [[1, 2, 3], [1, 2, 3]], None, [0.5]),
+])
+def test_stacked_invalid_data(x, y, w, p):
+    with pytest.raises(ValueError):
+        csaps.StackedCubicSmoothingSpline(x, y, weights=w, smooth=p)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+import csaps
+
+
+@pytest.fixture(scope='module')
+def stream_data():
+    np.random.seed(1234)
+
+    n = 40
+    x = np.cumsum(np.random.rand(n) + 0.1)
+    y = np.sin(x) + np.random.randn(n) * 0.2
+    w = np.random.rand(n) + 0.5
+
+    return x, y, w
+
+
+@pytest.mark.parametrize('smooth', [0.0, 0.3, 0.9, 0.999, 1.0])
+def test_stream_filtered_estimate(stream_data, smooth):
+    x, y, w = stream_data
+
+    stream = csaps.StreamingCubicSmoothingSpline(smooth)
+    stream.append(x[0], y[0], w[0])
+
+    assert stream.value == pytest.approx(y[0])
+
+    for i in range(1, x.size):
+        stream.append(x[i], y[i], w[i])
+        expected = csaps.CubicSmoothingSpline(x[:i + 1], y[:i + 1], weights=w[:i + 1], smooth=smooth)
+
+        assert stream.size == i + 1
+        assert stream.xdata == x[i]
+        assert stream.value == pytest.approx(expected(x[i]))
+        assert stream.derivative == pytest.approx(expected(x[i], nu=1))
+
+
+@pytest.mark.parametrize('smooth', [0.0, 0.5, 1.0])
+@pytest.mark.parametrize('window', [None, 2, 3, 10])
+@pytest.mark.parametrize('history', [None, 15])
+def test_stream_make_spline(stream_data, smooth, window, history):
+    x, y, w = stream_data
+
+    stream = csaps.StreamingCubicSmoothingSpline(smooth, history=history)
+    for xx, yy, ww in zip(x, y, w):
+        stream.append(xx, yy, ww)
+
+    spline = stream.make_spline(window=window)
+    expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth).spline
+
+    pieces = (window or history or x.size) - 1
+
+    assert isinstance(spline, csaps.SplinePPForm)
+    assert spline.pieces == pieces
+    np.testing.assert_allclose(spline.breaks, x[-pieces - 1:])
+    np.testing.assert_allclose(spline.coeffs, expected.coeffs[:, -pieces:], rtol=1e-8, atol=1e-8)
+
+
+def test_stream_multivariate(stream_data):
+    x, y, w = stream_data
+    y = np.stack((y, 2 * y, np.cos(x)))
+
+    stream = csaps.StreamingCubicSmoothingSpline(0.7)
+    for i in range(x.size):
+        stream.append(x[i], y[:, i], w[i])
+
+    expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=0.7)
+    spline = stream.make_spline()
+
+    np.testing.assert_allclose(stream.value, expected(x[-1]))
+    np.testing.assert_allclose(spline(x), expected(x), rtol=1e-8, atol=1e-8)
+
+
+def test_stream_invalid():
+    with pytest.raises(ValueError):
+        csaps.StreamingCubicSmoothingSpline(1.5)
+    with pytest.raises(ValueError):
+        csaps.StreamingCubicSmoothingSpline(0.5, history=1)
+
+    stream = csaps.StreamingCubicSmoothingSpline(0.5)
+
+    with pytest.raises(ValueError):
+        _ = stream.value
+
+    stream.append(1., 1.)
+
+    with pytest.raises(ValueError):
+        stream.append(1., 2.)
+    with pytest.raises(ValueError):
+        stream.append(2., [1., 2.])
+    with pytest.raises(ValueError):
+        stream.append(2., 1., w=0.)
+    with pytest.raises(ValueError):
+        stream.make_spline()
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
+import tracemalloc
 from itertools import chain, product, permutations
 
 import numpy as np
-from scipy.interpolate import CubicSpline
+from scipy.interpolate import CubicSpline, PPoly
 import pytest
 
 import csaps
+from csaps._banded import umv_band_matrices, cholesky_band_inverse, cholesky_factorize, lu_factorize, lu_solve
+from csaps._ppeval import uniform_step, merge_intervals
+from csaps import _sspumv
+from csaps._sspumv import _factorize_uniform
 
 
 @pytest.mark.parametrize('x,y,w', [
@@ -257,3 +262,951 @@ def test_evaluate_nu_extrapolate(nu, extrapolate):
     y_ss = ss(xi, nu=nu, extrapolate=extrapolate)
 
     np.testing.assert_allclose(y_ss, y_cs, rtol=1e-05, atol=1e-08, equal_nan=True)
+
+
+@pytest.mark.parametrize('shape, axis', [
+    ((25,), -1),
+    ((3, 25), -1),
+    ((25, 4), 0),
+    ((2, 25, 3), 1),
+])
+@pytest.mark.parametrize('smooth', [None, 0.0, 0.5, 1.0])
+def test_engines(shape, axis, smooth):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape)
+    w = np.random.rand(shape[axis]) + 0.5
+
+    s_banded = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth, axis=axis, engine='banded')
+    s_sparse = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth, axis=axis, engine='sparse')
+
+    assert s_banded.smooth == pytest.approx(s_sparse.smooth)
+    np.testing.assert_allclose(s_banded.spline.coeffs, s_sparse.spline.coeffs, rtol=1e-8, atol=1e-10)
+
+
+def test_banded_lu():
+    np.random.seed(1234)
+    m = 20
+    ab = np.random.randn(3, m)
+
+    a = np.diag(ab[2]) + np.diag(ab[1, 1:], 1) + np.diag(ab[0, 2:], 2)
+    a = a + np.triu(a, 1).T
+    b = np.random.randn(m, 3)
+
+    np.testing.assert_allclose(lu_solve(lu_factorize(ab), b), np.linalg.solve(a, b), rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize('m', [2, 3, 4, 7, 20])
+def test_cholesky_band_inverse(m):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(m + 2)) * 10
+    r, qtw = umv_band_matrices(np.diff(x), np.random.rand(m + 2) + 0.5)
+    ab = 3. * qtw + r
+
+    a = np.diag(ab[2]) + np.diag(ab[1, 1:], 1) + np.diag(ab[0, 2:], 2)
+    a_inv = np.linalg.inv(a + np.triu(a, 1).T)
+
+    sb = cholesky_band_inverse(cholesky_factorize(ab))
+
+    for d in range(3):
+        np.testing.assert_allclose(sb[2 - d, d:], np.diagonal(a_inv, d), rtol=1e-10)
+
+
+def test_banded_ill_conditioned():
+    # The banded Cholesky factorization fails because of round-off errors for this system
+    # and the banded LU factorization is used. The solution loses the precision for such
+    # extremely ill-conditioned systems, so only the result is checked to be finite.
+    x = np.linspace(0., 1., 300000)
+    x[1:-1] += np.random.RandomState(1234).uniform(-1e-8, 1e-8, x.size - 2)
+    y = np.sin(8. * x)
+
+    r, qtw = umv_band_matrices(np.diff(x), np.ones_like(x))
+    with pytest.raises(np.linalg.LinAlgError):
+        cholesky_factorize(3. * qtw + 0.5 * r)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.5, engine='banded')
+    assert np.isfinite(s.spline.coeffs).all()
+
+
+@pytest.mark.parametrize('smooth', [None, 0.9])
+@pytest.mark.parametrize('shape, axis', [
+    ((30,), -1),
+    ((2, 30), -1),
+    ((30, 3), 0),
+])
+def test_uniform_fit(shape, axis, smooth):
+    np.random.seed(1234)
+    x = np.linspace(-2., 5., 30)
+    y = np.random.randn(*shape)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=smooth, axis=axis)
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=smooth, axis=axis, engine='sparse')
+
+    assert s.smooth == pytest.approx(expected.smooth)
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-9, atol=1e-9)
+
+
+def test_uniform_fit_cache():
+    x = np.linspace(0., 1., 50)
+    csaps.clear_factorization_cache()
+
+    for k in range(3):
+        csaps.CubicSmoothingSpline(x, np.sin(x + k), smooth=0.8)
+
+    assert len(_sspumv._uniform_cache) == 1
+    assert _factorize_uniform(50, 1. / 49, 1., 0.5) is _factorize_uniform(50, 1. / 49, 1., 0.5)
+
+    csaps.clear_factorization_cache()
+    assert len(_sspumv._uniform_cache) == 0
+
+
+def test_uniform_fit_cache_bounds(monkeypatch):
+    csaps.clear_factorization_cache()
+    monkeypatch.setattr(_sspumv, '_UNIFORM_CACHE_BYTES', 4 * 8 * 1000)
+
+    # The factorization for 2000 sites (3 bands) is greater than the cache bound
+    _factorize_uniform(2000, 1., 1., 0.5)
+    assert len(_sspumv._uniform_cache) == 0
+
+    # The least recently used factorizations are evicted by the total size
+    for p in (0.1, 0.2, 0.3):
+        _factorize_uniform(500, 1., 1., p)
+
+    assert list(_sspumv._uniform_cache) == [(500, 1., 1., 0.2), (500, 1., 1., 0.3)]
+
+    for p in range(20):
+        _factorize_uniform(10, 1., 1., p / 20)
+
+    assert len(_sspumv._uniform_cache) == _sspumv._UNIFORM_CACHE_SIZE
+    csaps.clear_factorization_cache()
+
+
+def test_uniform_fit_weights():
+    np.random.seed(1234)
+    x = np.linspace(0., 1., 50)
+    y = np.random.randn(50)
+    w = np.random.uniform(0.5, 1.5, 50)
+
+    s = csaps.CubicSmoothingSpline(x, y, w, smooth=0.99)
+    expected = csaps.CubicSmoothingSpline(x, y, w, smooth=0.99, engine='sparse')
+
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('nu', [0, 1, 2, 3, 4])
+@pytest.mark.parametrize('extrapolate', [True, False])
+@pytest.mark.parametrize('shape', [(20,), (3, 20)])
+def test_uniform_evaluate(shape, extrapolate, nu):
+    np.random.seed(1234)
+    x = np.linspace(0., 1., 20)
+    y = np.random.randn(*shape)
+
+    spline = csaps.CubicSmoothingSpline(x, y, smooth=0.9).spline
+    xi = np.hstack((np.random.uniform(-0.5, 1.5, 100), x))
+
+    expected = PPoly.construct_fast(spline.c, spline.x, axis=spline.axis)(xi, nu=nu, extrapolate=extrapolate)
+
+    assert spline._uniform_step() == pytest.approx(1. / 19)
+    np.testing.assert_allclose(spline(xi, nu=nu, extrapolate=extrapolate), expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('nu', [0, [0, 1]])
+def test_uniform_evaluate_nan(nu, dtype):
+    x = np.linspace(0., 10., 20)
+    spline = csaps.CubicSmoothingSpline(x, np.sin(x), smooth=0.9, dtype=dtype).spline
+
+    xi = np.array([1., np.nan, 2.])
+    expected = PPoly.construct_fast(spline.c.astype(np.float64), spline.x)(xi, nu=0)
+
+    assert spline._uniform_step() is not None
+
+    values = spline(xi, nu=nu)
+    values = values[0] if isinstance(nu, list) else values
+
+    assert np.isnan(values[1])
+    np.testing.assert_allclose(values[[0, 2]], expected[[0, 2]], rtol=1e-6)
+
+
+def test_uniform_step():
+    assert uniform_step(np.diff(np.linspace(0., 1., 11))) == pytest.approx(0.1)
+    assert uniform_step(np.diff(np.array([0., 1., 3.]))) is None
+    assert uniform_step(np.array([])) is None
+
+
+@pytest.mark.parametrize('breaks', [
+    # The inner breaks are searched in the points
+    np.array([0., 1., 2., 3., 5.]),
+    # The points and the breaks are merged
+    np.arange(0., 5.05, 0.05),
+])
+def test_merge_intervals(breaks):
+    x = np.array([-1., 0., 0.5, 1., 1., 2.5, 3., 4.99, 5., 6.])
+
+    expected = np.clip(np.searchsorted(breaks, x, side='right') - 1, 0, breaks.size - 2)
+    np.testing.assert_array_equal(merge_intervals(breaks, x), expected)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('extrapolate', [None, False, 'periodic'])
+@pytest.mark.parametrize('nu', [0, 1, 3])
+@pytest.mark.parametrize('uniform', [True, False])
+def test_evaluate_assume_sorted(uniform, nu, extrapolate, dtype):
+    np.random.seed(1234)
+    x = np.linspace(0., 1., 25) if uniform else np.sort(np.random.uniform(0., 1., 25))
+    y = np.random.randn(2, 25)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.9, dtype=dtype)
+    xi = np.sort(np.hstack((np.random.uniform(-0.5, 1.5, 100), x)))
+
+    np.testing.assert_allclose(s(xi, nu=nu, extrapolate=extrapolate, assume_sorted=True),
+                               s(xi, nu=nu, extrapolate=extrapolate), rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('extrapolate', [None, False, 'periodic'])
+@pytest.mark.parametrize('uniform', [True, False])
+@pytest.mark.parametrize('shape, axis', [
+    ((20,), -1),
+    ((2, 20), -1),
+    ((20, 3), 0),
+    ((2, 20, 3), 1),
+])
+def test_evaluate_derivatives(shape, axis, uniform, extrapolate, dtype):
+    np.random.seed(1234)
+    x = np.linspace(0., 1., 20) if uniform else np.sort(np.random.uniform(0., 1., 20))
+    y = np.random.randn(*shape)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.9, axis=axis, dtype=dtype)
+    xi = np.random.uniform(-0.5, 1.5, (5, 7))
+
+    nu = [0, 2, 1, 4, 3]
+    values = s(xi, nu=nu, extrapolate=extrapolate)
+    expected = np.stack([s(xi, nu=n, extrapolate=extrapolate) for n in nu])
+
+    assert values.dtype == dtype
+    np.testing.assert_allclose(values, expected, rtol=1e-5, atol=1e-5)
+
+    xi = np.sort(xi.ravel())
+    np.testing.assert_allclose(s(xi, nu=nu, extrapolate=extrapolate, assume_sorted=True),
+                               s(xi, nu=nu, extrapolate=extrapolate), rtol=1e-12, atol=1e-12)
+
+
+def test_evaluate_derivatives_invalid():
+    s = csaps.CubicSmoothingSpline([1, 2, 3, 4], [1, 2, 4, 3])
+
+    with pytest.raises(ValueError):
+        s([1, 2], nu=[0, -1])
+
+
+def test_invalid_engine():
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline([1, 2, 3], [1, 2, 3], engine='foo')
+
+
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+@pytest.mark.parametrize('smooth', [None, 0.5, 0.99])
+@pytest.mark.parametrize('shape, axis', [
+    ((2,), -1),
+    ((100,), -1),
+    ((3, 100), -1),
+    ((100, 4), 0),
+])
+def test_float32(shape, axis, smooth, engine):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape).astype(np.float32)
+    xi = np.linspace(-1., 11., 200)
+
+    s64 = csaps.CubicSmoothingSpline(x, y, smooth=smooth, axis=axis, engine=engine)
+    s32 = csaps.CubicSmoothingSpline(x, y, smooth=smooth, axis=axis, engine=engine, dtype=np.float32)
+
+    assert s32.smooth == pytest.approx(s64.smooth)
+    assert s32.spline.coeffs.dtype == np.float32
+
+    for nu in (0, 1, 2):
+        yi32 = s32(xi, nu=nu)
+        yi64 = s64(xi, nu=nu)
+
+        assert yi32.dtype == np.float32
+        assert yi32.shape == yi64.shape
+        np.testing.assert_allclose(yi32, yi64, rtol=1e-4, atol=1e-4 * np.abs(yi64).max())
+
+
+def test_float32_evaluate():
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 30)
+    y = np.random.randn(2, 30)
+
+    spline = csaps.CubicSmoothingSpline(x, y, smooth=0.8, dtype='float32').spline
+    spline64 = csaps.SplinePPForm.construct_fast(spline.coeffs.astype(np.float64), spline.breaks, axis=spline.axis)
+
+    xi = np.array([-1., 0., 2.5, 5., 10., 11.])
+
+    for extrapolate in (True, False):
+        for nu in (0, 1, 3, 4):
+            np.testing.assert_allclose(spline(xi, nu=nu, extrapolate=extrapolate),
+                                       spline64(xi, nu=nu, extrapolate=extrapolate), rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize('method, args', [
+    ('integrate', (0., 10.)),
+    ('integrate', (-1., 11.)),
+    ('antiderivative', ()),
+    ('antiderivative', (2,)),
+    ('derivative', ()),
+    ('roots', ()),
+    ('solve', (0.5,)),
+])
+def test_float32_ppoly_methods(method, args):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 30)
+    y = np.random.randn(2, 30)
+
+    spline = csaps.CubicSmoothingSpline(x, y, smooth=0.8, dtype='float32').spline
+    spline64 = csaps.SplinePPForm.construct_fast(spline.coeffs.astype(np.float64), spline.breaks, axis=spline.axis)
+
+    result = getattr(spline, method)(*args)
+    expected = getattr(spline64, method)(*args)
+
+    if isinstance(expected, csaps.SplinePPForm):
+        assert isinstance(result, csaps.SplinePPForm)
+        assert result.coeffs.dtype == np.float32
+
+        xi = np.linspace(-1., 11., 50)
+        result, expected = result(xi), expected(xi)
+    elif method == 'integrate':
+        assert result.dtype == np.float32
+    else:
+        # The roots of each data dimension
+        assert result.dtype == np.object_
+        result, expected = np.concatenate(result), np.concatenate(expected)
+
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_invalid_dtype():
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline([1, 2, 3], [1, 2, 3], dtype=np.float16)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('block_columns', [1, 3, 7, 100])
+@pytest.mark.parametrize('shape, axis', [
+    ((2, 7), 0),
+    ((30, 7), 0),
+    ((7, 30), -1),
+    ((30, 2, 4), 0),
+    ((2, 4, 30), -1),
+])
+def test_block_columns(shape, axis, block_columns, dtype):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape)
+
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=axis)
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=axis, block_columns=block_columns, dtype=dtype)
+
+    assert s.spline.coeffs.dtype == dtype
+    assert s.spline.coeffs.shape == expected.spline.coeffs.shape
+
+    rtol = 1e-12 if dtype == np.float64 else 1e-6
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=rtol, atol=rtol)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('kwargs', [{}, {'block_columns': 5}, {'workers': 3, 'block_columns': 4}])
+@pytest.mark.parametrize('shape', [(40, 30, 2), (3, 30, 5, 2), (2, 30, 300)])
+def test_middle_axis(shape, kwargs, dtype):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[1])) * 10
+    y = np.random.randn(*shape)
+
+    expected = csaps.CubicSmoothingSpline(x, np.moveaxis(y, 1, -1), smooth=0.8).spline
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=1, dtype=dtype, **kwargs).spline
+
+    assert s.coeffs.dtype == dtype
+
+    rtol = 1e-12 if dtype == np.float64 else 1e-6
+    np.testing.assert_allclose(s.coeffs, expected.coeffs, rtol=rtol, atol=rtol)
+
+
+def test_max_memory():
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 50)
+    y = np.random.randn(50, 1000)
+
+    expected = csaps.CubicSmoothingSpline(x, y, axis=0)
+    s = csaps.CubicSmoothingSpline(x, y, axis=0, max_memory=100000)
+
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-12, atol=1e-12)
+
+
+def test_memmap_out(tmp_path):
+    np.random.seed(1234)
+    n, m = 50, 300
+    x = np.linspace(0., 10., n)
+
+    y = np.lib.format.open_memmap(tmp_path / 'y.npy', mode='w+', dtype=np.float32, shape=(n, m))
+    y[:] = np.random.randn(n, m)
+    y.flush()
+
+    y = np.load(tmp_path / 'y.npy', mmap_mode='r')
+    out = np.lib.format.open_memmap(tmp_path / 'c.npy', mode='w+', dtype=np.float64, shape=(4, n - 1, m))
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.9, axis=0, block_columns=64, out=out)
+    expected = csaps.CubicSmoothingSpline(x, np.array(y, dtype=np.float64), smooth=0.9, axis=0)
+
+    assert np.shares_memory(s.spline.coeffs, out)
+    np.testing.assert_allclose(out, expected.spline.coeffs, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(s(x), expected(x), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('out', [
+    np.zeros((4, 9)),
+    np.zeros((4, 10, 2)),
+    np.zeros((4, 9, 2), dtype=np.float32),
+    np.zeros((4, 2, 9)).transpose(0, 2, 1),
+    [[0.] * 9] * 4,
+])
+def test_invalid_out(out):
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline(np.arange(10.), np.ones((10, 2)), axis=0, out=out)
+
+
+@pytest.mark.parametrize('shape, axis', [
+    ((100, 300), 0),
+    ((300, 100), -1),
+    ((10, 100, 30), 1),
+])
+def test_fit_peak_memory(shape, axis):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., shape[axis])
+    y = np.random.randn(*shape)
+
+    tracemalloc.start()
+    try:
+        s = csaps.CubicSmoothingSpline(x, y, smooth=0.5, axis=axis)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # The coefficients are computed in the output array, only the 2nd derivatives are allocated additionally
+    assert peak < 1.4 * s.spline.coeffs.nbytes
+
+
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('block_columns', [None, 5])
+@pytest.mark.parametrize('workers', [1, 2, 4, 100])
+def test_workers(workers, block_columns, dtype, engine):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 30)
+    y = np.random.randn(3, 30, 17)
+
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=1, dtype=dtype, engine=engine)
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=1, dtype=dtype, engine=engine,
+                                   block_columns=block_columns, workers=workers)
+
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(block_columns=0),
+    dict(max_memory=0),
+])
+def test_invalid_blocks(kwargs):
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline([1, 2, 3], [1, 2, 3], **kwargs)
+
+
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+@pytest.mark.parametrize('smooth', [None, 0.7])
+def test_nan_policy_omit(engine, smooth):
+    np.random.seed(1234)
+    x = np.sort(np.random.uniform(0., 10., 40))
+    y = np.random.randn(8, 40)
+    w = np.random.uniform(0.5, 1.5, 40)
+
+    y[0, 5] = np.nan
+    y[1, 5] = np.nan
+    y[2, [0, 1]] = np.nan
+    y[3, -3:] = np.nan
+    y[4, :-1] = np.nan
+    y[5, [0, 10, -1]] = np.nan
+    y[6, 1:-1] = np.nan
+
+    s = csaps.CubicSmoothingSpline(x, y, w, smooth=smooth, engine=engine, nan_policy='omit')
+    expected_smooth = csaps.CubicSmoothingSpline(x, y[7], w, smooth=smooth).smooth
+
+    assert s.smooth == pytest.approx(expected_smooth)
+
+    xi = np.linspace(x[0], x[-1], 200)
+    yi = s(xi)
+
+    assert np.isnan(yi[4]).all()
+
+    for k in (0, 1, 2, 3, 5, 6, 7):
+        valid = ~np.isnan(y[k])
+        xv = x[valid]
+        sv = csaps.CubicSmoothingSpline(xv, y[k, valid], w[valid], smooth=expected_smooth)
+
+        # The spline is linear outside of the range of valid data sites
+        expected = sv(xi)
+        left = xi < xv[0]
+        right = xi > xv[-1]
+        expected[left] = sv(xv[0]) + sv(xv[0], nu=1) * (xi[left] - xv[0])
+        expected[right] = sv(xv[-1]) + sv(xv[-1], nu=1) * (xi[right] - xv[-1])
+
+        np.testing.assert_allclose(yi[k], expected, rtol=1e-8, atol=1e-8)
+
+
+def test_nan_policy_omit_nd():
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 20)
+    y = np.random.randn(2, 20, 3)
+    y[1, 4, 2] = np.nan
+
+    s = csaps.CubicSmoothingSpline(x, y, axis=1, smooth=0.8, nan_policy='omit')
+    expected = csaps.CubicSmoothingSpline(x, y[0], axis=0, smooth=0.8)
+
+    assert s.spline.coeffs.shape == (4, 19, 2, 3)
+    np.testing.assert_allclose(s.spline.coeffs[:, :, 0], expected.spline.coeffs)
+
+    valid = ~np.isnan(y[1, :, 2])
+    xi = np.linspace(0., 10., 50)
+    expected = csaps.CubicSmoothingSpline(x[valid], y[1, valid, 2], smooth=0.8)
+
+    np.testing.assert_allclose(s(xi)[1, :, 2], expected(xi))
+
+
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+def test_nan_policy_omit_cv(method):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 50)
+    y = np.sin(x) + np.random.randn(3, 50) * 0.1
+    y[0, [3, 17]] = np.nan
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=method, nan_policy='omit')
+    assert np.isfinite(s.spline.coeffs).all()
+
+    # The score is pooled over the columns groups with the different valid data sites
+    groups = [(np.arange(50) != 3) & (np.arange(50) != 17), np.ones(50, dtype=bool)]
+    rows = [y[:1], y[1:]]
+    systems = []
+
+    for valid, yg in zip(groups, rows):
+        dx = np.diff(x[valid])
+        w = np.ones(dx.size + 1)
+        b = np.diff(np.diff(yg[:, valid], axis=1) / dx, axis=1).T
+        systems.append((dx, w, b) + umv_band_matrices(dx, w))
+
+    def score(p):
+        terms = [csaps.CubicSmoothingSpline._cv_score_terms((1 - p) / p, *system, method) for system in systems]
+        return csaps.CubicSmoothingSpline._pooled_cv_score(terms, method)
+
+    grid_scores = [score(p) for p in np.linspace(0.01, 0.99, 50)]
+    assert score(s.smooth) <= min(grid_scores) * (1 + 1e-6)
+
+    expected = csaps.CubicSmoothingSpline(x[groups[0]], y[0, groups[0]], smooth=s.smooth)
+    np.testing.assert_allclose(s(x[groups[0]])[0], expected(x[groups[0]]), rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+def test_nan_policy_omit_cv_all_nan_column(method):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 50)
+    y = np.sin(x) + np.random.randn(3, 50) * 0.1
+    y[1] = np.nan
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=method, nan_policy='omit')
+    expected = csaps.CubicSmoothingSpline(x, y[[0, 2]], smooth=method)
+
+    assert s.smooth == pytest.approx(expected.smooth)
+    assert np.isnan(s.spline.coeffs[:, :, 1]).all()
+    np.testing.assert_allclose(s(x)[[0, 2]], expected(x), rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+def test_nan_policy_omit_cv_scattered(method):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 100)
+    y = np.sin(x) + np.random.randn(50, 100) * 0.1
+    y[np.random.rand(50, 100) < 0.1] = np.nan
+
+    # Almost all data sites have NaN values in some column
+    assert np.isnan(y).any(axis=0).sum() > 95
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=method, nan_policy='omit')
+
+    assert 0. < s.smooth < 1.
+    assert np.isfinite(s.spline.coeffs).all()
+
+    valid = ~np.isnan(y[7])
+    expected = csaps.CubicSmoothingSpline(x[valid], y[7, valid], smooth=s.smooth)
+    np.testing.assert_allclose(s(x[valid])[7], expected(x[valid]), rtol=1e-8, atol=1e-10)
+
+
+def test_nan_policy_without_nan():
+    x = np.linspace(0., 10., 20)
+    y = np.sin(x)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.8, nan_policy='omit')
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=0.8)
+
+    np.testing.assert_array_equal(s.spline.coeffs, expected.spline.coeffs)
+
+
+def test_nan_policy_raise():
+    with pytest.raises(ValueError, match='NaN'):
+        csaps.CubicSmoothingSpline([1, 2, 3, 4], [1, np.nan, 3, 4], nan_policy='raise')
+
+
+def test_invalid_nan_policy():
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline([1, 2, 3], [1, 2, 3], nan_policy='ignore')
+
+
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+@pytest.mark.parametrize('smooth', [None, 0.7])
+@pytest.mark.parametrize('shape, axis', [
+    ((2,), -1),
+    ((25,), -1),
+    ((3, 25), -1),
+    ((25, 4), 0),
+    ((2, 25, 3), 1),
+])
+def test_prepared(shape, axis, smooth, engine):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    w = np.random.rand(shape[axis]) + 0.5
+
+    prepared = csaps.CubicSmoothingSpline.prepare(x, weights=w, smooth=smooth, engine=engine)
+
+    for _ in range(3):
+        y = np.random.randn(*shape)
+
+        expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth, axis=axis)
+        s = prepared.fit(y, axis=axis)
+
+        assert isinstance(s, csaps.CubicSmoothingSpline)
+        assert s.smooth == pytest.approx(expected.smooth)
+        assert prepared.smooth == pytest.approx(expected.smooth)
+        np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(prepared.apply(y, axis=axis), expected(x), rtol=1e-8, atol=1e-10)
+
+
+def test_prepared_invalid_data():
+    prepared = csaps.CubicSmoothingSpline.prepare([1, 2, 3, 4])
+
+    with pytest.raises(ValueError):
+        prepared.fit([1, 2, 3])
+    with pytest.raises(ValueError):
+        prepared.apply(np.ones((4, 2)))
+
+
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+@pytest.mark.parametrize('p', [0.1, 0.5, 0.9])
+def test_cv_score(method, p):
+    np.random.seed(1234)
+    n = 30
+    x = np.sort(np.random.rand(n)) * 10
+    y = np.sin(x) + np.random.randn(n) * 0.3
+    w = np.random.rand(n) + 0.5
+
+    # The influence matrix is computed by smoothing the unit vectors
+    hat = csaps.CubicSmoothingSpline(x, np.eye(n), weights=w, smooth=p)(x).T
+    res = y - hat @ y
+
+    if method == 'gcv':
+        expected = n * np.sum(w * res ** 2) / np.trace(np.eye(n) - hat) ** 2
+    else:
+        expected = np.mean(w * (res / (1 - np.diag(hat))) ** 2)
+
+    dx = np.diff(x)
+    r, qtw = umv_band_matrices(dx, w)
+    b = np.diff(np.diff(y) / dx)[:, np.newaxis]
+
+    score = csaps.CubicSmoothingSpline._cv_score((1 - p) / p, dx, w, b, r, qtw, method)
+    assert score == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('method', ['gcv', 'loocv'])
+def test_cv_smooth(method):
+    np.random.seed(1234)
+    n = 50
+    x = np.sort(np.random.rand(n)) * 10
+    y = np.sin(x) + np.random.randn(2, n) * 0.3
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=method)
+    assert 0. < s.smooth < 1.
+
+    dx = np.diff(x)
+    w = np.ones(n)
+    r, qtw = umv_band_matrices(dx, w)
+    b = np.diff(np.diff(y, axis=1) / dx, axis=1).T
+
+    def score(p):
+        return csaps.CubicSmoothingSpline._cv_score((1 - p) / p, dx, w, b, r, qtw, method)
+
+    grid_scores = [score(p) for p in np.linspace(0.01, 0.99, 50)]
+    assert score(s.smooth) <= min(grid_scores) * (1 + 1e-6)
+
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=s.smooth)
+    np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs)
+
+
+def test_invalid_smooth_method():
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline([1, 2, 3], [1, 2, 3], smooth='foo')
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline.prepare([1, 2, 3], smooth='gcv')
+
+
+@pytest.mark.parametrize('workers', [None, 4])
+@pytest.mark.parametrize('shape, axis', [
+    ((2,), -1),
+    ((25,), -1),
+    ((3, 25), -1),
+    ((25, 4), 0),
+])
+def test_path(shape, axis, workers):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape)
+    w = np.random.rand(shape[axis]) + 0.5
+    xi = np.linspace(x[0], x[-1], 30)
+
+    smooths = [0., 0.2, None, 0.8, 1.]
+
+    splines = csaps.CubicSmoothingSpline.path(x, y, smooths, weights=w, axis=axis, workers=workers)
+    values = csaps.CubicSmoothingSpline.path(x, y, smooths, weights=w, axis=axis, xi=xi, workers=workers)
+
+    assert len(splines) == len(smooths)
+    assert values.shape[0] == len(smooths)
+
+    for smooth, s, yi in zip(smooths, splines, values):
+        expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth, axis=axis)
+
+        assert s.smooth == pytest.approx(expected.smooth)
+        np.testing.assert_allclose(s.spline.coeffs, expected.spline.coeffs, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(yi, expected(xi), rtol=1e-8, atol=1e-10)
+
+
+def test_path_invalid_smooth():
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline.path([1, 2, 3], [1, 2, 3], smooths=[0.5, 'gcv'])
+
+
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+@pytest.mark.parametrize('shape, axis, dtype', [
+    ((25,), -1, np.float64),
+    ((3, 25), -1, np.float64),
+    ((25, 4), 0, np.float32),
+])
+def test_save_load(tmp_path, is_memory_mapped, shape, axis, dtype, mmap_mode):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape)
+    xi = np.random.uniform(-1., 11., 50)
+
+    spline = csaps.CubicSmoothingSpline(x, y, smooth=0.8, axis=axis, dtype=dtype).spline
+
+    path = tmp_path / 'spline.csaps'
+    spline.save(path)
+
+    loaded = csaps.SplinePPForm.load(path, mmap_mode=mmap_mode)
+
+    assert is_memory_mapped(loaded.coeffs) == (mmap_mode is not None)
+    assert loaded.axis == spline.axis
+    assert loaded.coeffs.dtype == spline.coeffs.dtype
+    np.testing.assert_array_equal(loaded.breaks, spline.breaks)
+    np.testing.assert_array_equal(loaded.coeffs, spline.coeffs)
+    np.testing.assert_array_equal(loaded(xi), spline(xi))
+    np.testing.assert_array_equal(loaded(xi, nu=[0, 1, 2]), spline(xi, nu=[0, 1, 2]))
+
+
+def test_save_load_extrapolate(tmp_path):
+    spline = csaps.CubicSmoothingSpline([1, 2, 3, 4], [1, 3, 2, 4]).spline
+    spline.extrapolate = False
+
+    path = tmp_path / 'spline.csaps'
+    spline.save(path)
+
+    loaded = csaps.SplinePPForm.load(path)
+
+    assert loaded.extrapolate is False
+    assert np.all(np.isnan(loaded([0., 5.])))
+
+
+def test_load_invalid_kind(tmp_path):
+    path = tmp_path / 'spline.csaps'
+    csaps.NdGridCubicSmoothingSpline(([1, 2, 3], [1, 2, 3]), np.ones((3, 3))).spline.save(path)
+
+    with pytest.raises(ValueError):
+        csaps.SplinePPForm.load(path)
+
+
+@pytest.mark.parametrize('smooth', [None, 0.0, 0.3, 0.95, 1.0])
+@pytest.mark.parametrize('engine', ['banded', 'sparse'])
+def test_knots_data_sites(smooth, engine):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(40)) * 10
+    y = np.sin(x) + np.random.randn(40) * 0.1
+    w = np.random.uniform(0.5, 2., 40)
+    xi = np.linspace(-1., 11., 100)
+
+    expected = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth)
+    s = csaps.CubicSmoothingSpline(x, y, weights=w, smooth=smooth, engine=engine, knots=x)
+
+    assert s.smooth == pytest.approx(expected.smooth)
+    assert s.spline.coeffs.shape == (4, 39)
+    np.testing.assert_allclose(s(xi), expected(xi), atol=1e-8)
+
+
+@pytest.mark.parametrize('shape, axis', [
+    ((3, 50), 1),
+    ((50, 3), 0),
+    ((2, 50, 3), 1),
+])
+def test_knots_multivariate(shape, axis):
+    np.random.seed(1234)
+    x = np.sort(np.random.rand(shape[axis])) * 10
+    y = np.random.randn(*shape)
+    xi = np.linspace(0., 10., 20)
+
+    expected = csaps.CubicSmoothingSpline(x, y, smooth=0.7, axis=axis)
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.7, axis=axis, knots=x)
+
+    np.testing.assert_allclose(s(xi), expected(xi), atol=1e-8)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_knots_reduced(dtype):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., 20000)
+    y = np.sin(x) + np.random.randn(x.size) * 0.1
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.5, knots=50, dtype=dtype)
+
+    assert isinstance(s.spline, csaps.SplinePPForm)
+    assert s.spline.coeffs.shape == (4, 49)
+    assert s.spline.coeffs.dtype == dtype
+    assert s.spline.breaks[0] == x[0] and s.spline.breaks[-1] == x[-1]
+    np.testing.assert_allclose(s(x[::100]), np.sin(x[::100]), atol=0.02)
+
+    # The natural end conditions
+    np.testing.assert_allclose(s([0., 10.], nu=2), 0., atol=1e-5)
+
+
+def test_knots_array():
+    x = np.linspace(0., 10., 1000)
+    y = 2. * x - 1.
+    knots = [-1., 2., 3., 7., 12.]
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.5, knots=knots)
+
+    np.testing.assert_array_equal(s.spline.breaks, knots)
+    np.testing.assert_allclose(s([-1., 5., 12.]), [-3., 9., 23.])
+
+
+def test_knots_two():
+    x = np.linspace(0., 1., 100)
+    y = np.random.randn(100)
+
+    s = csaps.CubicSmoothingSpline(x, y, smooth=0.5, knots=2)
+
+    assert s.spline.coeffs.shape == (4, 1)
+    np.testing.assert_allclose(s.spline.coeffs[:2], 0., atol=1e-8)
+
+
+@pytest.mark.parametrize('knots, kwargs', [
+    (1, {}),
+    ([1.], {}),
+    ([[1., 2.], [3., 4.]], {}),
+    ([0., 5., 4., 10.], {}),
+    ([1., 5., 10.], {}),
+    ([0., 5., 9.], {}),
+    (10, {'smooth': 'gcv'}),
+    (10, {'nan_policy': 'omit'}),
+    (10, {'out': np.zeros((4, 99))}),
+    (10, {'block_columns': 3}),
+    (10, {'max_memory': 1}),
+    (10, {'workers': 4}),
+])
+def test_knots_invalid(knots, kwargs):
+    x = np.linspace(0., 10., 100)
+
+    with pytest.raises(ValueError):
+        csaps.CubicSmoothingSpline(x, np.sin(x), knots=knots, **kwargs)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('tol', [1e-6, 1e-4, 1e-2])
+@pytest.mark.parametrize('shape, axis', [
+    ((500,), 0),
+    ((2, 500), 1),
+    ((500, 3), 0),
+])
+def test_compress(tol, shape, axis, dtype):
+    np.random.seed(1234)
+    x = np.linspace(0., 10., shape[axis])
+    y = np.random.randn(*shape) * 0.1 + np.expand_dims(np.sin(x), axis=tuple(i for i in range(len(shape)) if i != axis))
+    xi = np.linspace(0., 10., 5000)
+
+    spline = csaps.CubicSmoothingSpline(x, y, smooth=0.95, axis=axis, dtype=dtype).spline
+    compressed = spline.compress(tol)
+
+    assert isinstance(compressed, csaps.SplinePPForm)
+    assert compressed.axis == spline.axis
+    assert compressed.coeffs.dtype == dtype
+    assert compressed.coeffs.shape[2:] == spline.coeffs.shape[2:]
+    assert compressed.pieces < spline.pieces
+    assert compressed.breaks[0] == x[0] and compressed.breaks[-1] == x[-1]
+    assert np.abs(compressed(xi) - spline(xi)).max() <= tol
+
+    # The compressed spline interpolates the values and the slopes at the remaining breaks
+    np.testing.assert_allclose(compressed(compressed.breaks, nu=[0, 1]), spline(compressed.breaks, nu=[0, 1]),
+                               atol=1e-8 if dtype == np.float64 else 1e-5)
+
+
+def test_compress_exact():
+    x = np.linspace(0., 10., 50)
+    spline = csaps.CubicSmoothingSpline(x, 2. * x - 3., smooth=0.5).spline
+
+    compressed = spline.compress(1e-9)
+
+    np.testing.assert_array_equal(compressed.breaks, [0., 10.])
+    np.testing.assert_allclose(compressed([0., 5., 10.]), [-3., 7., 17.])
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_compress_uncompressible(dtype):
+    np.random.seed(1234)
+    x = np.arange(20.)
+    spline = csaps.CubicSmoothingSpline(x, np.random.randn(20), smooth=1.0, dtype=dtype).spline
+
+    compressed = spline.compress(0.)
+
+    assert compressed is not spline
+    assert compressed.coeffs.dtype == dtype
+    np.testing.assert_array_equal(compressed.breaks, spline.breaks)
+    np.testing.assert_array_equal(compressed.coeffs, spline.coeffs)
+
+
+def test_compress_linear():
+    spline = csaps.CubicSmoothingSpline([1., 2.], [1., 3.]).spline
+    compressed = spline.compress(1.)
+
+    assert compressed.order == 2
+    np.testing.assert_array_equal(compressed.coeffs, spline.coeffs)
+
+
+def test_compress_invalid():
+    spline = csaps.CubicSmoothingSpline([1., 2., 3.], [1., 3., 2.]).spline
+
+    with pytest.raises(ValueError):
+        spline.compress(-1.)
+
+    with pytest.raises(ValueError):
+        csaps.SplinePPForm(np.ones((5, 2)), [1., 2., 3.]).compress(1.)